@@ -1,137 +1,157 @@
 import tkinter as tk
-import random
-import math
+import copy
+import os
+import sys
+import time
+from datetime import datetime
 
+from PIL import ImageTk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wwgenerator.animator import (STATIC_LAYERS, Character, CharacterAnimator, limb_layer,
+                                  save_animation, sprite_sheet)
+from wwgenerator.crowd import Crowd, grid_layout
+from wwgenerator.metrics import serve_from_env, timed
+
+CANVAS_W, CANVAS_H = 800, 600
+
+serve_from_env()
 root = tk.Tk()
 root.title("动画小人生成器")
-canvas = tk.Canvas(root, width=400, height=400, bg="white")
+canvas = tk.Canvas(root, width=CANVAS_W, height=CANVAS_H, bg="white")
 canvas.pack()
 
-# =================== 小人参数 ===================
-class Character:
-    def __init__(self):
-        self.reset()
-
-    def reset(self):
-        # 头部
-        self.head_width = random.randint(50, 80)
-        self.head_height = random.randint(60, 90)
-        self.head_x = 200
-        self.head_y = 100
-        # 眼睛
-        self.eye_spacing = random.randint(20, 35)
-        self.eye_size = random.randint(5, 12)
-        # 鼻子
-        self.nose_width = 8
-        self.nose_height = 10
-        # 嘴巴
-        self.mouth_width = random.randint(20, 40)
-        # 身体
-        self.body_width = random.randint(40, 60)
-        self.body_height = random.randint(60, 100)
-        # 四肢
-        self.arm_length = random.randint(30, 50)
-        self.leg_length = random.randint(40, 60)
-        # 颜色
-        self.body_color = random.choice(["blue","green","purple","orange"])
-        # 运动偏移量
-        self.offsets = {"head":0, "arm":0, "leg":0}
-
-    def update_offsets(self):
-        # 头部微动
-        self.offsets["head"] = random.randint(-3,3)
-        # 手臂轻微摆动
-        self.offsets["arm"] = random.randint(-5,5)
-        # 腿微动
-        self.offsets["leg"] = random.randint(-3,3)
-
-# 创建小人对象
-char = Character()
-
-# =================== 绘制小人 ===================
-def draw_character():
-    canvas.delete("all")
-    char.update_offsets()
-    off_h = char.offsets["head"]
-    off_a = char.offsets["arm"]
-    off_l = char.offsets["leg"]
-
-    hx = char.head_x + off_h
-    hy = char.head_y + off_h
-    hw = char.head_width
-    hh = char.head_height
-
-    # 头部
-    canvas.create_oval(hx - hw//2, hy - hh//2,
-                       hx + hw//2, hy + hh//2,
-                       fill="#f5c1a0", outline="black")
-
-    # 眼睛
-    eye_y = hy - hh//8
-    # 左眼
-    canvas.create_oval(hx - char.eye_spacing - char.eye_size + off_h, eye_y - char.eye_size,
-                       hx - char.eye_spacing + char.eye_size + off_h, eye_y + char.eye_size,
-                       fill="white", outline="black")
-    # 右眼
-    canvas.create_oval(hx + char.eye_spacing - char.eye_size + off_h, eye_y - char.eye_size,
-                       hx + char.eye_spacing + char.eye_size + off_h, eye_y + char.eye_size,
-                       fill="white", outline="black")
-    # 瞳孔
-    pupil_size = char.eye_size // 2
-    canvas.create_oval(hx - char.eye_spacing - pupil_size + off_h, eye_y - pupil_size,
-                       hx - char.eye_spacing + pupil_size + off_h, eye_y + pupil_size,
-                       fill="black")
-    canvas.create_oval(hx + char.eye_spacing - pupil_size + off_h, eye_y - pupil_size,
-                       hx + char.eye_spacing + pupil_size + off_h, eye_y + pupil_size,
-                       fill="black")
-
-    # 鼻子
-    nose_y = hy
-    canvas.create_polygon(hx, nose_y - char.nose_height//2,
-                          hx - char.nose_width//2, nose_y + char.nose_height//2,
-                          hx + char.nose_width//2, nose_y + char.nose_height//2,
-                          fill="#f5a07a", outline="black")
-
-    # 嘴巴
-    mouth_y = hy + hh//4
-    canvas.create_line(hx - char.mouth_width//2, mouth_y,
-                       hx + char.mouth_width//2, mouth_y,
-                       fill="red", width=2, smooth=True)
-
-    # 身体
-    body_top = hy + hh//2
-    canvas.create_rectangle(hx - char.body_width//2, body_top,
-                            hx + char.body_width//2, body_top + char.body_height,
-                            fill=char.body_color, outline="black")
-
-    # 手臂
-    canvas.create_line(hx - char.body_width//2, body_top + 20,
-                       hx - char.body_width//2 - char.arm_length + off_a, body_top + 20 + random.randint(-10,10),
-                       width=3)
-    canvas.create_line(hx + char.body_width//2, body_top + 20,
-                       hx + char.body_width//2 + char.arm_length + off_a, body_top + 20 + random.randint(-10,10),
-                       width=3)
-
-    # 腿
-    canvas.create_line(hx - char.body_width//4, body_top + char.body_height,
-                       hx - char.body_width//4 + off_l, body_top + char.body_height + char.leg_length,
-                       width=3)
-    canvas.create_line(hx + char.body_width//4, body_top + char.body_height,
-                       hx + char.body_width//4 + off_l, body_top + char.body_height + char.leg_length,
-                       width=3)
+# =================== 画布上的小人（保留模式） ===================
+# 显示列表图元 -> Tk 画布图元
+TK_ITEMS = {'ellipse': 'oval', 'rectangle': 'rectangle', 'polygon': 'polygon', 'line': 'line'}
+
+def _flat(pts, origin, scale):
+    ox, oy = origin
+    return [v for x, y in pts for v in (ox + x*scale, oy + y*scale)]
+
+class CharacterSprite:
+    """
+    一个小人的全部画布图元只在创建时生成一次。
+    每帧：头部、眼睛、五官身体三组图元按标签整体 move，四肢用 coords 改端点，不再 delete + create。
+    """
+    def __init__(self, canvas, char, origin=(0, 0), scale=1.0):
+        self.canvas = canvas
+        self.char = char
+        self.origin = origin
+        self.scale = scale
+        self.tag = f"char{id(self)}"
+        self.head = 0
+        self.layer_tags = []
+        for i, (layer, k) in enumerate(STATIC_LAYERS):
+            tag = f"{self.tag}_{i}"
+            for op in layer(char).ops:
+                self._create(op, (self.tag, tag))
+            self.layer_tags.append((tag, k))
+        self.limbs = [self._create(op, (self.tag,)) for op in limb_layer(char, char.offsets).ops]
+
+    def _create(self, op, tags):
+        name, pts, kw = op
+        if name == 'line':
+            opts = dict(fill=kw['fill'], width=max(1, kw['width']*self.scale))
+        else:
+            opts = dict(fill=kw.get('fill') or "", outline=kw.get('outline') or "")
+        create = getattr(self.canvas, f"create_{TK_ITEMS[name]}")
+        return create(*_flat(pts, self.origin, self.scale), tags=tags, **opts)
+
+    def step(self):
+        offsets = self.char.update_offsets()
+        dh = offsets["head"] - self.head
+        self.head = offsets["head"]
+        if dh:
+            for tag, (kx, ky) in self.layer_tags:
+                self.canvas.move(tag, kx*dh*self.scale, ky*dh*self.scale)
+        for item, (_, pts, _) in zip(self.limbs, limb_layer(self.char, offsets).ops):
+            self.canvas.coords(item, *_flat(pts, self.origin, self.scale))
+
+    def destroy(self):
+        self.canvas.delete(self.tag)
+
+# =================== 小人群 ===================
+# 逐个模式：每个小人一组画布图元；整图模式：Crowd 向量化批量画成一张图，适合上千个小人
+sprites = []
+crowd = None
+crowd_item = None
+crowd_photo = None
 
-# =================== 动画循环 ===================
-def animate():
-    draw_character()
-    root.after(200, animate)  # 每200ms刷新一次，控制动画速度
-
-# =================== 重新生成小人 ===================
 def regenerate():
-    char.reset()
+    global crowd, crowd_item
+    for sprite in sprites:
+        sprite.destroy()
+    sprites.clear()
+    canvas.delete("crowd")
+    crowd = crowd_item = None
+    n = count_var.get()
+    if batch_var.get():
+        crowd = Crowd(n, size=(CANVAS_W, CANVAS_H))
+        crowd_item = canvas.create_image(0, 0, anchor='nw', tags=("crowd",))
+        return
+    for x, y, scale in grid_layout(n, CANVAS_W, CANVAS_H):
+        sprites.append(CharacterSprite(canvas, Character(), (x, y), scale))
+
+def step_crowd():
+    global crowd_photo
+    crowd.step()
+    with timed('photoimage', part='character'):
+        crowd_photo = ImageTk.PhotoImage(crowd.render())
+    canvas.itemconfig(crowd_item, image=crowd_photo)
+
+# =================== 动画循环 ===================
+frame_ms = 0.0
 
-# 按钮
-tk.Button(root, text="重新生成小人", command=regenerate).pack()
+def animate():
+    global frame_ms
+    t0 = time.perf_counter()
+    if crowd is not None:
+        step_crowd()
+    for sprite in sprites:
+        sprite.step()
+    elapsed = (time.perf_counter() - t0) * 1000
+    budget = 1000 / fps_var.get()
+    frame_ms = elapsed if frame_ms == 0 else 0.9*frame_ms + 0.1*elapsed
+    count = crowd.n if crowd is not None else len(sprites)
+    status.config(text=f"{count} 个小人  每帧更新 {frame_ms:.1f}ms / 预算 {budget:.0f}ms",
+                  fg="red" if frame_ms > budget else "black")
+    # 扣掉本帧已用时间，帧率尽量稳定在设定值
+    root.after(max(1, int(budget - elapsed)), animate)
+
+# =================== 导出动画 ===================
+def export_animation(frames=24):
+    # 在副本上离线渲染，不打断窗口中的动画；整图模式导出整群
+    if crowd is not None:
+        images = copy.deepcopy(crowd).render_frames(frames)
+    elif sprites:
+        images = CharacterAnimator(copy.deepcopy(sprites[0].char)).render(frames)
+    else:
+        return
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    gif_path = os.path.join(os.getcwd(), f"character_{stamp}.gif")
+    sheet_path = os.path.join(os.getcwd(), f"character_{stamp}_sheet.png")
+    save_animation(images, gif_path, duration=round(1000 / fps_var.get()))
+    sprite_sheet(images, columns=frames)[0].save(sheet_path)
+    print(f"已导出动画: {gif_path}，帧条: {sheet_path}")
+
+# =================== 控件 ===================
+controls = tk.Frame(root)
+controls.pack(fill='x')
+tk.Label(controls, text="数量").pack(side='left')
+count_var = tk.IntVar(value=1)
+tk.Spinbox(controls, from_=1, to=500, width=5, textvariable=count_var).pack(side='left', padx=5)
+tk.Label(controls, text="帧率").pack(side='left')
+fps_var = tk.IntVar(value=5)   # 5fps 即原来的每 200ms 一帧
+tk.Scale(controls, from_=1, to=60, orient="horizontal", variable=fps_var).pack(side='left', padx=5)
+batch_var = tk.IntVar(value=0)
+tk.Checkbutton(controls, text="整图批量渲染", variable=batch_var, command=regenerate).pack(side='left')
+tk.Button(controls, text="重新生成小人", command=regenerate).pack(side='left', padx=5)
+tk.Button(controls, text="导出动画", command=export_animation).pack(side='left', padx=5)
+status = tk.Label(root, anchor='w')
+status.pack(fill='x')
 
 # 启动动画
+regenerate()
 animate()
 root.mainloop()
@@ -1,66 +1,18 @@
 import tkinter as tk
 from tkinter import colorchooser, ttk
-from PIL import Image, ImageDraw, ImageTk
-import math
-import random
+from PIL import ImageTk
 import os
+import sys
 from datetime import datetime
+from functools import partial
 
-# ===================== 眼珠生成函数 =====================
-def generate_eyeball(size=128, iris_radius_ratio=0.45, pupil_radius_ratio=0.3,
-                     iris_color=(0,128,255), sclera_color=(255,255,255),
-                     pupil_color=(0,0,0), pupil_shape='circle',
-                     iris_texture='radial', highlight=True):
-
-    img = Image.new("RGBA", (size, size), (0,0,0,0))
-    draw = ImageDraw.Draw(img)
-    center = size//2
-
-    # 1. 眼白
-    draw.ellipse([(0,0),(size,size)], fill=sclera_color)
-
-    # 2. 虹膜
-    iris_r = int(iris_radius_ratio*size)
-    draw.ellipse([center-iris_r, center-iris_r, center+iris_r, center+iris_r], fill=iris_color)
-
-    # 虹膜纹理
-    for i in range(iris_r):
-        if iris_texture=='radial':
-            c = tuple(min(255,int(iris_color[j]*(1-i/iris_r))) for j in range(3))
-            draw.ellipse([center-i, center-i, center+i, center+i], outline=c)
-        elif iris_texture=='spokes':
-            for angle in range(0,360,10):
-                x = int(center + i*math.cos(math.radians(angle)))
-                y = int(center + i*math.sin(math.radians(angle)))
-                draw.point((x,y), fill=iris_color)
-        elif iris_texture=='wavy':
-            offset = int(5 * math.sin(i/5))
-            bbox = [center-i+offset, center-i, center+i+offset, center+i]
-            color = tuple(min(255, int(iris_color[j]*(1-i/iris_r))) for j in range(3))
-            draw.ellipse(bbox, outline=color)
-        elif iris_texture=='rings':
-            if i % 5 == 0:
-                color = tuple(min(255, int(iris_color[j]*(1-i/iris_r))) for j in range(3))
-                draw.ellipse([center-i, center-i, center+i, center+i], outline=color)
-
-    # 3. 瞳孔
-    pupil_r = int(pupil_radius_ratio*iris_r)
-    if pupil_shape=='circle':
-        draw.ellipse([center-pupil_r, center-pupil_r, center+pupil_r, center+pupil_r], fill=pupil_color)
-    elif pupil_shape=='ellipse':
-        draw.ellipse([center-pupil_r, center-pupil_r//2, center+pupil_r, center+pupil_r//2], fill=pupil_color)
-    elif pupil_shape=='slit':
-        draw.ellipse([center-pupil_r//4, center-pupil_r, center+pupil_r//4, center+pupil_r], fill=pupil_color)
-    elif pupil_shape=='cat':
-        draw.rectangle([center- pupil_r//6, center- pupil_r, center+ pupil_r//6, center+ pupil_r], fill=pupil_color)
-
-    # 4. 高光
-    if highlight:
-        hl_r = int(pupil_r*0.4)
-        draw.ellipse([center-pupil_r//2, center-pupil_r//2, center-pupil_r//2+hl_r, center-pupil_r//2+hl_r],
-                     fill=(255,255,255,180))
-
-    return img
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wwgenerator.atlas import AtlasWriter
+from wwgenerator.cache import RenderCache
+from wwgenerator.export import PngExporter
+from wwgenerator.eyeball import generate_eyeball, random_eyeball_params
+from wwgenerator.metrics import serve_from_env, timed
+from wwgenerator.preview import PreviewRenderer, scaled_draft
 
 # ===================== GUI =====================
 class EyeballGenerator:
@@ -78,6 +30,11 @@ class EyeballGenerator:
         self.iris_color = (0,128,255)
         self.sclera_color = (255,255,255)
         self.pupil_color = (0,0,0)
+        self.cache = RenderCache()
+        # 拖动时先出 1/4 分辨率草图，停手 150ms 后再渲染全尺寸
+        render = partial(self.cache.get, generate_eyeball)
+        self.preview = PreviewRenderer(root, render, self.show_custom,
+                                       draft=scaled_draft(render), refine_ms=150)
 
         # 创建分页
         notebook = ttk.Notebook(root)
@@ -124,10 +81,11 @@ class EyeballGenerator:
         tk.Spinbox(self.frame_random, from_=1, to=20, width=5, textvariable=self.num_var).grid(row=1,column=1)
         tk.Button(self.frame_random,text="生成随机眼珠", command=self.generate_random_eyes).grid(row=1,column=2,columnspan=2)
         tk.Button(self.frame_random,text="保存随机眼珠到文件夹", command=self.save_random_eyes_to_folder).grid(row=1,column=4)
+        tk.Button(self.frame_random,text="导出为图集", command=self.save_random_eyes_atlas).grid(row=2,column=4)
 
     # ========== 自定义页面功能 ==========
-    def update_custom(self):
-        img = generate_eyeball(
+    def custom_params(self):
+        return dict(
             size=256,
             iris_radius_ratio=self.iris_radius_ratio.get(),
             pupil_radius_ratio=self.pupil_radius_ratio.get(),
@@ -138,7 +96,14 @@ class EyeballGenerator:
             iris_texture=self.iris_texture.get(),
             highlight=self.highlight.get()
         )
-        self.imgtk_custom = ImageTk.PhotoImage(img)
+
+    def update_custom(self):
+        # 后台线程渲染，拖动时只渲染最新参数
+        self.preview.request(**self.custom_params())
+
+    def show_custom(self, img):
+        with timed('photoimage', part='eyeball'):
+            self.imgtk_custom = ImageTk.PhotoImage(img)
         self.canvas_custom.create_image(0,0,anchor='nw',image=self.imgtk_custom)
 
     def choose_iris_color(self):
@@ -154,17 +119,7 @@ class EyeballGenerator:
         if c: self.pupil_color = tuple(int(x) for x in c); self.update_custom()
 
     def save_png(self):
-        img = generate_eyeball(
-            size=256,
-            iris_radius_ratio=self.iris_radius_ratio.get(),
-            pupil_radius_ratio=self.pupil_radius_ratio.get(),
-            iris_color=self.iris_color,
-            sclera_color=self.sclera_color,
-            pupil_color=self.pupil_color,
-            pupil_shape=self.pupil_shape.get(),
-            iris_texture=self.iris_texture.get(),
-            highlight=self.highlight.get()
-        )
+        img = self.cache.get(generate_eyeball, **self.custom_params())
         img.save("eyeball_custom.png")
         print("已保存 eyeball_custom.png")
 
@@ -175,43 +130,45 @@ class EyeballGenerator:
         self.canvas_random.delete("all")
         self.random_imgs = []
         self.random_img_objs = []
+        self.random_params = []
 
         for idx in range(num):
             x_offset = (idx % cols) * self.size
             y_offset = (idx // cols) * self.size
-            iris_color = tuple(random.randint(0,255) for _ in range(3))
-            sclera_color = tuple(random.randint(200,255) for _ in range(3))
-            pupil_color = tuple(random.randint(0,50) for _ in range(3))
-            iris_texture = random.choice(['radial','spokes','wavy','rings'])
-            pupil_shape = random.choice(['circle','ellipse','slit','cat'])
-            img = generate_eyeball(
-                size=self.size,
-                iris_radius_ratio=random.uniform(0.3,0.6),
-                pupil_radius_ratio=random.uniform(0.2,0.5),
-                iris_color=iris_color,
-                sclera_color=sclera_color,
-                pupil_color=pupil_color,
-                pupil_shape=pupil_shape,
-                iris_texture=iris_texture,
-                highlight=random.choice([True,False])
-            )
-            imgtk = ImageTk.PhotoImage(img)
+            params = random_eyeball_params(size=self.size)
+            img = generate_eyeball(**params)
+            with timed('photoimage', part='eyeball'):
+                imgtk = ImageTk.PhotoImage(img)
             self.canvas_random.create_image(x_offset, y_offset, anchor='nw', image=imgtk)
             self.random_imgs.append(imgtk)
             self.random_img_objs.append(img)
+            self.random_params.append(params)
 
     def save_random_eyes_to_folder(self):
         if not hasattr(self, 'random_img_objs') or not self.random_img_objs:
             print("没有随机眼珠可保存，请先生成。")
             return
         folder_name = datetime.now().strftime("random_eyes_%Y%m%d_%H%M%S")
-        os.makedirs(folder_name, exist_ok=True)
-        for idx, img in enumerate(self.random_img_objs, start=1):
-            img.save(os.path.join(folder_name, f"eye_{idx}.png"))
-        print(f"已保存 {len(self.random_img_objs)} 个随机眼珠到文件夹 {folder_name}")
+        # 编码写盘在后台线程完成，窗口不会卡住
+        exporter = PngExporter(folder_name, "eye", start=1, library=True, part="eyeball")
+        for img, params in zip(self.random_img_objs, self.random_params):
+            exporter.submit(img, params=params)
+        exporter.close_async(lambda n, err: print(f"保存失败: {err}") if err else
+                             print(f"已保存 {n} 个随机眼珠到文件夹 {folder_name}"))
+
+    def save_random_eyes_atlas(self):
+        if not hasattr(self, 'random_img_objs') or not self.random_img_objs:
+            print("没有随机眼珠可保存，请先生成。")
+            return
+        folder_name = datetime.now().strftime("random_eyes_atlas_%Y%m%d_%H%M%S")
+        with AtlasWriter(folder_name, name="eye_atlas", trim=True) as atlas:
+            for idx, (img, params) in enumerate(zip(self.random_img_objs, self.random_params), start=1):
+                atlas.add(f"eye_{idx}", img, params)
+        print(f"已将 {len(self.random_img_objs)} 个随机眼珠打包为图集 {folder_name}")
 
 # ===================== 运行 =====================
 if __name__=="__main__":
+    serve_from_env()
     root = tk.Tk()
     app = EyeballGenerator(root)
     root.mainloop()
@@ -1,104 +1,18 @@
 import tkinter as tk
 from tkinter import colorchooser, ttk
-from PIL import Image, ImageDraw, ImageTk
+from PIL import ImageTk
 import os
-import random
+import sys
 from datetime import datetime
+from functools import partial
 
-# =================== 脸型绘制函数 ===================
-def draw_oval_face(draw, center, size, skin_color, outline_color, params):
-    x, y = center
-    outline_w = params.get('outline_width', 4)
-    width_ratio = params.get('width_ratio', 1.3)  # 默认宽比高大
-    # 控制水平半径比高度窄
-    half_width = min(size / width_ratio, size)
-    draw.ellipse((x - half_width, y - size, x + half_width, y + size),
-                 fill=skin_color, outline=outline_color, width=outline_w)
-
-def draw_round_face(draw, center, size, skin_color, outline_color, params):
-    draw.ellipse((center[0]-size, center[1]-size, center[0]+size, center[1]+size),
-                 fill=skin_color, outline=outline_color, width=params.get('outline_width', 4))
-
-def draw_square_face(draw, center, size, skin_color, outline_color, params):
-    x, y = center
-    outline_w = params.get('outline_width', 4)
-    radius = params.get('chin_round', size//8)
-    try:
-        draw.rounded_rectangle((x-size, y-size, x+size, y+size), radius=radius,
-                               fill=skin_color, outline=outline_color, width=outline_w)
-    except Exception:
-        draw.rectangle((x-size, y-size, x+size, y+size), fill=skin_color, outline=outline_color, width=outline_w)
-
-def draw_triangle_face(draw, center, size, skin_color, outline_color, params):
-    x, y = center
-    outline_w = params.get('outline_width', 4)
-    polygon = [(x, y-size), (x+size, y+size), (x-size, y+size)]
-    draw.polygon(polygon, fill=skin_color, outline=outline_color)
-    draw.line(polygon+[polygon[0]], fill=outline_color, width=outline_w)
-
-def draw_inverted_triangle_face(draw, center, size, skin_color, outline_color, params):
-    x, y = center
-    outline_w = params.get('outline_width', 4)
-    polygon = [(x-size, y-size), (x+size, y-size), (x, y+size)]
-    draw.polygon(polygon, fill=skin_color, outline=outline_color)
-    draw.line(polygon+[polygon[0]], fill=outline_color, width=outline_w)
-
-def draw_diamond_face(draw, center, size, skin_color, outline_color, params):
-    x, y = center
-    outline_w = params.get('outline_width', 4)
-    polygon = [(x, y-size), (x+size, y), (x, y+size), (x-size, y)]
-    draw.polygon(polygon, fill=skin_color, outline=outline_color)
-    draw.line(polygon+[polygon[0]], fill=outline_color, width=outline_w)
-
-FACE_SHAPES = {
-    '椭圆脸': draw_oval_face,
-    '圆脸': draw_round_face,
-    '方脸': draw_square_face,
-    '三角脸': draw_triangle_face,
-    '倒三角脸': draw_inverted_triangle_face,
-    '菱形脸': draw_diamond_face
-}
-
-# =================== 五官绘制函数 ===================
-def draw_features(draw, center, size, outline_color, params):
-    x, y = center
-    eye_w = params.get('eye_w', size//6)
-    eye_h = params.get('eye_h', size//12)
-    eye_offset_x = params.get('eye_offset_x', size//3)
-    eye_offset_y = params.get('eye_offset_y', -size//6)
-    nose_w = params.get('nose_w', size//12)
-    nose_h = params.get('nose_h', size//8)
-    mouth_w = params.get('mouth_w', size//2)
-    mouth_h = params.get('mouth_h', size//12)
-
-    # 左眼
-    draw.ellipse((x-eye_offset_x-eye_w, y+eye_offset_y-eye_h,
-                  x-eye_offset_x+eye_w, y+eye_offset_y+eye_h),
-                  fill=(255,255,255), outline=outline_color, width=2)
-    # 右眼
-    draw.ellipse((x+eye_offset_x-eye_w, y+eye_offset_y-eye_h,
-                  x+eye_offset_x+eye_w, y+eye_offset_y+eye_h),
-                  fill=(255,255,255), outline=outline_color, width=2)
-    # 鼻子
-    draw.polygon([(x, y), (x-nose_w, y+nose_h), (x+nose_w, y+nose_h)], fill=outline_color)
-    # 嘴巴
-    draw.arc((x-mouth_w, y+size//4, x+mouth_w, y+size//4+mouth_h),
-             start=0, end=180, fill=outline_color, width=2)
-
-# =================== 脸型生成函数 ===================
-def generate_face(shape='椭圆脸', skin_color=(255,224,189), outline_color=(0,0,0),
-                  size=150, params=None, with_features=False):
-    if params is None:
-        params = {}
-    if shape == '椭圆脸' and 'width_ratio' not in params:
-        params['width_ratio'] = 1.3
-    img = Image.new("RGBA", (size*2, size*2), (255,255,255,0))
-    draw = ImageDraw.Draw(img)
-    func = FACE_SHAPES.get(shape, draw_oval_face)
-    func(draw, (size, size), size, skin_color, outline_color, params)
-    if with_features:
-        draw_features(draw, (size, size), size, outline_color, params)
-    return img
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wwgenerator.atlas import AtlasWriter
+from wwgenerator.cache import RenderCache
+from wwgenerator.export import PngExporter
+from wwgenerator.face import FACE_SHAPES, generate_face, random_face_params
+from wwgenerator.metrics import serve_from_env, timed
+from wwgenerator.preview import PreviewRenderer
 
 # =================== GUI ===================
 class FaceGenerator:
@@ -107,6 +21,10 @@ class FaceGenerator:
         root.title("脸型生成器")
         self.skin_color = (255,224,189)
         self.outline_color = (0,0,0)
+        self.cache = RenderCache()
+        self.custom_exporter = None
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.preview = PreviewRenderer(root, partial(self.cache.get, generate_face), self.show_custom)
 
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(fill="both", expand=True)
@@ -195,11 +113,13 @@ class FaceGenerator:
         tk.Spinbox(top_frame, from_=1, to=50, width=5, textvariable=self.random_num_var).pack(side='left', padx=5)
         tk.Button(top_frame, text="生成随机脸型", command=self.generate_random_faces).pack(side='left', padx=5)
         tk.Button(top_frame, text="导出随机脸型", command=self.save_random_faces).pack(side='left', padx=5)
+        tk.Button(top_frame, text="导出为图集", command=self.save_random_faces_atlas).pack(side='left', padx=5)
 
         self.canvas_random = tk.Canvas(frame, width=600, height=600, bg="white")
         self.canvas_random.pack()
         self.random_imgs = []
         self.random_img_objs = []
+        self.random_params = []
 
     # ===== 共用 =====
     def choose_color(self, target):
@@ -221,34 +141,51 @@ class FaceGenerator:
             'mouth_h': int(self.scale_mouth_h.get())
         }
 
-    def update_canvas_custom(self):
+    def custom_params(self):
         params = self.get_params() if self.features_var.get() else {}
-        img = generate_face(shape=self.combo_shape.get(), skin_color=self.skin_color,
-                            outline_color=self.outline_color, size=150,
-                            params=params, with_features=self.features_var.get())
-        self.tk_img_custom = ImageTk.PhotoImage(img)
+        return dict(shape=self.combo_shape.get(), skin_color=self.skin_color,
+                    outline_color=self.outline_color, size=150,
+                    params=params, with_features=self.features_var.get())
+
+    def update_canvas_custom(self):
+        # 后台线程渲染，拖动时只渲染最新参数
+        self.preview.request(**self.custom_params())
+
+    def show_custom(self, img):
+        with timed('photoimage', part='face'):
+            self.tk_img_custom = ImageTk.PhotoImage(img)
         self.canvas_custom.delete("all")
         self.canvas_custom.create_image(150,150,image=self.tk_img_custom)
 
     def generate_and_save_custom(self):
-        params = self.get_params() if self.features_var.get() else {}
-        img = generate_face(shape=self.combo_shape.get(), skin_color=self.skin_color,
-                            outline_color=self.outline_color, size=150,
-                            params=params, with_features=self.features_var.get())
-        save_dir = os.path.join(os.getcwd(), "face_images")
-        os.makedirs(save_dir, exist_ok=True)
-        idx = 1
-        while os.path.exists(os.path.join(save_dir, f"face_{idx}.png")):
-            idx += 1
-        filename = os.path.join(save_dir, f"face_{idx}.png")
-        img.save(filename)
-        print(f"已保存: {filename}")
+        img = self.cache.get(generate_face, **self.custom_params())
+        if self.custom_exporter is None:
+            # 只在第一次保存时扫描目录确定编号，之后在内存中递增
+            self.custom_exporter = PngExporter(os.path.join(os.getcwd(), "face_images"), "face")
+        self.custom_exporter.submit(img, on_saved=self.report_saved)
+
+    def report_saved(self, path, error):
+        # 在编码线程中调用：文件真正写完（或失败）后才报告
+        if error:
+            print(f"保存失败: {path}: {error}")
+        else:
+            print(f"已保存: {path}")
+
+    def on_close(self):
+        # 等单张保存的队列写完再退出，失败已由 report_saved 报告
+        if self.custom_exporter is not None:
+            try:
+                self.custom_exporter.close()
+            except Exception:
+                pass
+        self.root.destroy()
 
     # ===== 随机生成优化版 =====
     def generate_random_faces(self):
         num = self.random_num_var.get()
         self.random_imgs.clear()
         self.random_img_objs.clear()
+        self.random_params.clear()
         self.canvas_random.delete("all")
 
         canvas_width = 600
@@ -263,24 +200,10 @@ class FaceGenerator:
         self.canvas_random.config(width=canvas_width, height=max(canvas_height, face_size*rows + (rows+1)*padding))
 
         for idx in range(num):
-            shape = random.choice(list(FACE_SHAPES.keys()))
-            skin_color = tuple(random.randint(180,255) for _ in range(3))
-            outline_color = (0,0,0)
-            params = {
-                'eye_w': random.randint(face_size//12, face_size//6),
-                'eye_h': random.randint(face_size//24, face_size//12),
-                'eye_offset_x': random.randint(face_size//6, face_size//3),
-                'nose_w': random.randint(face_size//24, face_size//12),
-                'nose_h': random.randint(face_size//16, face_size//8),
-                'mouth_w': random.randint(face_size//4, face_size//2),
-                'mouth_h': random.randint(face_size//24, face_size//12)
-            }
-            if shape == '椭圆脸':
-                params['width_ratio'] = random.uniform(1.2, 1.5)
-
-            with_features = random.choice([True, False])
-            img = generate_face(shape, skin_color, outline_color, face_size, params, with_features)
-            imgtk = ImageTk.PhotoImage(img)
+            params = random_face_params(size=face_size)
+            img = generate_face(**params)
+            with timed('photoimage', part='face'):
+                imgtk = ImageTk.PhotoImage(img)
 
             col = idx % cols
             row = idx // cols
@@ -290,18 +213,32 @@ class FaceGenerator:
 
             self.random_imgs.append(imgtk)
             self.random_img_objs.append(img)
+            self.random_params.append(params)
 
     def save_random_faces(self):
         if not self.random_img_objs:
             print("请先生成随机脸型")
             return
         folder = os.path.join(os.getcwd(), "random_faces_" + datetime.now().strftime("%Y%m%d_%H%M%S"))
-        os.makedirs(folder, exist_ok=True)
-        for idx, img in enumerate(self.random_img_objs, start=1):
-            img.save(os.path.join(folder, f"face_{idx}.png"))
-        print(f"已保存 {len(self.random_img_objs)} 个随机脸型到 {folder}")
+        # 编码写盘在后台线程完成，窗口不会卡住
+        exporter = PngExporter(folder, "face", start=1, library=True)
+        for img, params in zip(self.random_img_objs, self.random_params):
+            exporter.submit(img, params=params)
+        exporter.close_async(lambda n, err: print(f"保存失败: {err}") if err else
+                             print(f"已保存 {n} 个随机脸型到 {folder}"))
+
+    def save_random_faces_atlas(self):
+        if not self.random_img_objs:
+            print("请先生成随机脸型")
+            return
+        folder = os.path.join(os.getcwd(), "random_faces_atlas_" + datetime.now().strftime("%Y%m%d_%H%M%S"))
+        with AtlasWriter(folder, name="face_atlas", trim=True) as atlas:
+            for idx, (img, params) in enumerate(zip(self.random_img_objs, self.random_params), start=1):
+                atlas.add(f"face_{idx}", img, params)
+        print(f"已将 {len(self.random_img_objs)} 个随机脸型打包为图集 {folder}")
 
 if __name__=="__main__":
+    serve_from_env()
     root = tk.Tk()
     app = FaceGenerator(root)
     root.mainloop()
@@ -1,42 +1,19 @@
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageDraw, ImageTk
-import random
+from PIL import ImageTk
 import os
+import sys
 from datetime import datetime
+from functools import partial
 
-# ===================== 嘴巴生成函数 =====================
-def generate_mouth(size=128,
-                   mouth_width_ratio=0.6,
-                   mouth_height_ratio=0.2,
-                   mouth_shape='line'):
-    """
-    生成简化嘴巴图像，仅保留轮廓分类
-    mouth_shape: 'line', 'circle', 'half_ellipse'
-    """
-    img = Image.new("RGBA", (size, size), (0,0,0,0))
-    draw = ImageDraw.Draw(img)
-    center_x, center_y = size // 2, size // 2
-
-    mouth_w = int(size * mouth_width_ratio)
-    mouth_h = int(size * mouth_height_ratio)
-
-    if mouth_shape == 'line':
-        draw.line([(center_x - mouth_w//2, center_y),
-                   (center_x + mouth_w//2, center_y)],
-                  fill=(0,0,0), width=2)
-    elif mouth_shape == 'circle':
-        draw.ellipse([center_x - mouth_w//2, center_y - mouth_w//2,
-                      center_x + mouth_w//2, center_y + mouth_w//2],
-                     outline=(0,0,0), width=2)
-    elif mouth_shape == 'half_ellipse':
-        draw.arc([center_x - mouth_w//2, center_y - mouth_h//2,
-                  center_x + mouth_w//2, center_y + mouth_h//2],
-                 start=0, end=180, fill=(0,0,0), width=2)
-    else:
-        raise ValueError("mouth_shape must be 'line', 'circle', or 'half_ellipse'")
-
-    return img
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wwgenerator.atlas import AtlasWriter
+from wwgenerator.cache import RenderCache
+from wwgenerator.dedup import DedupIndex, unique
+from wwgenerator.export import PngExporter
+from wwgenerator.metrics import serve_from_env, timed
+from wwgenerator.mouth import MOUTH_SHAPES, generate_mouth, random_mouth_params
+from wwgenerator.preview import PreviewRenderer, run_in_background
 
 # ===================== GUI =====================
 class MouthGenerator:
@@ -49,6 +26,9 @@ class MouthGenerator:
         self.mouth_height_ratio = tk.DoubleVar(value=0.2)
         self.mouth_shape = tk.StringVar(value='line')
         self.num_var = tk.IntVar(value=1)
+        self.cache = RenderCache()
+        self.random_busy = False
+        self.preview = PreviewRenderer(root, partial(self.cache.get, generate_mouth), self.show_custom)
 
         # 保存文件夹：绝对路径到当前项目目录
         self.save_folder = os.path.join(os.getcwd(), "mouths")
@@ -74,7 +54,7 @@ class MouthGenerator:
         tk.Scale(self.frame_custom, from_=0.05, to=0.5, resolution=0.01, orient=tk.HORIZONTAL,
                  variable=self.mouth_height_ratio, command=lambda e:self.update_custom()).grid(row=2,column=1)
         tk.Label(self.frame_custom,text="嘴型").grid(row=1,column=2)
-        tk.OptionMenu(self.frame_custom, self.mouth_shape, 'line','circle','half_ellipse', command=lambda e:self.update_custom()).grid(row=1,column=3)
+        tk.OptionMenu(self.frame_custom, self.mouth_shape, *MOUTH_SHAPES, command=lambda e:self.update_custom()).grid(row=1,column=3)
         tk.Button(self.frame_custom, text="保存嘴巴PNG", command=self.save_png).grid(row=3,column=0,columnspan=3,sticky='we', pady=10)
 
         self.update_custom()
@@ -87,25 +67,28 @@ class MouthGenerator:
         tk.Spinbox(self.frame_random, from_=1, to=20, width=5, textvariable=self.num_var).grid(row=1,column=1)
         tk.Button(self.frame_random,text="生成随机嘴巴", command=self.generate_random_mouths).grid(row=1,column=2,columnspan=2)
         tk.Button(self.frame_random,text="保存随机嘴巴到文件夹", command=self.save_random_mouths_to_folder).grid(row=1,column=4)
+        tk.Button(self.frame_random,text="导出为图集", command=self.save_random_mouths_atlas).grid(row=2,column=4)
 
     # ========== 自定义页面功能 ==========
-    def update_custom(self):
-        img = generate_mouth(
+    def custom_params(self):
+        return dict(
             size=256,
             mouth_width_ratio=self.mouth_width_ratio.get(),
             mouth_height_ratio=self.mouth_height_ratio.get(),
             mouth_shape=self.mouth_shape.get()
         )
-        self.imgtk_custom = ImageTk.PhotoImage(img)
+
+    def update_custom(self):
+        # 后台线程渲染，拖动时只渲染最新参数
+        self.preview.request(**self.custom_params())
+
+    def show_custom(self, img):
+        with timed('photoimage', part='mouth'):
+            self.imgtk_custom = ImageTk.PhotoImage(img)
         self.canvas_custom.create_image(0,0,anchor='nw',image=self.imgtk_custom)
 
     def save_png(self):
-        img = generate_mouth(
-            size=256,
-            mouth_width_ratio=self.mouth_width_ratio.get(),
-            mouth_height_ratio=self.mouth_height_ratio.get(),
-            mouth_shape=self.mouth_shape.get()
-        )
+        img = self.cache.get(generate_mouth, **self.custom_params())
         filename = f"mouth_{self.mouth_shape.get()}_{datetime.now().strftime('%H%M%S')}.png"
         full_path = os.path.join(self.save_folder, filename)
         img.save(full_path)
@@ -113,28 +96,38 @@ class MouthGenerator:
 
     # ========== 随机生成页面功能 ==========
     def generate_random_mouths(self):
-        num = self.num_var.get()
+        if self.random_busy:
+            return
+        self.random_busy = True
+        num, size = self.num_var.get(), self.size
+
+        def work():
+            # 只有三种形状，随机采样重复很多：去掉近似重复的再显示；
+            # 参数空间接近取尽时可能要试很多次，放在工作线程里，窗口不会卡住
+            samples = ((p, generate_mouth(**p))
+                       for p in iter(lambda: random_mouth_params(size=size), None))
+            return list(unique(samples, DedupIndex('mouth'), num))
+        run_in_background(self.root, work, self.show_random_mouths)
+
+    def show_random_mouths(self, items, error):
+        self.random_busy = False
+        if error:
+            print(f"生成失败: {error}")
+            return
         cols = int(512 / self.size)
         self.canvas_random.delete("all")
         self.random_imgs = []
         self.random_img_objs = []
-
-        for idx in range(num):
+        self.random_params = []
+        for idx, (params, img) in enumerate(items):
             x_offset = (idx % cols) * self.size
             y_offset = (idx // cols) * self.size
-            mouth_width = random.uniform(0.2, 0.8)
-            mouth_height = random.uniform(0.05, 0.4)
-            mouth_shape = random.choice(['line','circle','half_ellipse'])
-            img = generate_mouth(
-                size=self.size,
-                mouth_width_ratio=mouth_width,
-                mouth_height_ratio=mouth_height,
-                mouth_shape=mouth_shape
-            )
-            imgtk = ImageTk.PhotoImage(img)
+            with timed('photoimage', part='mouth'):
+                imgtk = ImageTk.PhotoImage(img)
             self.canvas_random.create_image(x_offset, y_offset, anchor='nw', image=imgtk)
             self.random_imgs.append(imgtk)
             self.random_img_objs.append(img)
+            self.random_params.append(params)
 
     def save_random_mouths_to_folder(self):
         if not hasattr(self, 'random_img_objs') or not self.random_img_objs:
@@ -142,13 +135,27 @@ class MouthGenerator:
             return
         timestamp_folder = datetime.now().strftime("%Y%m%d_%H%M%S")
         folder_name = os.path.join(self.save_folder, f"random_mouths_{timestamp_folder}")
-        os.makedirs(folder_name, exist_ok=True)
-        for idx, img in enumerate(self.random_img_objs, start=1):
-            img.save(os.path.join(folder_name, f"mouth_{idx}.png"))
-        print(f"已保存 {len(self.random_img_objs)} 个随机嘴巴到文件夹 {folder_name}")
+        # 编码写盘在后台线程完成，窗口不会卡住
+        exporter = PngExporter(folder_name, "mouth", start=1, library=True)
+        for img, params in zip(self.random_img_objs, self.random_params):
+            exporter.submit(img, params=params)
+        exporter.close_async(lambda n, err: print(f"保存失败: {err}") if err else
+                             print(f"已保存 {n} 个随机嘴巴到文件夹 {folder_name}"))
+
+    def save_random_mouths_atlas(self):
+        if not hasattr(self, 'random_img_objs') or not self.random_img_objs:
+            print("没有随机嘴巴可保存，请先生成。")
+            return
+        timestamp_folder = datetime.now().strftime("%Y%m%d_%H%M%S")
+        folder_name = os.path.join(self.save_folder, f"random_mouths_atlas_{timestamp_folder}")
+        with AtlasWriter(folder_name, name="mouth_atlas", trim=True) as atlas:
+            for idx, (img, params) in enumerate(zip(self.random_img_objs, self.random_params), start=1):
+                atlas.add(f"mouth_{idx}", img, params)
+        print(f"已将 {len(self.random_img_objs)} 个随机嘴巴打包为图集 {folder_name}")
 
 # ===================== 运行 =====================
 if __name__=="__main__":
+    serve_from_env()
     root = tk.Tk()
     app = MouthGenerator(root)
     root.mainloop()
@@ -1,69 +1,19 @@
 import tkinter as tk
 from tkinter import colorchooser, ttk
-from PIL import Image, ImageDraw, ImageTk
+from PIL import ImageTk
 import os
-import random
+import sys
 from datetime import datetime
+from functools import partial
 
-# =================== 鼻子绘制函数 ===================
-def draw_circle(draw, center, size, fill_color, outline_color):
-    x, y = center
-    r = size // 2
-    draw.ellipse((x-r, y-r, x+r, y+r), fill=fill_color, outline=outline_color)
-
-def draw_triangle(draw, center, size, fill_color, outline_color):
-    x, y = center
-    half = size // 2
-    draw.polygon([(x, y-half), (x-half, y+half), (x+half, y+half)], fill=fill_color, outline=outline_color)
-
-def draw_square(draw, center, size, fill_color, outline_color):
-    x, y = center
-    half = size // 2
-    draw.rectangle((x-half, y-half, x+half, y+half), fill=fill_color, outline=outline_color)
-
-def draw_trapezoid(draw, center, size, fill_color, outline_color):
-    x, y = center
-    half = size // 2
-    h = size // 2
-    draw.polygon([(x-half, y+h), (x+half, y+h), (x+half//2, y-h), (x-half//2, y-h)], fill=fill_color, outline=outline_color)
-
-NOSE_SHAPES = {"圆鼻": draw_circle, "三角鼻": draw_triangle, "方鼻": draw_square, "梯形鼻": draw_trapezoid}
-
-# =================== 鼻孔绘制函数 ===================
-def draw_hole(draw, center, size, shape="圆形", hole_color=(0,0,0)):
-    x, y = center
-    r = size // 2
-    if shape == "圆形":
-        draw.ellipse((x-r, y-r, x+r, y+r), fill=hole_color)
-    elif shape == "方形":
-        draw.rectangle((x-r, y-r, x+r, y+r), fill=hole_color)
-    elif shape == "三角形":
-        draw.polygon([(x, y-r), (x-r, y+r), (x+r, y+r)], fill=hole_color)
-
-# =================== 核心生成 ===================
-def generate_nose(
-    shape="圆鼻",
-    fill_color=(255,182,193),
-    outline_color=(0,0,0),
-    has_holes=True,
-    hole_shape="圆形",
-    hole_size=20,
-    hole_offset=40,
-    hole_vertical_offset=0,
-    hole_color=(0,0,0)
-):
-    size = 300
-    img = Image.new("RGBA", (size, size), (255,255,255,0))
-    draw = ImageDraw.Draw(img)
-    func = NOSE_SHAPES.get(shape, draw_circle)
-    func(draw, (size//2, size//2), size//2, fill_color, outline_color)
-
-    if has_holes:
-        y = size//2 + hole_vertical_offset
-        x = size//2
-        draw_hole(draw, (x - hole_offset, y), hole_size, hole_shape, hole_color)
-        draw_hole(draw, (x + hole_offset, y), hole_size, hole_shape, hole_color)
-    return img
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from wwgenerator.atlas import AtlasWriter
+from wwgenerator.cache import RenderCache
+from wwgenerator.dedup import DedupIndex, unique
+from wwgenerator.export import PngExporter
+from wwgenerator.metrics import serve_from_env, timed
+from wwgenerator.nose import HOLE_SHAPES, NOSE_SHAPES, generate_nose, random_nose_params
+from wwgenerator.preview import PreviewRenderer, run_in_background
 
 # =================== GUI ===================
 class NoseGenerator:
@@ -74,6 +24,11 @@ class NoseGenerator:
         self.nose_fill_color = (255,182,193)
         self.nose_outline_color = (0,0,0)
         self.nose_hole_color = (0,0,0)
+        self.cache = RenderCache()
+        self.custom_exporter = None
+        self.random_busy = False
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.preview = PreviewRenderer(root, partial(self.cache.get, generate_nose), self.show_custom)
 
         notebook = ttk.Notebook(root)
         notebook.pack(fill="both", expand=True)
@@ -105,7 +60,7 @@ class NoseGenerator:
         tk.Checkbutton(frame, text="显示鼻孔", variable=self.hole_var).pack()
 
         ttk.Label(frame, text="鼻孔形状").pack()
-        self.combo_hole_shape = ttk.Combobox(frame, values=["圆形","方形","三角形"], state="readonly")
+        self.combo_hole_shape = ttk.Combobox(frame, values=list(HOLE_SHAPES), state="readonly")
         self.combo_hole_shape.set("圆形")
         self.combo_hole_shape.pack()
 
@@ -141,12 +96,14 @@ class NoseGenerator:
 
         tk.Button(frame, text="生成随机鼻子", command=self.generate_random_noses).grid(row=0,column=2)
         tk.Button(frame, text="导出随机鼻子", command=self.save_random_noses).grid(row=0,column=3)
+        tk.Button(frame, text="导出为图集", command=self.save_random_noses_atlas).grid(row=0,column=4)
 
         self.canvas_random = tk.Canvas(frame, width=600, height=600, bg="white")
-        self.canvas_random.grid(row=1,column=0,columnspan=4)
+        self.canvas_random.grid(row=1,column=0,columnspan=5)
 
         self.random_imgs = []
         self.random_img_objs = []
+        self.random_params = []
 
     # ========== 共用功能 ==========
     def choose_color(self, target):
@@ -159,8 +116,8 @@ class NoseGenerator:
         self.update_canvas_custom()
 
     # ========== 自定义页面功能 ==========
-    def update_canvas_custom(self):
-        img = generate_nose(
+    def custom_params(self):
+        return dict(
             shape=self.combo_shape.get(),
             fill_color=self.nose_fill_color,
             outline_color=self.nose_outline_color,
@@ -171,72 +128,101 @@ class NoseGenerator:
             hole_vertical_offset=int(self.scale_hole_vertical.get()),
             hole_color=self.nose_hole_color
         )
-        self.tk_img_custom = ImageTk.PhotoImage(img)
+
+    def update_canvas_custom(self):
+        # 后台线程渲染，拖动时只渲染最新参数
+        self.preview.request(**self.custom_params())
+
+    def show_custom(self, img):
+        with timed('photoimage', part='nose'):
+            self.tk_img_custom = ImageTk.PhotoImage(img)
         self.canvas_custom.create_image(150,150,image=self.tk_img_custom)
 
     def generate_and_save_custom(self):
-        img = generate_nose(
-            shape=self.combo_shape.get(),
-            fill_color=self.nose_fill_color,
-            outline_color=self.nose_outline_color,
-            has_holes=self.hole_var.get()==1,
-            hole_shape=self.combo_hole_shape.get(),
-            hole_size=int(self.scale_hole_size.get()),
-            hole_offset=int(self.scale_hole_offset.get()),
-            hole_vertical_offset=int(self.scale_hole_vertical.get()),
-            hole_color=self.nose_hole_color
-        )
-        save_dir = os.path.join(os.getcwd(), "nose_images")
-        os.makedirs(save_dir, exist_ok=True)
-        idx = 1
-        while os.path.exists(os.path.join(save_dir, f"nose_{idx}.png")):
-            idx += 1
-        filename = os.path.join(save_dir, f"nose_{idx}.png")
-        img.save(filename)
-        print(f"已保存: {filename}")
+        img = self.cache.get(generate_nose, **self.custom_params())
+        if self.custom_exporter is None:
+            # 只在第一次保存时扫描目录确定编号，之后在内存中递增
+            self.custom_exporter = PngExporter(os.path.join(os.getcwd(), "nose_images"), "nose")
+        self.custom_exporter.submit(img, on_saved=self.report_saved)
+
+    def report_saved(self, path, error):
+        # 在编码线程中调用：文件真正写完（或失败）后才报告
+        if error:
+            print(f"保存失败: {path}: {error}")
+        else:
+            print(f"已保存: {path}")
+
+    def on_close(self):
+        # 等单张保存的队列写完再退出，失败已由 report_saved 报告
+        if self.custom_exporter is not None:
+            try:
+                self.custom_exporter.close()
+            except Exception:
+                pass
+        self.root.destroy()
 
     # ========== 随机生成功能 ==========
     def generate_random_noses(self):
+        if self.random_busy:
+            return
+        self.random_busy = True
         num = self.random_num_var.get()
+
+        def work():
+            # 无鼻孔时鼻孔参数全部无效，随机采样重复很多：去掉近似重复的再显示；
+            # 去重可能要试很多次，放在工作线程里，窗口不会卡住
+            samples = ((p, generate_nose(**p)) for p in iter(random_nose_params, None))
+            return list(unique(samples, DedupIndex('nose'), num))
+        run_in_background(self.root, work, self.show_random_noses)
+
+    def show_random_noses(self, items, error):
+        self.random_busy = False
+        if error:
+            print(f"生成失败: {error}")
+            return
         self.random_imgs.clear()
         self.random_img_objs.clear()
+        self.random_params.clear()
         self.canvas_random.delete("all")
 
         cols = 3
         size = 200
-        for idx in range(num):
-            shape = random.choice(list(NOSE_SHAPES.keys()))
-            fill_color = tuple(random.randint(150,255) for _ in range(3))
-            outline_color = tuple(random.randint(0,50) for _ in range(3))
-            hole_color = tuple(random.randint(0,50) for _ in range(3))
-            hole_shape = random.choice(["圆形","方形","三角形"])
-            has_holes = random.choice([True,False])
-            hole_size = random.randint(5,50)
-            hole_offset = random.randint(10,50)
-            hole_vertical_offset = random.randint(-20,20)
-
-            img = generate_nose(shape, fill_color, outline_color, has_holes, hole_shape,
-                                hole_size, hole_offset, hole_vertical_offset, hole_color)
-            imgtk = ImageTk.PhotoImage(img)
+        for idx, (params, img) in enumerate(items):
+            with timed('photoimage', part='nose'):
+                imgtk = ImageTk.PhotoImage(img)
             x_offset = (idx % cols) * size
             y_offset = (idx // cols) * size
             self.canvas_random.create_image(x_offset, y_offset, anchor='nw', image=imgtk)
             self.random_imgs.append(imgtk)
             self.random_img_objs.append(img)
+            self.random_params.append(params)
 
     def save_random_noses(self):
         if not self.random_img_objs:
             print("请先生成随机鼻子")
             return
         folder = os.path.join(os.getcwd(), "random_noses_" + datetime.now().strftime("%Y%m%d_%H%M%S"))
-        os.makedirs(folder, exist_ok=True)
-        for idx, img in enumerate(self.random_img_objs, start=1):
-            img.save(os.path.join(folder, f"nose_{idx}.png"))
-        print(f"已保存 {len(self.random_img_objs)} 个随机鼻子到 {folder}")
+        # 编码写盘在后台线程完成，窗口不会卡住
+        exporter = PngExporter(folder, "nose", start=1, library=True)
+        for img, params in zip(self.random_img_objs, self.random_params):
+            exporter.submit(img, params=params)
+        exporter.close_async(lambda n, err: print(f"保存失败: {err}") if err else
+                             print(f"已保存 {n} 个随机鼻子到 {folder}"))
+
+    def save_random_noses_atlas(self):
+        if not self.random_img_objs:
+            print("请先生成随机鼻子")
+            return
+        folder = os.path.join(os.getcwd(), "random_noses_atlas_" + datetime.now().strftime("%Y%m%d_%H%M%S"))
+        with AtlasWriter(folder, name="nose_atlas", trim=True) as atlas:
+            for idx, (img, params) in enumerate(zip(self.random_img_objs, self.random_params), start=1):
+                atlas.add(f"nose_{idx}", img, params)
+        print(f"已将 {len(self.random_img_objs)} 个随机鼻子打包为图集 {folder}")
 
 
 # =================== 运行 ===================
 if __name__=="__main__":
+    serve_from_env()
     root = tk.Tk()
     app = NoseGenerator(root)
     root.mainloop()
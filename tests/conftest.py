@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 仓库没有安装配置，与 GUI 脚本一样把仓库根目录放进 sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,93 @@
+"""
+normal 画质的输出与重构前（逐圈 ImageDraw 绘制的原始 GUI 脚本）逐像素一致。
+GOLDEN 为原始实现在下列参数组合上的像素摘要；绘制代码改动后这里失败，说明画面变了。
+"""
+import hashlib
+import itertools
+
+import pytest
+
+from wwgenerator import eyeball, generate_eyeball, generate_face, generate_mouth, generate_nose
+
+IRIS_COLORS = [(0, 128, 255), (200, 40, 90, 128)]
+
+def eyeball_cases():
+    for size, tex, pupil, ratio, highlight, color in itertools.product(
+            (33, 128), ('radial', 'spokes', 'wavy', 'rings', 'none'),
+            ('circle', 'ellipse', 'slit', 'cat'), (0.3, 0.45, 0.6), (True, False), IRIS_COLORS):
+        yield dict(size=size, iris_radius_ratio=ratio, pupil_radius_ratio=0.35,
+                   iris_color=color, sclera_color=(250, 245, 240), pupil_color=(10, 20, 30),
+                   pupil_shape=pupil, iris_texture=tex, highlight=highlight)
+
+FEATURES = {'eye_w': 20, 'eye_h': 9, 'eye_offset_x': 40, 'nose_w': 10, 'nose_h': 15,
+            'mouth_w': 60, 'mouth_h': 10}
+
+def face_cases():
+    shapes = ('椭圆脸', '圆脸', '方脸', '三角脸', '倒三角脸', '菱形脸')
+    for shape, feat, size in itertools.product(shapes, (False, True), (40, 150)):
+        yield dict(shape=shape, skin_color=(230, 200, 180), outline_color=(20, 10, 0), size=size,
+                   params=dict(FEATURES) if feat else {}, with_features=feat)
+    yield dict(shape='椭圆脸', params={'width_ratio': 1.45})
+
+def nose_cases():
+    shapes = ('圆鼻', '三角鼻', '方鼻', '梯形鼻')
+    for shape, hole, has_holes in itertools.product(shapes, ('圆形', '方形', '三角形'), (True, False)):
+        yield dict(shape=shape, fill_color=(240, 190, 170), outline_color=(30, 20, 10),
+                   has_holes=has_holes, hole_shape=hole, hole_size=18, hole_offset=35,
+                   hole_vertical_offset=12, hole_color=(5, 5, 5))
+
+def mouth_cases():
+    for size, shape, w, h in itertools.product((64, 128), ('line', 'circle', 'half_ellipse'),
+                                               (0.3, 0.7), (0.1, 0.35)):
+        yield dict(size=size, mouth_width_ratio=w, mouth_height_ratio=h, mouth_shape=shape)
+
+CASES = {
+    'eyeball': (generate_eyeball, eyeball_cases),
+    'face': (generate_face, face_cases),
+    'nose': (generate_nose, nose_cases),
+    'mouth': (generate_mouth, mouth_cases),
+}
+
+def digest(generate, cases):
+    h = hashlib.sha1()
+    for params in cases():
+        img = generate(**params)
+        h.update(f"{img.mode}{img.size}".encode())
+        h.update(img.tobytes())
+    return h.hexdigest()
+
+GOLDEN = {
+    'eyeball': '6f56dcbf00e472c5e466955c5fa3962372d84835',
+    'face': '14f173e54d2b00443a45e0025fe96b19b0a24a0f',
+    'nose': '9068700d0ef83f8353091186291d6a85ae8955aa',
+    'mouth': '756cb7750b16d7a0612581c89d6c3c1a9512f194',
+}
+
+def test_eyeball_matches_baseline():
+    assert digest(*CASES['eyeball']) == GOLDEN['eyeball']
+
+@pytest.mark.parametrize('part', ['face', 'nose', 'mouth'])
+def test_normal_quality_matches_baseline(part):
+    generate, cases = CASES[part]
+    assert digest(generate, cases) == GOLDEN[part]
+    assert digest(lambda **p: generate(quality='normal', **p), cases) == GOLDEN[part]
+
+@pytest.mark.parametrize('part', sorted(CASES))
+def test_supersampled_keeps_canvas(part):
+    """超采样只改变边缘抗锯齿：画布尺寸不变，画面与 normal 不同"""
+    generate, cases = CASES[part]
+    params = next(cases())
+    normal, high = generate(**params), generate(quality='high', **params)
+    assert high.size == normal.size and high.mode == normal.mode
+    assert high.tobytes() != normal.tobytes()
+
+def test_eyeball_cache_hit_matches_cold_render():
+    """几何缓存命中时与冷缓存渲染一致，且返回的图像不共享缓存中的缓冲区"""
+    params = dict(size=96, iris_texture='wavy', iris_radius_ratio=0.5)
+    for cached in (eyeball.eye_label_map, eyeball.iris_ring_map):
+        cached.cache_clear()
+    cold = generate_eyeball(**params).tobytes()
+    first = generate_eyeball(**params)
+    first.putpixel((48, 48), (1, 2, 3, 4))
+    assert generate_eyeball(**params).tobytes() == cold
+    assert eyeball.eye_label_map.cache_info().hits >= 2
@@ -0,0 +1,43 @@
+from wwgenerator import batch
+from wwgenerator import cache as cache_module
+from wwgenerator.cache import RenderCache, cache_key
+from wwgenerator.face import generate_face
+from wwgenerator.mouth import generate_mouth
+
+def test_key_fills_defaults():
+    """写不写默认值、参数顺序不同，得到同一个键；不同生成函数、不同值得到不同的键"""
+    assert cache_key(generate_mouth) == cache_key(generate_mouth, size=128, mouth_shape='line')
+    assert cache_key(generate_mouth, size=64, mouth_shape='circle') == \
+        cache_key(generate_mouth, mouth_shape='circle', size=64)
+    assert cache_key(generate_mouth, size=64) != cache_key(generate_mouth, size=65)
+    assert cache_key(generate_face, size=64) != cache_key(generate_mouth, size=64)
+
+def test_key_includes_code_version(monkeypatch):
+    """绘制代码改动（版本变化）后旧的磁盘缓存不再命中"""
+    key = cache_key(generate_mouth)
+    monkeypatch.setattr(cache_module, 'code_version', lambda: 'other')
+    assert cache_key(generate_mouth) != key
+
+def test_memory_hit_and_disk_roundtrip(tmp_path):
+    cache = RenderCache(disk_dir=str(tmp_path))
+    params = dict(shape='圆脸', size=40, params={'eye_w': 5}, with_features=True)
+    first = cache.get(generate_face, **params)
+    assert cache.get(generate_face, **params) is first
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+    other = RenderCache(disk_dir=str(tmp_path))
+    again = other.get(generate_face, **params)
+    assert other.stats()['disk_hits'] == 1
+    assert again.tobytes() == first.tobytes()
+
+def test_memory_limit_evicts():
+    cache = RenderCache(max_bytes=3 * 64 * 64 * 4)
+    for size in (64, 65, 66, 67, 68):
+        cache.get(generate_mouth, size=64, mouth_width_ratio=size / 100)
+    stats = cache.stats()
+    assert stats['bytes'] <= stats['max_bytes'] and stats['evictions'] == 2
+
+def test_batch_workers_skip_cache_without_dir(tmp_path):
+    assert batch._worker_render(generate_mouth, None) is generate_mouth
+    render = batch._worker_render(generate_mouth, str(tmp_path))
+    assert render(size=32).tobytes() == generate_mouth(size=32).tobytes()
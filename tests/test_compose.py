@@ -0,0 +1,41 @@
+"""
+整脸合成：眼睛按 layout 定位，超出画布的部分被裁掉而不是被挪回画布内。
+参照图先在四周留白的大画布上合成眼睛，再裁回原画布大小。
+"""
+import pytest
+from PIL import Image
+
+from wwgenerator import compose_character, generate_eyeball
+
+FACE = dict(shape='圆脸', skin_color=(230, 200, 180), outline_color=(20, 10, 0), size=150)
+EYES = dict(iris_color=(0, 128, 255), iris_texture='spokes', pupil_shape='cat')
+
+def reference(layout):
+    """不裁剪、不挪动：在留白画布上按 layout 的位置合成两只眼睛，再裁回原画布"""
+    size = FACE['size']
+    base = compose_character(FACE, layout=layout)
+    lay = {'eye_size': size//3, 'eye_offset_x': size//3, 'eye_offset_y': -size//6, **layout}
+    e = lay['eye_size']
+    eye = generate_eyeball(size=e, **EYES)
+    pad = 2*size
+    canvas = Image.new("RGBA", (base.width + 2*pad, base.height + 2*pad), (255, 255, 255, 0))
+    canvas.paste(base, (pad, pad))
+    ey = size + lay['eye_offset_y'] - e//2
+    for ex in (size - lay['eye_offset_x'], size + lay['eye_offset_x']):
+        canvas.alpha_composite(eye, dest=(pad + ex - e//2, pad + ey))
+    return canvas.crop((pad, pad, pad + base.width, pad + base.height))
+
+@pytest.mark.parametrize('layout', [
+    {},
+    {'eye_offset_x': 140},                       # 左右两眼各自越过左右边缘
+    {'eye_offset_y': -140},                      # 两眼越过上边缘
+    {'eye_offset_y': 140},                       # 两眼越过下边缘
+    {'eye_offset_x': 140, 'eye_offset_y': -140}, # 越过两个角
+    {'eye_offset_x': 400},                       # 整只眼都在画布左右之外
+    {'eye_offset_y': -400},                      # 整只眼都在画布上方
+    {'eye_offset_y': 400},                       # 整只眼都在画布下方
+])
+def test_eyes_stay_at_layout_position(layout):
+    img = compose_character(FACE, EYES, layout=layout)
+    assert img.size == (300, 300)
+    assert img.tobytes() == reference(layout).tobytes()
@@ -0,0 +1,27 @@
+import pytest
+
+from wwgenerator.crowd import Crowd, grid_layout
+
+def test_grid_layout_fits_canvas():
+    layout = grid_layout(7, 800, 600)
+    assert len(layout) == 7
+    assert len({(x, y) for x, y, _ in layout}) == 7
+    assert all(0 < s <= 1 for _, _, s in layout)
+    assert grid_layout(0, 800, 600) == []
+
+def test_empty_crowd_renders_background():
+    crowd = Crowd(0, seed=1, size=(40, 30))
+    crowd.step()
+    img = crowd.render()
+    assert img.size == (40, 30) and img.getcolors() == [(1200, (255, 255, 255, 255))]
+
+def test_negative_crowd_rejected():
+    with pytest.raises(ValueError):
+        Crowd(-1)
+    with pytest.raises(ValueError):
+        grid_layout(-1, 10, 10)
+
+def test_seeded_crowd_is_reproducible():
+    a, b = Crowd(50, seed=3), Crowd(50, seed=3)
+    a.step(), b.step()
+    assert a.render().tobytes() == b.render().tobytes()
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from wwgenerator.dataset import load_dataset, run_dataset, write_rows
+from wwgenerator.face import generate_face
+from wwgenerator.sampling import FaceSampler, SAMPLERS
+
+def make(folder, count=20, **kwargs):
+    kwargs = dict(dict(seed=2, size=16, workers=1, chunk_size=8), **kwargs)
+    return run_dataset('face', count, str(folder), **kwargs)
+
+def test_create_writes_every_row(tmp_path):
+    assert make(tmp_path) == 20
+    ds = load_dataset(str(tmp_path))
+    assert ds.images.shape == (20, 32, 32, 4) and ds.written.all() and ds.labels is None
+    sampler = FaceSampler(2, size=16)
+    for row in (0, 7, 19):
+        params = sampler.sample(row + 1)
+        assert np.array_equal(ds.images[row], np.asarray(generate_face(**params)))
+        assert ds.params['shape'][row] == params['shape']
+
+def test_shape_conditional_params_are_kept(tmp_path):
+    """seed=2 的第一个样本不是椭圆脸，之后椭圆脸的 width_ratio 仍要写进参数表"""
+    make(tmp_path, count=40)
+    ds = load_dataset(str(tmp_path))
+    assert ds.params['shape'][0] != '椭圆脸'
+    oval = ds.params['shape'] == '椭圆脸'
+    assert oval.any()
+    assert not np.isnan(ds.params['params.width_ratio'][oval]).any()
+    assert np.isnan(ds.params['params.width_ratio'][~oval]).all()
+
+def test_resume_fills_only_missing_rows(tmp_path):
+    make(tmp_path)
+    ds = load_dataset(str(tmp_path), mode="r+")
+    expected = np.array(ds.images)
+    ds.images[5:9] = 0
+    ds.written[5:9] = False
+    ds.images.flush(), ds.written.flush()
+    del ds
+    assert make(tmp_path) == 4
+    assert np.array_equal(load_dataset(str(tmp_path)).images, expected)
+    assert make(tmp_path) == 0
+
+def test_rows_and_extend(tmp_path):
+    assert make(tmp_path, rows=(4, 10)) == 6
+    written = load_dataset(str(tmp_path)).written
+    assert written.sum() == 6 and written[4:10].all()
+    assert make(tmp_path) == 14
+    before = np.array(load_dataset(str(tmp_path)).images)
+    assert make(tmp_path, count=30) == 10
+    ds = load_dataset(str(tmp_path))
+    assert ds.images.shape[0] == 30 and ds.written.all() and ds.meta['count'] == 30
+    assert np.array_equal(ds.images[:20], before)
+
+@pytest.mark.parametrize('change', [{'seed': 3}, {'size': 20}, {'quality': 'high'},
+                                    {'labels': True}])
+def test_resume_rejects_different_settings(tmp_path, change):
+    make(tmp_path)
+    with pytest.raises(ValueError):
+        make(tmp_path, **change)
+    with pytest.raises(ValueError):
+        make(tmp_path, count=10)
+
+def test_labels_resume_requires_labels(tmp_path):
+    make(tmp_path, labels=True)
+    assert load_dataset(str(tmp_path)).labels.shape == (20, 32, 32)
+    with pytest.raises(ValueError):
+        make(tmp_path, labels=False)
+
+def test_write_rows_rejects_unknown_keys(tmp_path):
+    make(tmp_path, count=4)
+    ds = load_dataset(str(tmp_path), mode="r+")
+    with pytest.raises(ValueError):
+        write_rows(ds.params, [(0, {'shape': '圆脸', 'unknown': 1})], ds.meta['fields'])
+
+@pytest.mark.parametrize('part', ['face', 'character'])
+def test_template_covers_every_sample(part):
+    sampler = SAMPLERS[part](2)
+    face = lambda p: p if part == 'face' else p['face']
+    keys = set(face(sampler.template(1))['params'])
+    assert 'width_ratio' in keys
+    assert all(set(face(sampler.sample(i))['params']) <= keys for i in range(1, 200))
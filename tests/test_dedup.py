@@ -0,0 +1,45 @@
+from PIL import Image
+
+from wwgenerator.dedup import DedupIndex, dhash, iter_distinct, unique
+from wwgenerator.mouth import generate_mouth
+from wwgenerator.nose import generate_nose
+
+def test_dhash_ignores_color_but_sees_shape():
+    a = generate_mouth(mouth_shape='circle')
+    b = generate_mouth(mouth_shape='line')
+    assert dhash(a) == dhash(a.copy())
+    assert dhash(a) != dhash(b)
+    assert dhash(Image.new("RGBA", (32, 32), (255, 0, 0, 255))) == \
+        dhash(Image.new("RGBA", (32, 32), (0, 0, 255, 255)))
+
+def test_near_values_across_old_bucket_edge_are_duplicates():
+    """0.4099 与 0.4101 量化到 0.02 的格子时分在两侧，按容差比较应判为重复"""
+    index = DedupIndex('mouth')
+    a = dict(size=128, mouth_width_ratio=0.4099, mouth_height_ratio=0.2, mouth_shape='half_ellipse')
+    b = dict(a, mouth_width_ratio=0.4101)
+    assert index.add(a, generate_mouth(**a))
+    assert not index.add(b, generate_mouth(**b))
+    assert (index.checked, index.duplicates, len(index)) == (2, 1, 1)
+
+def test_discrete_params_and_colors_separate():
+    index = DedupIndex('nose')
+    base = dict(shape='圆鼻', fill_color=(240, 190, 170), has_holes=False)
+    assert index.add(base, generate_nose(**base))
+    recolored = dict(base, fill_color=(100, 190, 170))
+    assert index.add(recolored, generate_nose(**recolored))
+    reshaped = dict(base, shape='方鼻')
+    assert index.add(reshaped, generate_nose(**reshaped))
+    # 无鼻孔时鼻孔参数不影响画面，不参与比较
+    holes = dict(base, hole_size=40, hole_shape='方形')
+    assert not index.add(holes, generate_nose(**holes))
+
+def test_unique_stops_at_n_and_on_patience():
+    items = [({'mouth_shape': 'line'}, generate_mouth(mouth_shape='line'))] * 10
+    assert len(list(unique(iter(items), DedupIndex('mouth'), n=5))) == 1
+    assert len(list(unique(iter(items), DedupIndex('mouth'), patience=3))) == 1
+
+def test_iter_distinct_has_no_near_duplicates():
+    found = list(iter_distinct('mouth', seed=1, n=60, size=64))
+    assert len(found) == 60
+    check = DedupIndex('mouth')
+    assert all(check.add(p, img) for p, img in found)
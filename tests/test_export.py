@@ -0,0 +1,41 @@
+import os
+
+import pytest
+from PIL import Image
+
+from wwgenerator.export import PngExporter, next_free_index
+
+def test_numbering_continues_after_existing_files(tmp_path):
+    Image.new("RGBA", (2, 2)).save(tmp_path / "eye_7.png")
+    assert next_free_index(str(tmp_path), "eye") == 8
+    with PngExporter(str(tmp_path), "eye") as exporter:
+        assert exporter.submit(Image.new("RGBA", (2, 2))).endswith("eye_8.png")
+
+def test_on_saved_reports_after_write(tmp_path):
+    done = []
+    exporter = PngExporter(str(tmp_path), "x", start=1)
+    for _ in range(50):
+        exporter.submit(Image.new("RGBA", (4, 4)),
+                        on_saved=lambda path, err: done.append((os.path.exists(path), err)))
+    assert exporter.close() == 50
+    assert done == [(True, None)] * 50
+
+def test_errors_reach_callback_and_close(tmp_path):
+    errors = []
+    exporter = PngExporter(str(tmp_path), "x", start=1)
+    exporter.submit(Image.new("RGBA", (4, 4)), pnginfo="not a PngInfo",
+                    on_saved=lambda path, err: errors.append(err))
+    exporter.submit(Image.new("RGBA", (4, 4)))
+    with pytest.raises(Exception):
+        exporter.close()
+    assert len(errors) == 1 and errors[0] is not None
+    assert exporter.saved == 1
+
+def test_finished_futures_are_pruned(tmp_path):
+    exporter = PngExporter(str(tmp_path), "x", start=1, workers=1)
+    for _ in range(200):
+        exporter.submit(Image.new("RGBA", (2, 2)))
+    exporter._pool.submit(lambda: None).result()
+    exporter.submit(Image.new("RGBA", (2, 2)))
+    assert len(exporter._futures) <= 2
+    exporter.close()
@@ -0,0 +1,32 @@
+import numpy as np
+
+from wwgenerator import eyeball
+from wwgenerator.cache import byte_lru_cache
+from wwgenerator.sampling import EyeballSampler
+
+def test_byte_lru_evicts_by_bytes():
+    calls = []
+
+    @byte_lru_cache(3000)
+    def make(n):
+        calls.append(n)
+        return np.zeros(n, dtype=np.uint8)
+
+    make(1000), make(1000), make(1500)
+    info = make.cache_info()
+    assert (info.hits, info.misses, info.items, info.bytes) == (1, 2, 2, 2500)
+    make(1200)                      # 超出上限，淘汰最久未用的 1000
+    assert make.cache_info().bytes == 2700
+    make(1000)
+    assert calls == [1000, 1500, 1200, 1000]
+    make(5000)                      # 单个结果超过上限时不缓存
+    assert make.cache_info().items == 2
+
+def test_random_batch_misses_only_on_first_use():
+    """128 px 的随机批次，标号图的全部键都装得下：未命中次数等于不同键的个数"""
+    eyeball.eye_label_map.cache_clear()
+    keys = set()
+    for _, p in EyeballSampler(1, size=128).samples(1, 1001):
+        eyeball.generate_eyeball(**p)
+        keys.add((int(p['iris_radius_ratio'] * 128), p['iris_texture']))
+    assert eyeball.eye_label_map.cache_info().misses == len(keys)
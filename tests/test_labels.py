@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from wwgenerator.eyeball import generate_eyeball
+from wwgenerator.face import generate_face
+from wwgenerator.labels import (EYEBALL_CLASSES, FACE_CLASSES, generate_with_labels, label_path)
+from wwgenerator.sampling import SAMPLERS
+
+GENERATE = {'eyeball': generate_eyeball, 'face': generate_face}
+CLASSES = {'eyeball': EYEBALL_CLASSES, 'face': FACE_CLASSES}
+
+@pytest.mark.parametrize('part', ['eyeball', 'face'])
+def test_image_matches_plain_render_and_mask_covers_it(part):
+    """带类别图的渲染与普通渲染逐像素一致；背景类恰好是透明像素"""
+    for _, params in SAMPLERS[part](5, size=48).samples(1, 40):
+        img, mask = generate_with_labels(part, **params)
+        assert img.tobytes() == GENERATE[part](**params).tobytes()
+        assert mask.mode == "L" and mask.size == img.size
+        m, alpha = np.asarray(mask), np.asarray(img)[..., 3]
+        assert m.max() < len(CLASSES[part])
+        assert np.array_equal(m == 0, alpha == 0)
+
+def test_eyeball_classes_follow_drawing_order():
+    params = dict(size=64, iris_radius_ratio=0.45, pupil_radius_ratio=0.5, iris_texture='none',
+                  pupil_shape='circle', highlight=True)
+    _, mask = generate_with_labels('eyeball', **params)
+    m = np.asarray(mask)
+    names = {EYEBALL_CLASSES[v] for v in np.unique(m)}
+    assert names == set(EYEBALL_CLASSES)
+    assert EYEBALL_CLASSES[m[32, 32]] == 'pupil'
+    assert EYEBALL_CLASSES[m[32, 2]] == 'sclera'
+
+def test_face_features_class_only_with_features():
+    base = dict(shape='圆脸', size=40)
+    _, plain = generate_with_labels('face', **base)
+    _, featured = generate_with_labels('face', with_features=True, **base)
+    features = FACE_CLASSES.index('features')
+    assert not (np.asarray(plain) == features).any()
+    assert (np.asarray(featured) == features).any()
+
+def test_label_path():
+    assert label_path("out/eye_12.png") == "out/eye_12_label.png"
+    with pytest.raises(ValueError):
+        generate_with_labels('mouth')
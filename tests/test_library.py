@@ -0,0 +1,63 @@
+import pytest
+from PIL import Image
+
+from wwgenerator.__main__ import _key_values, _where_value
+from wwgenerator.atlas import AtlasWriter
+from wwgenerator.batch import run_batch
+from wwgenerator.library import AssetLibrary, flatten_params
+
+@pytest.mark.parametrize('text, value', [
+    ('cat', 'cat'),
+    ('3', 3.0),
+    ('0.5', 0.5),
+    ('true', 1.0),
+    ('False', 0.0),
+    ('180:260', (180.0, 260.0)),
+    (':0.4', (None, 0.4)),
+    ('0.4:', (0.4, None)),
+    ('cat,slit', ['cat', 'slit']),
+    ('1,2', [1.0, 2.0]),
+    ('true,false', [1.0, 0.0]),
+])
+def test_where_value(text, value):
+    assert _where_value(text) == value
+
+def test_key_values_splits_on_first_equals():
+    assert _key_values(['eyes.iris_color.h=180:260', 'shape=a=b'], _where_value) == \
+        {'eyes.iris_color.h': (180.0, 260.0), 'shape': 'a=b'}
+
+def test_flatten_params_expands_colors():
+    rows = dict((k, (n, t)) for k, n, t in flatten_params(
+        {'iris_color': (0, 0, 255), 'highlight': True, 'face': {'shape': '圆脸'}}))
+    assert rows['iris_color.b'] == (255, None)
+    assert rows['iris_color.h'] == (240.0, None)
+    assert rows['highlight'] == (1.0, None)
+    assert rows['face.shape'] == (None, '圆脸')
+
+@pytest.fixture
+def indexed(tmp_path):
+    run_batch('eyeball', 40, str(tmp_path), seed=3, workers=1, size=32, index=True, labels=True)
+    return tmp_path
+
+def test_find_matches_cli_conditions(indexed):
+    with AssetLibrary(str(indexed)) as lib:
+        everything = lib.find()
+        assert len(everything) == 40
+        on = lib.find(where={'highlight': _where_value('true')})
+        assert on == lib.find(where={'highlight': _where_value('1')})
+        assert all(row['params']['highlight'] for row in on)
+        off = lib.find(where={'highlight': _where_value('false')})
+        assert len(on) + len(off) == 40
+        cats = lib.find(part='eyeball', pupil_shape='cat', iris_radius_ratio=(0.3, 0.45))
+        assert cats and all(r['params']['pupil_shape'] == 'cat' and
+                            0.3 <= r['params']['iris_radius_ratio'] <= 0.45 for r in cats)
+
+def test_scan_skips_label_masks_and_atlas_sheets(indexed):
+    with AtlasWriter(str(indexed), name="sheet") as atlas:
+        atlas.add("x", Image.new("RGBA", (4, 4), (255, 0, 0, 255)))
+    Image.new("RGBA", (4, 4)).save(indexed / "eye_99.png")
+    with AssetLibrary(str(indexed)) as lib:
+        assert lib.scan() == 1
+        paths = [r['path'] for r in lib.find()]
+    assert len(paths) == 41
+    assert not any(p.endswith(('_label.png', 'sheet_0.png')) for p in paths)
@@ -0,0 +1,34 @@
+import pytest
+
+from wwgenerator.eyeball import IRIS_TEXTURES, PUPIL_SHAPES, generate_eyeball
+from wwgenerator.mouth import generate_mouth
+from wwgenerator.sweep import LayeredEyeball, grid, linspace, sweep
+
+def test_linspace_and_grid_order():
+    assert linspace(0, 1, 3) == [0, 0.5, 1]
+    assert linspace(2, 5, 1) == [2]
+    combos = list(grid({'a': [1, 2], 'b': 'xy'}, base={'c': 0}))
+    assert combos == [{'c': 0, 'a': 1, 'b': 'x'}, {'c': 0, 'a': 1, 'b': 'y'},
+                      {'c': 0, 'a': 2, 'b': 'x'}, {'c': 0, 'a': 2, 'b': 'y'}]
+
+def test_layered_eyeball_matches_generate():
+    axes = {'iris_texture': IRIS_TEXTURES + ('none',), 'pupil_shape': PUPIL_SHAPES,
+            'pupil_radius_ratio': linspace(0.1, 0.6, 3), 'highlight': [True, False]}
+    base = {'size': 90, 'iris_color': (200, 40, 90, 128)}
+    for params, img in sweep('eyeball', axes, base):
+        assert img.tobytes() == generate_eyeball(**params).tobytes(), params
+
+def test_layered_eyeball_reuses_bases():
+    layered = LayeredEyeball(max_bases=2)
+    for shape in PUPIL_SHAPES:
+        layered.render(size=64, pupil_shape=shape)
+    assert layered.base_renders == 1
+    for tex in IRIS_TEXTURES:
+        layered.render(size=64, iris_texture=tex)
+    assert len(layered._bases) == 2
+
+def test_other_parts_call_generator():
+    for params, img in sweep('mouth', {'mouth_shape': ['line', 'circle']}, {'size': 48}):
+        assert img.tobytes() == generate_mouth(**params).tobytes()
+    with pytest.raises(ValueError):
+        next(sweep('ear', {}))
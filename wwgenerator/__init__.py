@@ -0,0 +1,56 @@
+"""
+WwGenerator 素材生成核心：不依赖 Tk 的纯生成函数。
+GUI 脚本（Eyeball/、Face/、Nose/、Mouth/、Character/）与命令行批量生成共用这里的实现。
+"""
+from .animator import Character, CharacterAnimator, save_animation, sprite_sheet
+from .atlas import AtlasWriter, load_atlas
+from .cache import RenderCache, cache_key
+from .compose import character_layers, compose_character, random_character_params
+from .export import PNG_PRESETS, PngExporter
+from .crowd import Crowd, grid_layout
+from .dataset import Dataset, load_dataset, run_dataset
+from .dedup import DedupIndex, dhash, iter_distinct, unique
+from .eyeball import generate_eyeball, random_eyeball_params
+from .face import generate_face, random_face_params
+from .labels import (EYEBALL_CLASSES, FACE_CLASSES, LABEL_GENERATORS, LabelDraw,
+                     generate_with_labels)
+from .library import AssetLibrary, pixel_hash
+from . import metrics
+from .metrics import timed
+from .mouth import generate_mouth, random_mouth_params
+from .nose import generate_nose, random_nose_params
+from .primitives import DisplayList
+from .sampling import (CharacterSampler, EyeballSampler, FaceSampler, MouthSampler,
+                       NoseSampler, ParamSampler, SAMPLERS)
+from .stream import (iter_random, iter_random_characters, iter_random_chunks, iter_random_eyeballs,
+                     iter_random_faces, iter_random_mouths, iter_random_noses)
+from .supersample import QUALITY_FACTORS, SupersampleDraw, make_draw
+from .svg import (SVG_GENERATORS, SvgDraw, generate_face_svg, generate_mouth_svg,
+                  generate_nose_svg)
+from .sweep import LayeredEyeball, grid, linspace, sweep
+from .trim import read_trim_meta, trim, untrim
+
+__all__ = [
+    'generate_eyeball', 'random_eyeball_params',
+    'generate_face', 'random_face_params',
+    'generate_mouth', 'random_mouth_params',
+    'generate_nose', 'random_nose_params',
+    'compose_character', 'random_character_params', 'character_layers',
+    'ParamSampler', 'EyeballSampler', 'FaceSampler', 'NoseSampler', 'MouthSampler',
+    'CharacterSampler',
+    'SAMPLERS',
+    'iter_random', 'iter_random_chunks', 'iter_random_eyeballs', 'iter_random_faces',
+    'iter_random_noses', 'iter_random_mouths', 'iter_random_characters',
+    'run_dataset', 'load_dataset', 'Dataset',
+    'DedupIndex', 'dhash', 'iter_distinct', 'unique',
+    'sweep', 'grid', 'linspace', 'LayeredEyeball',
+    'RenderCache', 'cache_key',
+    'AtlasWriter', 'load_atlas',
+    'Character', 'CharacterAnimator', 'sprite_sheet', 'save_animation', 'Crowd', 'grid_layout',
+    'trim', 'untrim', 'read_trim_meta',
+    'PngExporter', 'PNG_PRESETS', 'AssetLibrary', 'pixel_hash',
+    'make_draw', 'SupersampleDraw', 'QUALITY_FACTORS', 'DisplayList',
+    'generate_with_labels', 'LabelDraw', 'LABEL_GENERATORS', 'EYEBALL_CLASSES', 'FACE_CLASSES',
+    'metrics', 'timed',
+    'SvgDraw', 'generate_face_svg', 'generate_nose_svg', 'generate_mouth_svg', 'SVG_GENERATORS',
+]
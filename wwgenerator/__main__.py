@@ -0,0 +1,336 @@
+"""
+命令行入口：
+    python -m wwgenerator batch --part eyeball --count 1000 --workers 8 --out out/
+    python -m wwgenerator batch --part eyeball --seed 42 --start 501 --count 500 --out out/
+    python -m wwgenerator bench --out bench.json
+    python -m wwgenerator bench --compare old.json new.json
+    python -m wwgenerator animate --seed 7 --frames 24 --out walk.gif
+    python -m wwgenerator dataset --part eyeball --count 100000 --size 64 --seed 1 --out ds/
+    python -m wwgenerator sweep --part eyeball --axis iris_texture=radial,spokes pupil_shape=slit,cat --out sweep/
+    python -m wwgenerator index out/ --part eyeball --where pupil_shape=cat iris_color.h=180:260
+    python -m wwgenerator --metrics-json metrics.json batch --part face --count 500 --out out/
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from PIL import ImageColor
+
+from . import metrics
+from .animator import Character, CharacterAnimator, save_animation, sprite_sheet
+from .batch import PARTS, run_batch
+from .crowd import Crowd
+from .dataset import run_dataset
+from .dedup import run_distinct
+from .bench import DEFAULT_SIZES, compare, run_bench
+from .export import PNG_PRESETS, PngExporter
+from .labels import LABEL_GENERATORS
+from .library import AssetLibrary
+from .sampling import new_seed
+from .supersample import QUALITY_FACTORS
+from .svg import SVG_GENERATORS
+from .sweep import linspace, sweep
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="wwgenerator", description="WwGenerator 无界面素材生成")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="记录各阶段耗时，结束后写成 JSON 并在 stderr 打印汇总")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="运行期间在 127.0.0.1:PORT/metrics 提供 Prometheus 格式指标")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    batch = sub.add_parser("batch", help="批量随机生成部件 PNG")
+    batch.add_argument("--part", required=True, choices=list(PARTS), help="部件类型")
+    batch.add_argument("--count", type=int, required=True, help="生成数量")
+    batch.add_argument("--workers", type=int, default=None, help="工作进程数，默认 CPU 核数")
+    batch.add_argument("--out", required=True, help="输出文件夹")
+    batch.add_argument("--seed", type=int, default=None, help="批次随机种子，默认随机选取并打印")
+    batch.add_argument("--start", type=int, default=1, help="起始编号，用于分片或补生成")
+    batch.add_argument("--size", type=int, default=None, help="画布尺寸（鼻子固定 300，忽略此项；脸型、整脸为半高）")
+    batch.add_argument("--cache-dir", default=None, help="磁盘渲染缓存目录，重复参数直接复用")
+    batch.add_argument("--atlas", action="store_true", help="打包成图集 + JSON 清单，而不是每个部件一个 PNG")
+    batch.add_argument("--trim", action="store_true", help="裁掉透明边，并记录原画布中的偏移")
+    batch.add_argument("--png-preset", default="default", choices=list(PNG_PRESETS),
+                       help="PNG 压缩预设：fast 最快，small 最小")
+    batch.add_argument("--quality", default="normal", choices=list(QUALITY_FACTORS),
+                       help="渲染质量：high/ultra 为 4x/8x 超采样抗锯齿")
+    batch.add_argument("--format", default="png", choices=["png", "svg"],
+                       help=f"输出格式；svg 为矢量，仅支持 {'/'.join(SVG_GENERATORS)}")
+    batch.add_argument("--index", action="store_true",
+                       help="在输出文件夹写素材库索引 index.sqlite（参数、尺寸、像素哈希）")
+    batch.add_argument("--labels", action="store_true",
+                       help=f"每个部件旁另存类别图 *_label.png（仅 {'/'.join(LABEL_GENERATORS)}）")
+    batch.add_argument("--distinct", action="store_true",
+                       help="生成 count 个互不重复的部件（参数分桶 + 差值哈希去重），而不是 count 次采样")
+    batch.add_argument("--max-distance", type=int, default=4,
+                       help="去重时判定近似重复的最大哈希汉明距离（0~64）")
+    batch.add_argument("--chunk-size", type=int, default=64, help="每个任务块包含的部件数")
+
+    bench = sub.add_parser("bench", help="性能基准，结果写成 JSON")
+    bench.add_argument("--parts", nargs="+", default=['eyeball', 'face', 'nose', 'mouth'],
+                       choices=list(PARTS), help="参与基准的部件")
+    bench.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="画布边长")
+    bench.add_argument("--repeat", type=int, default=20, help="每个组合重复次数")
+    bench.add_argument("--out", default=None, help="结果 JSON 路径")
+    bench.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), default=None,
+                       help="对比两份结果 JSON，不运行基准")
+    bench.add_argument("--threshold", type=float, default=1.2, help="对比时报告的最小快慢比例")
+
+    animate = sub.add_parser("animate", help="离线渲染动画小人")
+    animate.add_argument("--seed", type=int, default=None, help="小人外形与动作的随机种子，默认随机选取并打印")
+    animate.add_argument("--frames", type=int, default=24, help="帧数")
+    animate.add_argument("--out", required=True,
+                         help="输出路径：.gif/.webp 为动画，.png 为精灵图（另写同名 .json 帧位置）")
+    animate.add_argument("--columns", type=int, default=None, help="精灵图列数，等于帧数即单行帧条")
+    animate.add_argument("--duration", type=int, default=200, help="每帧毫秒数")
+    animate.add_argument("--quality", default="normal", choices=list(QUALITY_FACTORS), help="渲染质量")
+    animate.add_argument("--crowd", type=int, default=None, metavar="N",
+                         help="改为渲染 N 个小人组成的人群（向量化批量绘制）")
+    animate.add_argument("--canvas", type=int, nargs=2, default=(800, 600), metavar=("W", "H"),
+                         help="人群画布尺寸")
+
+    dataset = sub.add_parser("dataset", help="生成内存映射的 RGBA 张量数据集（N×H×W×4 + 参数表）")
+    dataset.add_argument("--part", required=True, choices=list(PARTS), help="部件类型")
+    dataset.add_argument("--count", type=int, required=True,
+                         help="总行数；大于已有行数时原地追加")
+    dataset.add_argument("--out", required=True, help="数据集文件夹；已存在时只补未写入的行")
+    dataset.add_argument("--seed", type=int, default=None, help="批次随机种子，默认随机选取并打印")
+    dataset.add_argument("--start", type=int, default=1, help="第 0 行对应的采样编号")
+    dataset.add_argument("--size", type=int, default=None, help="画布尺寸，同 batch")
+    dataset.add_argument("--rows", type=int, nargs=2, default=None, metavar=("LO", "HI"),
+                         help="只填行区间 [LO, HI)，用于多机分工")
+    dataset.add_argument("--labels", action="store_true",
+                         help=f"另写类别图 labels.npy（N×H×W，仅 {'/'.join(LABEL_GENERATORS)}）")
+    dataset.add_argument("--workers", type=int, default=None, help="工作进程数，默认 CPU 核数")
+    dataset.add_argument("--quality", default="normal", choices=list(QUALITY_FACTORS), help="渲染质量")
+    dataset.add_argument("--chunk-size", type=int, default=64, help="每个任务块包含的行数")
+
+    sweep_ = sub.add_parser("sweep", help="按参数网格渲染笛卡尔积")
+    sweep_.add_argument("--part", required=True, choices=list(PARTS), help="部件类型")
+    sweep_.add_argument("--axis", nargs="+", required=True, metavar="KEY=VALUES",
+                        help="参数轴：key=a,b,c 或 key=lo:hi:n（等距 n 个值）；颜色写成 #rrggbb")
+    sweep_.add_argument("--set", nargs="+", default=[], metavar="KEY=VALUE", help="其余固定参数")
+    sweep_.add_argument("--quality", default="normal", choices=list(QUALITY_FACTORS), help="渲染质量")
+    sweep_.add_argument("--out", required=True, help="输出文件夹（附带素材库索引）")
+    sweep_.add_argument("--sheet", action="store_true",
+                        help="另存一张总览图，每行对应最后一个轴的全部取值")
+
+    index = sub.add_parser("index", help="查询素材库索引")
+    index.add_argument("folder", help="素材文件夹（索引为其中的 index.sqlite）")
+    index.add_argument("--scan", action="store_true", help="先把尚未索引的 PNG 补进索引")
+    index.add_argument("--part", default=None, choices=list(PARTS), help="部件类型")
+    index.add_argument("--where", nargs="+", default=[], metavar="KEY=VALUE",
+                       help="参数条件：key=值、key=lo:hi（任一端可省略）、key=a,b（任取其一）；"
+                            "嵌套参数与颜色分量用点分键，如 eyes.iris_color.h=180:260")
+    index.add_argument("--limit", type=int, default=None, help="最多列出多少条")
+    index.add_argument("--json", action="store_true", help="以 JSON 输出完整记录")
+    return parser
+
+def _where_value(text):
+    """
+    命令行条件值：lo:hi 为区间，a,b 为任取其一，能转成数字的按数字比较；
+    true/false 按 1/0 比较（布尔参数在索引中存为数值）
+    """
+    def scalar(v):
+        if v.lower() in ("true", "false"):
+            return float(v.lower() == "true")
+        try:
+            return float(v)
+        except ValueError:
+            return v
+    if ":" in text:
+        lo, hi = text.split(":", 1)
+        return (float(lo) if lo else None, float(hi) if hi else None)
+    if "," in text:
+        return [scalar(v) for v in text.split(",")]
+    return scalar(text)
+
+def _param_value(text):
+    """命令行参数值：整数、小数、true/false、#rrggbb 颜色，其余为字符串"""
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    if text.startswith("#"):
+        return ImageColor.getrgb(text)
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+def _axis_values(text):
+    """lo:hi:n 为等距取值，否则为逗号分隔的列表"""
+    if text.count(":") == 2:
+        lo, hi, n = text.split(":")
+        return linspace(float(lo), float(hi), int(n))
+    return [_param_value(v) for v in text.split(",")]
+
+def _key_values(items, parse):
+    result = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"格式应为 KEY=VALUE: {item}")
+        result[key] = parse(value)
+    return result
+
+def cmd_batch(args):
+    t0 = time.perf_counter()
+    seed = new_seed() if args.seed is None else args.seed
+    print(f"seed={seed}", file=sys.stderr)
+
+    def progress(done, total):
+        print(f"\r已生成 {done}/{total}", end="", file=sys.stderr, flush=True)
+
+    if args.distinct:
+        if args.atlas or args.format != "png" or args.cache_dir or args.labels:
+            raise SystemExit("--distinct 不能与 --atlas、--format svg、--cache-dir、--labels 同时使用")
+        done = run_distinct(args.part, args.count, args.out, seed=seed, start=args.start,
+                            workers=args.workers, size=args.size, chunk_size=args.chunk_size,
+                            progress=progress, trim=args.trim, png_preset=args.png_preset,
+                            quality=args.quality, index=args.index,
+                            max_distance=args.max_distance)
+        print(file=sys.stderr)
+        print(f"已保存 {done} 个互不重复的 {args.part} 到 {args.out}（{time.perf_counter()-t0:.1f}s）")
+        return
+    done = run_batch(args.part, args.count, args.out, seed=seed, start=args.start,
+                     workers=args.workers, size=args.size, chunk_size=args.chunk_size,
+                     progress=progress, cache_dir=args.cache_dir, atlas=args.atlas,
+                     trim=args.trim, png_preset=args.png_preset, quality=args.quality,
+                     fmt=args.format, index=args.index, labels=args.labels)
+    print(file=sys.stderr)
+    print(f"已保存 {done} 个 {args.part} 到 {args.out}（{time.perf_counter()-t0:.1f}s）")
+
+def cmd_bench(args):
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            new = json.load(f)
+        rows = compare(old, new, threshold=args.threshold)
+        for case, a, b, ratio in rows:
+            print(f"{ratio:6.2f}x  {a:9.3f}ms -> {b:9.3f}ms  {case}")
+        print(f"共 {len(rows)} 项变化超过 {args.threshold}x")
+        return
+
+    def progress(n, total, r):
+        print(f"[{n}/{total}] {r['id']}  draw p50 {r['draw_ms']['p50']:.3f}ms"
+              f"  encode p50 {r['encode_ms']['p50']:.3f}ms", file=sys.stderr)
+
+    report = run_bench(args.parts, args.sizes, args.repeat, progress=progress)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"已写入 {args.out}")
+
+def cmd_animate(args):
+    seed = new_seed() if args.seed is None else args.seed
+    print(f"seed={seed}", file=sys.stderr)
+    if args.crowd:
+        frames = Crowd(args.crowd, seed=seed, size=tuple(args.canvas)).render_frames(args.frames)
+    else:
+        frames = CharacterAnimator(Character(seed), quality=args.quality).render(args.frames)
+    if os.path.splitext(args.out)[1].lower() == ".png":
+        sheet, rects = sprite_sheet(frames, args.columns)
+        sheet.save(args.out)
+        with open(os.path.splitext(args.out)[0] + ".json", "w", encoding="utf-8") as f:
+            json.dump({'seed': seed, 'duration': args.duration, 'frames': rects}, f)
+    else:
+        save_animation(frames, args.out, duration=args.duration)
+    print(f"已保存 {args.frames} 帧到 {args.out}")
+
+def cmd_dataset(args):
+    t0 = time.perf_counter()
+    seed = args.seed
+    if seed is None:
+        meta_path = os.path.join(args.out, "meta.json")
+        if os.path.exists(meta_path):
+            # 续跑已有数据集时沿用其 seed
+            with open(meta_path, encoding="utf-8") as f:
+                seed = json.load(f)['seed']
+        else:
+            seed = new_seed()
+    print(f"seed={seed}", file=sys.stderr)
+
+    def progress(done, total):
+        print(f"\r已写入 {done}/{total}", end="", file=sys.stderr, flush=True)
+
+    done = run_dataset(args.part, args.count, args.out, seed=seed, start=args.start,
+                       workers=args.workers, size=args.size, chunk_size=args.chunk_size,
+                       quality=args.quality, rows=args.rows, labels=args.labels,
+                       progress=progress)
+    print(file=sys.stderr)
+    print(f"本次写入 {done} 行到 {args.out}（{time.perf_counter()-t0:.1f}s）")
+
+def cmd_sweep(args):
+    t0 = time.perf_counter()
+    axes = _key_values(args.axis, _axis_values)
+    base = _key_values(args.set, _param_value)
+    _, prefix = PARTS[args.part]
+    images = []
+    with PngExporter(args.out, prefix, start=1, library=True, part=args.part) as exporter:
+        for params, img in sweep(args.part, axes, base, args.quality):
+            exporter.submit(img, params=params)
+            if args.sheet:
+                images.append(img)
+    if args.sheet and len({img.size for img in images}) > 1:
+        print("各组合尺寸不同，不生成总览图", file=sys.stderr)
+    elif args.sheet and images:
+        last = len(axes[list(axes)[-1]])
+        sheet_path = os.path.join(args.out, f"{prefix}_sweep_sheet.png")
+        sprite_sheet(images, columns=last)[0].save(sheet_path)
+        print(f"总览图: {sheet_path}")
+    print(f"已渲染 {exporter.saved} 个组合到 {args.out}（{time.perf_counter()-t0:.1f}s）")
+
+def cmd_index(args):
+    where = _key_values(args.where, _where_value)
+    with AssetLibrary(args.folder) as library:
+        if args.scan:
+            print(f"新增索引 {library.scan()} 个", file=sys.stderr)
+        rows = library.find(part=args.part, where=where, limit=args.limit)
+    if args.json:
+        json.dump(rows, sys.stdout, ensure_ascii=False, indent=1)
+        print()
+    else:
+        for row in rows:
+            print(f"{row['path']}\t{row['width']}x{row['height']}")
+    print(f"共 {len(rows)} 个", file=sys.stderr)
+
+def print_metrics():
+    print("阶段\t标签\t次数\t总计(ms)\t平均(ms)", file=sys.stderr)
+    for _, labels, n, total, mean in metrics.summary():
+        stage = labels.pop('stage', '')
+        tags = ",".join(f"{k}={v}" for k, v in labels.items())
+        print(f"{stage}\t{tags}\t{n}\t{total:.1f}\t{mean:.3f}", file=sys.stderr)
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    elif args.metrics_json:
+        metrics.enable()
+    try:
+        run_command(args)
+    finally:
+        if args.metrics_json:
+            metrics.dump(args.metrics_json)
+            print_metrics()
+
+def run_command(args):
+    if args.command == "batch":
+        cmd_batch(args)
+    elif args.command == "bench":
+        cmd_bench(args)
+    elif args.command == "animate":
+        cmd_animate(args)
+    elif args.command == "dataset":
+        cmd_dataset(args)
+    elif args.command == "sweep":
+        cmd_sweep(args)
+    elif args.command == "index":
+        cmd_index(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+动画小人的离线渲染：不需要显示器，用 PIL 逐帧绘制并导出精灵图、帧条或 GIF/WebP 动画。
+头部、五官、身体在整个动画中形状不变，只随头部微动平移，
+因此各自只光栅化一次缓存成小图，每帧按偏移合成后再画会动的四肢。
+"""
+import math
+import random
+
+from PIL import Image
+
+from .primitives import DisplayList, centered_box
+from .supersample import make_draw
+
+CANVAS_SIZE = (400, 400)
+BODY_COLORS = ("blue", "green", "purple", "orange")
+SKIN_COLOR = "#f5c1a0"
+NOSE_COLOR = "#f5a07a"
+
+# =================== 小人参数 ===================
+class Character:
+    """小人的形状参数与每帧的随机运动；同一 seed 的外形和动作序列完全一致"""
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        rng = self.rng
+        # 头部
+        self.head_width = rng.randint(50, 80)
+        self.head_height = rng.randint(60, 90)
+        self.head_x = 200
+        self.head_y = 100
+        # 眼睛
+        self.eye_spacing = rng.randint(20, 35)
+        self.eye_size = rng.randint(5, 12)
+        # 鼻子
+        self.nose_width = 8
+        self.nose_height = 10
+        # 嘴巴
+        self.mouth_width = rng.randint(20, 40)
+        # 身体
+        self.body_width = rng.randint(40, 60)
+        self.body_height = rng.randint(60, 100)
+        # 四肢
+        self.arm_length = rng.randint(30, 50)
+        self.leg_length = rng.randint(40, 60)
+        # 颜色
+        self.body_color = rng.choice(BODY_COLORS)
+        # 运动偏移量
+        self.offsets = {"head":0, "arm":0, "leg":0, "arm_dy":(0, 0)}
+
+    def update_offsets(self):
+        rng = self.rng
+        # 头部微动
+        self.offsets["head"] = rng.randint(-3,3)
+        # 手臂轻微摆动
+        self.offsets["arm"] = rng.randint(-5,5)
+        # 腿微动
+        self.offsets["leg"] = rng.randint(-3,3)
+        # 左右手臂末端的上下抖动
+        self.offsets["arm_dy"] = (rng.randint(-10,10), rng.randint(-10,10))
+        return self.offsets
+
+    @property
+    def body_top(self):
+        return self.head_y + self.head_height//2
+
+# =================== 分层图元（偏移为 0 时的位置） ===================
+def head_layer(char):
+    """头部轮廓；随头部偏移 (h, h) 平移"""
+    dl = DisplayList()
+    dl.ellipse(centered_box((char.head_x, char.head_y), char.head_width//2, char.head_height//2),
+               fill=SKIN_COLOR, outline="black")
+    return dl
+
+def eye_layer(char):
+    """眼睛与瞳孔；水平方向多移一个头部偏移，即随 (2h, h) 平移"""
+    dl = DisplayList()
+    hx, eye_y = char.head_x, char.head_y - char.head_height//8
+    pupil_size = char.eye_size // 2
+    for ex in (hx - char.eye_spacing, hx + char.eye_spacing):
+        dl.ellipse(centered_box((ex, eye_y), char.eye_size), fill="white", outline="black")
+    for ex in (hx - char.eye_spacing, hx + char.eye_spacing):
+        dl.ellipse(centered_box((ex, eye_y), pupil_size), fill="black", outline="black")
+    return dl
+
+def front_layer(char):
+    """鼻子、嘴巴、身体；随头部偏移 (h, h) 平移"""
+    dl = DisplayList()
+    hx, hy = char.head_x, char.head_y
+    dl.polygon([(hx, hy - char.nose_height//2),
+                (hx - char.nose_width//2, hy + char.nose_height//2),
+                (hx + char.nose_width//2, hy + char.nose_height//2)],
+               fill=NOSE_COLOR, outline="black")
+    mouth_y = hy + char.head_height//4
+    dl.line([(hx - char.mouth_width//2, mouth_y), (hx + char.mouth_width//2, mouth_y)],
+            fill="red", width=2)
+    dl.rectangle((hx - char.body_width//2, char.body_top,
+                  hx + char.body_width//2, char.body_top + char.body_height),
+                 fill=char.body_color, outline="black")
+    return dl
+
+def limb_layer(char, offsets):
+    """手臂和腿；每帧按偏移重新生成"""
+    dl = DisplayList()
+    off_h, off_a, off_l = offsets["head"], offsets["arm"], offsets["leg"]
+    hx = char.head_x + off_h
+    top = char.body_top + off_h
+    half = char.body_width//2
+    dy_l, dy_r = offsets["arm_dy"]
+    dl.line([(hx - half, top + 20), (hx - half - char.arm_length + off_a, top + 20 + dy_l)],
+            fill="black", width=3)
+    dl.line([(hx + half, top + 20), (hx + half + char.arm_length + off_a, top + 20 + dy_r)],
+            fill="black", width=3)
+    for lx in (hx - char.body_width//4, hx + char.body_width//4):
+        dl.line([(lx, top + char.body_height), (lx + off_l, top + char.body_height + char.leg_length)],
+                fill="black", width=3)
+    return dl
+
+# (图层, 头部偏移 h 对应的平移倍数)
+STATIC_LAYERS = ((head_layer, (1, 1)), (eye_layer, (2, 1)), (front_layer, (1, 1)))
+
+def bake(dl, quality='normal'):
+    """把显示列表光栅化成刚好包住它的小图，返回 (图像, 左上角在画布中的位置)"""
+    x0, y0, x1, y1 = dl.bbox()
+    x0, y0 = math.floor(x0), math.floor(y0)
+    img = Image.new("RGBA", (math.ceil(x1) - x0, math.ceil(y1) - y0), (0,0,0,0))
+    dl.translated(-x0, -y0).replay(make_draw(img, quality))
+    return img, (x0, y0)
+
+# =================== 离线渲染 ===================
+class CharacterAnimator:
+    """
+    静态图层在构造时各光栅化一次，render_frame 只做合成 + 画四肢。
+        anim = CharacterAnimator(Character(seed=7))
+        frames = anim.render(24)
+    """
+    def __init__(self, char, size=CANVAS_SIZE, background=(255,255,255,255), quality='normal'):
+        self.char = char
+        self.size = size
+        self.background = background
+        self.quality = quality
+        self.layers = [(bake(layer(char), quality), k) for layer, k in STATIC_LAYERS]
+
+    def render_frame(self, offsets=None):
+        """按给定偏移画一帧；offsets 为 None 时先推进一次随机运动"""
+        if offsets is None:
+            offsets = self.char.update_offsets()
+        h = offsets["head"]
+        frame = Image.new("RGBA", self.size, self.background)
+        for (sprite, (x, y)), (kx, ky) in self.layers:
+            frame.alpha_composite(sprite, dest=(x + kx*h, y + ky*h))
+        limb_layer(self.char, offsets).replay(make_draw(frame, self.quality))
+        return frame
+
+    def iter_frames(self, count):
+        for _ in range(count):
+            yield self.render_frame()
+
+    def render(self, count):
+        return list(self.iter_frames(count))
+
+# =================== 导出 ===================
+def sprite_sheet(frames, columns=None):
+    """
+    把帧排成网格，返回 (图像, 每帧 (x, y, w, h) 列表)。
+    columns 为 None 时取接近正方形的列数；columns=len(frames) 即单行帧条。
+    """
+    frames = list(frames)
+    if not frames:
+        raise ValueError("no frames")
+    w, h = frames[0].size
+    columns = columns or math.ceil(math.sqrt(len(frames)))
+    rows = math.ceil(len(frames) / columns)
+    sheet = Image.new("RGBA", (w*columns, h*rows), (0,0,0,0))
+    rects = []
+    for i, frame in enumerate(frames):
+        x, y = (i % columns) * w, (i // columns) * h
+        sheet.paste(frame, (x, y))
+        rects.append((x, y, w, h))
+    return sheet, rects
+
+def save_animation(frames, path, duration=200, loop=0):
+    """按扩展名保存为 GIF 或 WebP 动画，duration 为每帧毫秒数（与界面的 200ms 一致）"""
+    frames = list(frames)
+    if not frames:
+        raise ValueError("no frames")
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=duration,
+                   loop=loop, disposal=2)
+    return path
@@ -0,0 +1,129 @@
+"""
+图集导出：把一批部件打包进若干张边长为 2 的幂的大图，并写出 JSON 清单
+（每个部件所在图集、矩形位置和生成参数）。游戏端加载一批部件只需解码几张图。
+"""
+import json
+import os
+
+from PIL import Image
+
+from .trim import trim as trim_margins
+
+def _pot(n):
+    """不小于 n 的最小 2 的幂"""
+    p = 1
+    while p < n:
+        p *= 2
+    return p
+
+def _jsonable(value):
+    if isinstance(value, (tuple, list)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    return value
+
+class ShelfPacker:
+    """
+    货架式装箱：按行（货架）从左到右摆放，放不下就换行，整张放不下就换新图集。
+    在线装箱、不需要预先拿到全部部件；同一批部件尺寸相近时利用率很高。
+    """
+    def __init__(self, max_size=2048, padding=1):
+        self.max_size = max_size
+        self.padding = padding
+        self.reset()
+
+    def reset(self):
+        self.x = 0
+        self.y = 0
+        self.shelf_h = 0
+        self.used_w = 0
+        self.used_h = 0
+
+    def place(self, w, h):
+        """返回 (x, y)；当前图集放不下时返回 None，调用方换新图集后重试"""
+        if w > self.max_size or h > self.max_size:
+            raise ValueError(f"part {w}x{h} does not fit in a {self.max_size} atlas")
+        if self.x + w > self.max_size:
+            self.x = 0
+            self.y += self.shelf_h + self.padding
+            self.shelf_h = 0
+        if self.y + h > self.max_size:
+            return None
+        pos = (self.x, self.y)
+        self.x += w + self.padding
+        self.shelf_h = max(self.shelf_h, h)
+        self.used_w = max(self.used_w, pos[0] + w)
+        self.used_h = max(self.used_h, pos[1] + h)
+        return pos
+
+class AtlasWriter:
+    """
+    用法：
+        with AtlasWriter(out_dir) as atlas:
+            atlas.add("eye_1", img, params)
+    图集满一张写一张，内存中只保留当前这一张；结束时写出 atlas.json。
+    trim=True 时先裁掉透明边，清单中记录 offset/canvas 以便还原位置。
+    """
+    def __init__(self, out_dir, name="atlas", max_size=2048, padding=1, trim=False):
+        self.out_dir = out_dir
+        self.name = name
+        self.trim = trim
+        self.packer = ShelfPacker(max_size, padding)
+        self.sheets = []
+        self.frames = {}
+        self._sheet = None
+        os.makedirs(out_dir, exist_ok=True)
+
+    def add(self, key, img, params=None, **extra):
+        if self.trim:
+            img, meta = trim_margins(img)
+            extra.update(meta)
+        pos = None if self._sheet is None else self.packer.place(img.width, img.height)
+        if pos is None:
+            self._flush()
+            self._sheet = Image.new("RGBA", (self.packer.max_size,)*2, (0,0,0,0))
+            pos = self.packer.place(img.width, img.height)
+        self._sheet.paste(img, pos)
+        frame = {'sheet': len(self.sheets), 'x': pos[0], 'y': pos[1],
+                 'w': img.width, 'h': img.height}
+        frame.update(extra)
+        if params is not None:
+            frame['params'] = _jsonable(params)
+        self.frames[key] = frame
+
+    def _flush(self):
+        if self._sheet is None:
+            return
+        # 裁到实际用到的范围，再向上取 2 的幂
+        w, h = _pot(self.packer.used_w), _pot(self.packer.used_h)
+        filename = f"{self.name}_{len(self.sheets)}.png"
+        self._sheet.crop((0, 0, w, h)).save(os.path.join(self.out_dir, filename))
+        self.sheets.append({'file': filename, 'w': w, 'h': h})
+        self._sheet = None
+        self.packer.reset()
+
+    def close(self):
+        self._flush()
+        manifest = {'version': 1, 'sheets': self.sheets, 'frames': self.frames}
+        path = os.path.join(self.out_dir, f"{self.name}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        return path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def load_atlas(path):
+    """读取 atlas.json，返回 {部件名: 图像}；每张图集只解码一次"""
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    base = os.path.dirname(path)
+    sheets = [Image.open(os.path.join(base, s['file'])) for s in manifest['sheets']]
+    for s in sheets:
+        s.load()
+    return {key: sheets[fr['sheet']].crop((fr['x'], fr['y'], fr['x']+fr['w'], fr['y']+fr['h']))
+            for key, fr in manifest['frames'].items()}
@@ -0,0 +1,224 @@
+"""
+无界面批量生成：多进程并行渲染，每个工作进程直接把 PNG 写入磁盘。
+参数由 (seed, 编号) 决定，同一 seed 的批次可按编号区间分片、可单独补生成。
+"""
+import functools
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .eyeball import generate_eyeball
+from .face import generate_face
+from .mouth import generate_mouth
+from .nose import generate_nose
+from .atlas import AtlasWriter
+from .cache import RenderCache
+from . import metrics
+from .compose import compose_character
+from .export import PngExporter
+from .labels import LABEL_GENERATORS, generate_with_labels, label_path
+from .library import AssetLibrary, pixel_hash
+from .sampling import SAMPLERS
+from .svg import SVG_GENERATORS
+from .trim import png_info, trim as trim_margins
+
+# 部件名 -> (生成函数, 文件名前缀)，前缀与各 GUI 导出一致
+PARTS = {
+    'eyeball': (generate_eyeball, 'eye'),
+    'face': (generate_face, 'face'),
+    'nose': (generate_nose, 'nose'),
+    'mouth': (generate_mouth, 'mouth'),
+    'character': (compose_character, 'character'),
+}
+
+def make_sampler(part, seed, size=None):
+    # 鼻子画布固定 300，不接受 size
+    if size is None or part == 'nose':
+        return SAMPLERS[part](seed)
+    return SAMPLERS[part](seed, size=size)
+
+# 给出 cache_dir 时每个工作进程各自持有一个缓存，同一进程内的重复参数只渲染一次
+_caches = {}
+
+def _worker_render(generate, cache_dir):
+    """
+    返回本进程的渲染函数。随机参数几乎不会重复，不用磁盘缓存时直接调用生成函数，
+    省去每张图计算缓存键（参数绑定、JSON、sha1）的开销，也不在内存中留存渲染结果。
+    """
+    if cache_dir is None:
+        return generate
+    if cache_dir not in _caches:
+        _caches[cache_dir] = RenderCache(disk_dir=cache_dir)
+    return functools.partial(_caches[cache_dir].get, generate)
+
+def _render_items(part, seed, start, stop, size, cache_dir, trim, quality='normal'):
+    """产出 (编号, 名称, 参数, 图像, 元数据)；trim 时元数据记录裁剪偏移"""
+    generate, prefix = PARTS[part]
+    render = _worker_render(generate, cache_dir)
+    for idx, params in make_sampler(part, seed, size).samples(start, stop):
+        img = render(quality=quality, **params)
+        meta = {}
+        if trim:
+            with metrics.timed('trim', part=part):
+                img, meta = trim_margins(img)
+        metrics.inc('items', part=part)
+        yield idx, f"{prefix}_{idx}", params, img, meta
+
+def _render_labeled(part, seed, start, stop, size, trim, quality='normal'):
+    """同 _render_items，但同一遍绘制同时得到类别图（不经渲染缓存）；产出 (编号, 参数, 图像, 类别图, 元数据)"""
+    for idx, params in make_sampler(part, seed, size).samples(start, stop):
+        img, mask = generate_with_labels(part, quality=quality, **params)
+        meta = {}
+        if trim:
+            img, meta = trim_margins(img)
+            x, y = meta['offset']
+            mask = mask.crop((x, y, x + img.width, y + img.height))
+        yield idx, params, img, mask, meta
+
+def render_chunk(part, seed, start, stop, out_dir, size=None, cache_dir=None, trim=False,
+                 png_preset='default', quality='normal', index=False, labels=False):
+    """
+    在工作进程中渲染编号 [start, stop) 的部件并保存，返回保存数量。
+    渲染下一张的同时由编码线程压缩、写入上一张。
+    index=True 时改为返回 [(路径, 尺寸, 参数, 像素哈希)]，由主进程统一写入素材库索引。
+    labels=True 时每张图旁边另存类别图 prefix_N_label.png（见 labels.py）。
+    """
+    _, prefix = PARTS[part]
+    if labels:
+        items = _render_labeled(part, seed, start, stop, size, trim, quality)
+    else:
+        items = ((idx, params, img, None, meta) for idx, _, params, img, meta in
+                 _render_items(part, seed, start, stop, size, cache_dir, trim, quality))
+    records = []
+    with PngExporter(out_dir, prefix, preset=png_preset, workers=2, max_pending=8,
+                     start=start, part=part) as exporter:
+        for idx, params, img, mask, meta in items:
+            path = exporter.submit(img, index=idx, pnginfo=png_info(meta) if meta else None)
+            if mask is not None:
+                mask.save(label_path(path), format="PNG", compress_level=1)
+            if index:
+                records.append((path, img.size, params, pixel_hash(img)))
+    return records if index else stop - start
+
+def render_chunk_images(part, seed, start, stop, size=None, cache_dir=None, trim=False,
+                        quality='normal'):
+    """在工作进程中渲染编号 [start, stop) 的部件，返回 [(名称, 参数, 图像, 元数据)]，供图集打包"""
+    return [item[1:] for item in
+            _render_items(part, seed, start, stop, size, cache_dir, trim, quality)]
+
+def render_chunk_svg(part, seed, start, stop, out_dir, size=None):
+    """在工作进程中把编号 [start, stop) 的部件写成 SVG 文件，返回保存数量"""
+    generate, (_, prefix) = SVG_GENERATORS[part], PARTS[part]
+    for idx, params in make_sampler(part, seed, size).samples(start, stop):
+        path = os.path.join(out_dir, f"{prefix}_{idx}.svg")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(generate(**params))
+    return stop - start
+
+def _instrumented(fn):
+    """
+    开启指标时，工作进程连同本块的指标快照一起返回，由主进程合并；
+    返回 (提交用的函数, 取结果的函数)。
+    """
+    if not metrics.enabled():
+        return fn, lambda f: f.result()
+    def result(f):
+        value, snap = f.result()
+        metrics.merge(snap)
+        return value
+    return functools.partial(metrics.collect, fn), result
+
+def _map_chunks(pool, fn, chunks, args, window):
+    """按块提交任务，最多 window 个在途；按完成顺序产出 (块, 结果)"""
+    fn, result = _instrumented(fn)
+    pending = {}
+    for lo, hi in chunks:
+        pending[pool.submit(fn, *args[:2], lo, hi, *args[2:])] = (lo, hi)
+        if len(pending) >= window:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for f in finished:
+                yield pending.pop(f), result(f)
+    for f in list(pending):
+        yield pending.pop(f), result(f)
+
+def _map_chunks_ordered(pool, fn, chunks, args, window):
+    """同 _map_chunks，但按提交顺序产出；消费者不取结果时不再提交新块（背压）"""
+    fn, result = _instrumented(fn)
+    pending = deque()
+    for lo, hi in chunks:
+        pending.append(((lo, hi), pool.submit(fn, *args[:2], lo, hi, *args[2:])))
+        if len(pending) >= window:
+            chunk, f = pending.popleft()
+            yield chunk, result(f)
+    while pending:
+        chunk, f = pending.popleft()
+        yield chunk, result(f)
+
+def run_batch(part, count, out_dir, seed=0, start=1, workers=None, size=None,
+              chunk_size=64, progress=None, cache_dir=None, atlas=False, trim=False,
+              png_preset='default', quality='normal', fmt='png', index=False, labels=False):
+    """
+    并行生成编号 [start, start+count) 的部件到 out_dir。
+    cache_dir 为磁盘渲染缓存目录，多次运行、多个进程之间共享。
+    atlas=True 时不逐个写 PNG，而是打包成图集和一份 JSON 清单。
+    trim=True 时裁掉透明边，偏移写入 PNG 文本块或图集清单。
+    png_preset 为 PNG 压缩预设（见 export.PNG_PRESETS）。
+    quality 为 'high'/'ultra' 时超采样抗锯齿渲染（见 supersample.QUALITY_FACTORS）。
+    fmt='svg' 时输出与分辨率无关的矢量文件（仅脸型、鼻子、嘴巴）。
+    index=True 时在 out_dir 中写素材库索引（见 library.AssetLibrary），可按参数查询。
+    labels=True 时每个部件旁另存一张类别图（仅眼珠、脸型，见 labels.LABEL_GENERATORS）。
+    同时在途的任务块数有上限，百万级数量也不会一次性提交全部任务。
+    progress(done, count) 在每块完成时回调。
+    """
+    if part not in PARTS:
+        raise ValueError(f"part must be one of {', '.join(PARTS)}")
+    if fmt == 'svg':
+        if part not in SVG_GENERATORS:
+            raise ValueError(f"svg output supports only {', '.join(SVG_GENERATORS)}")
+        if atlas or trim:
+            raise ValueError("svg output cannot be combined with atlas or trim")
+    elif fmt != 'png':
+        raise ValueError("fmt must be 'png' or 'svg'")
+    if index and (atlas or fmt != 'png'):
+        raise ValueError("index supports only per-file png output")
+    if labels:
+        if part not in LABEL_GENERATORS:
+            raise ValueError(f"labels support only {', '.join(LABEL_GENERATORS)}")
+        if atlas or fmt != 'png':
+            raise ValueError("labels support only per-file png output")
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    end = start + count
+    chunks = ((s, min(s+chunk_size, end)) for s in range(start, end, chunk_size))
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if not atlas:
+            if fmt == 'svg':
+                fn, args = render_chunk_svg, (part, seed, out_dir, size)
+            else:
+                fn, args = render_chunk, (part, seed, out_dir, size, cache_dir, trim, png_preset,
+                                          quality, index, labels)
+            library = AssetLibrary(out_dir) if index else None
+            try:
+                for (lo, hi), result in _map_chunks(pool, fn, chunks, args, workers*2):
+                    if library is not None:
+                        for path, img_size, params, digest in result:
+                            library.record(path, img_size, params, part, digest)
+                        library.commit()
+                    done += hi - lo
+                    if progress: progress(done, count)
+            finally:
+                if library is not None:
+                    library.close()
+            return done
+
+        # 图集按编号顺序装箱，保证同一 seed 的布局可复现
+        with AtlasWriter(out_dir, name=f"{part}_atlas") as writer:
+            args = (part, seed, size, cache_dir, trim, quality)
+            for (lo, hi), items in _map_chunks_ordered(pool, render_chunk_images, chunks, args,
+                                                       workers*2):
+                for key, params, img, meta in items:
+                    writer.add(key, img, params, **meta)
+                done += hi - lo
+                if progress: progress(done, count)
+    return done
@@ -0,0 +1,177 @@
+"""
+性能基准：遍历各生成函数的形状/纹理组合与尺寸，分别统计绘制耗时与 PNG 编码耗时，
+结果写成 JSON，可用 compare() 对比两次运行找回退。
+绘制直接调用生成函数，不经过 RenderCache。
+内存记两项：peak_tracemalloc_bytes 只含 Python/NumPy 分配；peak_rss_bytes 为子进程中单次调用的峰值 RSS 增量。
+"""
+import io
+import itertools
+import json
+import multiprocessing
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import PIL
+
+from .compose import compose_character
+from .eyeball import IRIS_TEXTURES, PUPIL_SHAPES, generate_eyeball
+from .face import FACE_SHAPES, generate_face
+from .mouth import MOUTH_SHAPES, generate_mouth
+from .nose import HOLE_SHAPES, NOSE_SHAPES, generate_nose
+from .sampling import CharacterSampler
+
+try:
+    import resource
+except ImportError:     # Windows 没有 resource，峰值 RSS 记为 None
+    resource = None
+
+DEFAULT_SIZES = (64, 128, 256, 512, 1024, 2048)
+
+def _cases(parts, sizes):
+    """产出 (部件, 生成函数, 参数)；size 统一指输出画布边长"""
+    if 'eyeball' in parts:
+        for size, tex, pupil in itertools.product(sizes, IRIS_TEXTURES, PUPIL_SHAPES):
+            yield 'eyeball', generate_eyeball, dict(size=size, iris_texture=tex, pupil_shape=pupil)
+    if 'face' in parts:
+        for size, shape, feat in itertools.product(sizes, FACE_SHAPES, (False, True)):
+            yield 'face', generate_face, dict(size=size//2, shape=shape, with_features=feat)
+    if 'nose' in parts:
+        # 鼻子画布固定 300，只按形状组合
+        for shape, hole in itertools.product(NOSE_SHAPES, HOLE_SHAPES):
+            yield 'nose', generate_nose, dict(shape=shape, hole_shape=hole)
+    if 'mouth' in parts:
+        for size, shape in itertools.product(sizes, MOUTH_SHAPES):
+            yield 'mouth', generate_mouth, dict(size=size, mouth_shape=shape)
+    if 'character' in parts:
+        for size in sizes:
+            params = CharacterSampler(0).sample(0)
+            params['face']['size'] = size//2
+            yield 'character', compose_character, params
+
+def _percentiles(samples_ms):
+    s = sorted(samples_ms)
+    def pct(p):
+        return s[min(len(s)-1, int(round(p/100 * (len(s)-1))))]
+    return {
+        'min': s[0], 'p50': pct(50), 'p90': pct(90), 'p99': pct(99),
+        'max': s[-1], 'mean': statistics.fmean(s),
+    }
+
+def _maxrss_bytes():
+    # Linux 上 ru_maxrss 以 KB 为单位，macOS 上以字节为单位
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+def _rss_child(generate, params, conn):
+    start = _maxrss_bytes()
+    generate(**params)
+    conn.send(_maxrss_bytes() - start)
+    conn.close()
+
+_rss_ctx = None
+
+def peak_rss(generate, params):
+    """
+    在单独的子进程中调用一次，返回峰值 RSS 的增量（字节），包括 PIL 在 C 层分配的图像缓冲区。
+    子进程由 forkserver 从一个干净的解释器 fork 出来：不继承本进程已经涨大的堆和几何缓存，
+    ru_maxrss 从 fork 时起算。没有 resource 或不支持 forkserver 时返回 None。
+    """
+    global _rss_ctx
+    if resource is None or "forkserver" not in multiprocessing.get_all_start_methods():
+        return None
+    if _rss_ctx is None:
+        _rss_ctx = multiprocessing.get_context("forkserver")
+        _rss_ctx.set_forkserver_preload([__name__])
+    recv, send = _rss_ctx.Pipe(duplex=False)
+    proc = _rss_ctx.Process(target=_rss_child, args=(generate, params, send))
+    proc.start()
+    send.close()
+    try:
+        return recv.recv()
+    except EOFError:
+        return None
+    finally:
+        proc.join()
+
+def bench_case(generate, params, repeat=20, compress_level=6):
+    """单个组合：首次调用（含几何缓存构建）、重复绘制、PNG 编码分别计时"""
+    t = time.perf_counter()
+    img = generate(**params)
+    first_ms = (time.perf_counter()-t) * 1000
+
+    draw_ms, encode_ms = [], []
+    png_bytes = 0
+    for _ in range(repeat):
+        t = time.perf_counter()
+        img = generate(**params)
+        draw_ms.append((time.perf_counter()-t) * 1000)
+        buf = io.BytesIO()
+        t = time.perf_counter()
+        img.save(buf, format="PNG", compress_level=compress_level)
+        encode_ms.append((time.perf_counter()-t) * 1000)
+        png_bytes = buf.tell()
+
+    # tracemalloc 只统计 Python/NumPy 分配（PIL 图像缓冲区不在内），单独跑一次避免拖慢计时
+    tracemalloc.start()
+    generate(**params)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'width': img.width, 'height': img.height,
+        'image_bytes': img.width * img.height * len(img.getbands()),
+        'png_bytes': png_bytes,
+        'first_ms': first_ms,
+        'draw_ms': _percentiles(draw_ms),
+        'encode_ms': _percentiles(encode_ms),
+        'peak_tracemalloc_bytes': peak,
+        'peak_rss_bytes': peak_rss(generate, params),
+    }
+
+def case_id(part, params):
+    return part + ":" + json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+
+def run_bench(parts=('eyeball', 'face', 'nose', 'mouth'), sizes=DEFAULT_SIZES, repeat=20,
+              progress=None):
+    results = []
+    cases = list(_cases(parts, sizes))
+    for n, (part, generate, params) in enumerate(cases, start=1):
+        r = bench_case(generate, params, repeat)
+        r.update(id=case_id(part, params), part=part, params=params)
+        results.append(r)
+        if progress: progress(n, len(cases), r)
+    return {
+        'meta': {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pillow': PIL.__version__,
+            'numpy': np.__version__,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+def compare(old, new, metric='p50', threshold=1.2):
+    """
+    对比两次基准结果，返回 [(id, 旧 ms, 新 ms, 比值)]，只包含绘制或编码
+    比值超过 threshold（变慢）或低于 1/threshold（变快）的组合。
+    """
+    old_by_id = {r['id']: r for r in old['results']}
+    rows = []
+    for r in new['results']:
+        o = old_by_id.get(r['id'])
+        if o is None:
+            continue
+        for stage in ('draw_ms', 'encode_ms'):
+            a, b = o[stage][metric], r[stage][metric]
+            ratio = b / a if a > 0 else float('inf')
+            if ratio > threshold or ratio < 1/threshold:
+                rows.append((f"{r['id']} [{stage}]", a, b, ratio))
+    rows.sort(key=lambda row: -row[3])
+    return rows
@@ -0,0 +1,201 @@
+"""
+渲染缓存：以规范化后的生成参数做内容寻址。
+内存中按字节数上限做 LRU，可选再加一层磁盘 PNG 存储；
+相同参数直接返回已渲染的图像，预览与保存共用同一次渲染。
+"""
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+from PIL import Image
+
+from . import metrics
+
+ByteCacheInfo = namedtuple("ByteCacheInfo", "hits misses items bytes max_bytes")
+
+def _nbytes(value):
+    """数组（或含数组的元组）占用的字节数"""
+    if isinstance(value, tuple):
+        return sum(_nbytes(v) for v in value)
+    return getattr(value, 'nbytes', 0)
+
+def byte_lru_cache(max_bytes):
+    """
+    与 functools.lru_cache 用法相同，但按结果数组的总字节数（而非条目数）淘汰。
+    几何缓存的结果大小随画布尺寸平方增长，按条目数限制时小图装不满、大图又占用过多。
+    """
+    def decorator(fn):
+        items = OrderedDict()
+        lock = threading.Lock()
+        state = {'bytes': 0, 'hits': 0, 'misses': 0}
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            with lock:
+                if args in items:
+                    items.move_to_end(args)
+                    state['hits'] += 1
+                    return items[args]
+                state['misses'] += 1
+            value = fn(*args)
+            size = _nbytes(value)
+            with lock:
+                if args not in items and size <= max_bytes:
+                    items[args] = value
+                    state['bytes'] += size
+                    while state['bytes'] > max_bytes:
+                        _, old = items.popitem(last=False)
+                        state['bytes'] -= _nbytes(old)
+            return value
+
+        def cache_info():
+            with lock:
+                return ByteCacheInfo(state['hits'], state['misses'], len(items), state['bytes'],
+                                     max_bytes)
+
+        def cache_clear():
+            with lock:
+                items.clear()
+                state.update(bytes=0, hits=0, misses=0)
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+def _normalize(value):
+    if isinstance(value, (tuple, list)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    return value
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """包内全部源码的摘要，作为缓存键的版本：绘制代码一改，磁盘缓存中的旧 PNG 自然失效"""
+    folder = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha1()
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".py"):
+            with open(os.path.join(folder, name), "rb") as f:
+                h.update(name.encode())
+                h.update(f.read())
+    return h.hexdigest()[:16]
+
+def cache_key(generate, **params):
+    """
+    补全默认值后的参数 + 生成函数名 + 代码版本 -> sha1，
+    参数写法不同但等价时得到同一个键；升级或修改绘制代码后键随之改变。
+    """
+    bound = inspect.signature(generate).bind(**params)
+    bound.apply_defaults()
+    payload = {
+        'fn': f"{generate.__module__}.{generate.__qualname__}",
+        'version': code_version(),
+        'params': _normalize(dict(bound.arguments)),
+    }
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def _image_bytes(img):
+    return img.width * img.height * len(img.getbands())
+
+class RenderCache:
+    """
+    用法：cache.get(generate_face, shape='圆脸', size=150)
+    返回的图像被缓存共享，调用方不要原地修改（需要修改时先 copy()）。
+    """
+    def __init__(self, max_bytes=128*1024*1024, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, generate, **params):
+        key = cache_key(generate, **params)
+        with self._lock:
+            img = self._items.get(key)
+            if img is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                metrics.inc('cache_requests', result='hit')
+                return img
+
+        img = self._load_disk(key)
+        if img is not None:
+            with self._lock:
+                self.disk_hits += 1
+            metrics.inc('cache_requests', result='disk')
+        else:
+            # 生成函数可能改写传入的 dict（如 generate_face 的 params），传副本
+            img = generate(**copy.deepcopy(params))
+            with self._lock:
+                self.misses += 1
+            metrics.inc('cache_requests', result='miss')
+            self._store_disk(key, img)
+        self._put(key, img)
+        return img
+
+    def _put(self, key, img):
+        size = _image_bytes(img)
+        with self._lock:
+            if key in self._items or size > self.max_bytes:
+                return
+            self._items[key] = img
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self._bytes -= _image_bytes(old)
+                self.evictions += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.png")
+
+    def _load_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        with Image.open(path) as f:
+            f.load()
+            return f.copy()
+
+    def _store_disk(self, key, img):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 先写临时文件再改名，多进程同时写同一个键也不会读到半个文件
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        img.save(tmp, format="PNG")
+        os.replace(tmp, path)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'items': len(self._items),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,112 @@
+"""
+整脸合成：在一张画布上依次画脸型、眼睛、鼻子、嘴巴。
+每个部件直接按目标尺寸绘制——鼻子、嘴巴直接画在脸的画布上，
+眼睛按目标尺寸渲染后原地 alpha 合成，不再先画 300/256 的大图再缩放。
+"""
+import random
+
+from PIL import Image
+
+from .eyeball import generate_eyeball, random_eyeball_params
+from .face import draw_face, random_face_params
+from .metrics import timed
+from .mouth import draw_mouth, random_mouth_params
+from .nose import draw_nose, random_nose_params
+from .primitives import DisplayList
+from .supersample import make_draw
+
+# generate_nose 中鼻子本体的大小，鼻孔参数以它为单位
+NOSE_BASE_SIZE = 150
+
+def default_layout(size):
+    """各部件相对脸中心的位置与大小（像素），size 为脸的半高"""
+    return {
+        'eye_size': size//3,        # 眼珠直径
+        'eye_offset_x': size//3,    # 眼睛中心到脸中线的距离
+        'eye_offset_y': -size//6,
+        'nose_size': size//4,
+        'nose_y': size//12,
+        'mouth_size': size//2,      # 嘴巴宽高比例所乘的基准
+        'mouth_y': size//3,
+    }
+
+def character_layers(face=None, nose=None, mouth=None, layout=None):
+    """
+    脸型、鼻子、嘴巴录成一份显示列表（画布坐标，原点在左上角），参数含义同 compose_character。
+    可回放到任意后端：位图、超采样、SVG，或平移后画进更大的画布。
+    """
+    face = dict(face or {})
+    size = face.get('size', 150)
+    lay = default_layout(size)
+    lay.update(layout or {})
+    dl = DisplayList()
+    cx = cy = size
+
+    # 1. 脸型
+    draw_face(dl, (cx, cy), size, face.get('shape', '椭圆脸'), face.get('skin_color', (255,224,189)),
+              face.get('outline_color', (0,0,0)), face.get('params'))
+
+    # 2. 鼻子、嘴巴：直接画在脸的画布上
+    if nose is not None:
+        nose = dict(nose)
+        n = lay['nose_size']
+        scale = n / NOSE_BASE_SIZE
+        for key in ('hole_size', 'hole_offset', 'hole_vertical_offset'):
+            if key in nose:
+                nose[key] = round(nose[key] * scale)
+        nose.setdefault('hole_size', round(20*scale))
+        nose.setdefault('hole_offset', round(40*scale))
+        draw_nose(dl, (cx, cy + lay['nose_y']), n, **nose)
+
+    if mouth is not None:
+        m = lay['mouth_size']
+        draw_mouth(dl, (cx, cy + lay['mouth_y']),
+                   int(m * mouth.get('mouth_width_ratio', 0.6)),
+                   int(m * mouth.get('mouth_height_ratio', 0.2)),
+                   mouth.get('mouth_shape', 'line'))
+    return dl
+
+@timed('draw', part='character')
+def compose_character(face=None, eyes=None, nose=None, mouth=None, layout=None, quality='normal'):
+    """
+    face: generate_face 的参数（shape/skin_color/outline_color/size/params，忽略 with_features）
+    eyes: generate_eyeball 的参数（不含 size，由 layout 决定）
+    nose: generate_nose 的参数，鼻孔大小/间距按鼻子实际大小等比缩放
+    mouth: generate_mouth 的参数（不含 size）
+    eyes/nose/mouth 为 None 时不画该部件。
+    quality 为 'high'/'ultra' 时各部件都用超采样抗锯齿绘制。
+    """
+    face = dict(face or {})
+    size = face.get('size', 150)
+    lay = default_layout(size)
+    lay.update(layout or {})
+
+    img = Image.new("RGBA", (size*2, size*2), (255,255,255,0))
+    cx = cy = size
+
+    # 1. 脸型、鼻子、嘴巴：同一份显示列表一次回放到画布上
+    character_layers(face, nose, mouth, lay).replay(make_draw(img, quality))
+
+    # 2. 眼睛：按目标尺寸渲染一次，两侧原地合成；超出画布的部分裁掉，不挪动位置
+    if eyes is not None:
+        e = lay['eye_size']
+        eye = generate_eyeball(size=e, quality=quality, **{k: v for k, v in eyes.items() if k != 'size'})
+        ey = cy + lay['eye_offset_y'] - e//2
+        for ex in (cx - lay['eye_offset_x'], cx + lay['eye_offset_x']):
+            sx, sy = max(0, e//2 - ex), max(0, -ey)
+            if sx >= eye.width or sy >= eye.height:
+                continue    # 整只眼都在画布左侧/上方之外
+            img.alpha_composite(eye, dest=(max(0, ex - e//2), max(0, ey)), source=(sx, sy))
+
+    return img
+
+# =================== 随机参数 ===================
+def random_character_params(rng=random, size=150):
+    """随机整脸参数，返回可直接传给 compose_character 的字典"""
+    face = random_face_params(rng, size=size)
+    face.pop('with_features')
+    eyes = random_eyeball_params(rng)
+    eyes.pop('size')
+    mouth = random_mouth_params(rng)
+    mouth.pop('size')
+    return dict(face=face, eyes=eyes, nose=random_nose_params(rng), mouth=mouth)
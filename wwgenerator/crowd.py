@@ -0,0 +1,236 @@
+"""
+小人群：成千上万个小人的参数按列存成 NumPy 数组（结构数组，SoA），
+每帧一次向量化更新全部偏移，再按图元类型批量光栅化到同一张图上，
+没有逐个对象的 Python 开销。
+光栅化按像素中心判定是否落在图元内（不抗锯齿），与逐个 PIL 绘制的边缘可能差一像素。
+同一类图元对所有小人一起画，网格排布时小人互不重叠，结果与逐个绘制相同。
+"""
+import math
+
+import numpy as np
+from PIL import Image
+
+from .animator import BODY_COLORS, NOSE_COLOR, SKIN_COLOR
+from .primitives import rgba
+
+# 小人（含四肢摆动范围）在 400x400 原始坐标中所占的区域
+FIGURE_BOX = (105, 45, 295, 320)
+HEAD_X, HEAD_Y = 200, 100
+NOSE_W, NOSE_H = 8, 10
+
+def grid_layout(n, width, height, box=FIGURE_BOX):
+    """n 个小人均匀排成网格铺满 width x height，返回每个小人的 (原点 x, 原点 y, 缩放)；n 为 0 时返回空列表"""
+    if n < 0:
+        raise ValueError(f"crowd size must be >= 0, got {n}")
+    if n == 0:
+        return []
+    x0, y0, x1, y1 = box
+    fig_w, fig_h = x1 - x0, y1 - y0
+    cols = max(1, min(n, math.ceil(math.sqrt(n * width * fig_h / (height * fig_w)))))
+    rows = math.ceil(n / cols)
+    cell_w, cell_h = width / cols, height / rows
+    scale = min(1.0, cell_w / fig_w, cell_h / fig_h)
+    pad_x = (cell_w - fig_w*scale) / 2 - x0*scale
+    pad_y = (cell_h - fig_h*scale) / 2 - y0*scale
+    return [((i % cols)*cell_w + pad_x, (i // cols)*cell_h + pad_y, scale) for i in range(n)]
+
+def _pack(color):
+    return np.array(rgba(color), dtype=np.uint8).view(np.uint32)[0]
+
+# =================== 批量光栅化 ===================
+def _stamp(buf, left, top, w, h, inside, color):
+    """
+    对 N 个小人各取一个 w x h 的像素窗口（左上角 left/top，形状 (N,)），
+    inside(X, Y) 返回 (N, h, w) 的布尔掩码，命中的像素写入 color（标量或 (N,)）。
+    """
+    H, W = buf.shape
+    xs = left[:, None, None] + np.arange(w)[None, None, :]
+    ys = top[:, None, None] + np.arange(h)[None, :, None]
+    mask = inside(xs + 0.5, ys + 0.5)
+    mask &= (xs >= 0) & (xs < W) & (ys >= 0) & (ys < H)
+    n, yy, xx = np.nonzero(mask)
+    buf[top[n] + yy, left[n] + xx] = color[n] if np.ndim(color) else color
+
+def _col(a):
+    return a[:, None, None]
+
+def fill_ellipses(buf, cx, cy, rx, ry, color):
+    """填充 N 个轴对齐椭圆（画布像素坐标，浮点）"""
+    rx_max, ry_max = float(rx.max()), float(ry.max())
+    left = np.floor(cx - rx_max).astype(np.int64) - 1
+    top = np.floor(cy - ry_max).astype(np.int64) - 1
+    w, h = math.ceil(2*rx_max) + 3, math.ceil(2*ry_max) + 3
+    rx2, ry2 = _col(np.maximum(rx, 1e-6)), _col(np.maximum(ry, 1e-6))
+    _stamp(buf, left, top, w, h,
+           lambda X, Y: ((X - _col(cx))/rx2)**2 + ((Y - _col(cy))/ry2)**2 <= 1, color)
+
+def fill_rects(buf, x0, y0, x1, y1, color):
+    left = np.floor(x0).astype(np.int64)
+    top = np.floor(y0).astype(np.int64)
+    w = math.ceil(float((x1 - x0).max())) + 2
+    h = math.ceil(float((y1 - y0).max())) + 2
+    _stamp(buf, left, top, w, h,
+           lambda X, Y: (X >= _col(x0)) & (X <= _col(x1)) & (Y >= _col(y0)) & (Y <= _col(y1)), color)
+
+def fill_triangles(buf, pts, color):
+    """pts: (N, 3, 2)，按半平面判定"""
+    lo, hi = pts.min(axis=1), pts.max(axis=1)
+    left = np.floor(lo[:, 0]).astype(np.int64) - 1
+    top = np.floor(lo[:, 1]).astype(np.int64) - 1
+    w = math.ceil(float((hi[:, 0] - lo[:, 0]).max())) + 3
+    h = math.ceil(float((hi[:, 1] - lo[:, 1]).max())) + 3
+
+    def inside(X, Y):
+        signs = []
+        for i in range(3):
+            ax, ay = _col(pts[:, i, 0]), _col(pts[:, i, 1])
+            bx, by = _col(pts[:, (i+1) % 3, 0]), _col(pts[:, (i+1) % 3, 1])
+            signs.append((bx - ax)*(Y - ay) - (by - ay)*(X - ax))
+        return (((signs[0] >= 0) & (signs[1] >= 0) & (signs[2] >= 0)) |
+                ((signs[0] <= 0) & (signs[1] <= 0) & (signs[2] <= 0)))
+    _stamp(buf, left, top, w, h, inside, color)
+
+def draw_segments(buf, ax, ay, bx, by, width, color):
+    """N 条宽 width 的线段：到线段距离不超过 width/2 的像素"""
+    r = width / 2
+    left = np.floor(np.minimum(ax, bx) - r).astype(np.int64) - 1
+    top = np.floor(np.minimum(ay, by) - r).astype(np.int64) - 1
+    w = math.ceil(float(np.abs(bx - ax).max()) + 2*r) + 3
+    h = math.ceil(float(np.abs(by - ay).max()) + 2*r) + 3
+    dx, dy = bx - ax, by - ay
+    len2 = np.maximum(dx*dx + dy*dy, 1e-9)
+
+    def inside(X, Y):
+        px, py = X - _col(ax), Y - _col(ay)
+        t = np.clip((px*_col(dx) + py*_col(dy)) / _col(len2), 0, 1)
+        ex, ey = px - t*_col(dx), py - t*_col(dy)
+        return ex*ex + ey*ey <= r*r
+    _stamp(buf, left, top, w, h, inside, color)
+
+# =================== 小人群 ===================
+class Crowd:
+    """
+    crowd = Crowd(2000, seed=1, size=(1600, 1200))
+    for _ in range(24):
+        crowd.step()
+        frame = crowd.render()
+    参数取值范围与 animator.Character 相同，但由 NumPy 生成器批量采样。
+    """
+    def __init__(self, n, seed=None, size=(800, 600), chunk=1024):
+        if n < 0:
+            raise ValueError(f"crowd size must be >= 0, got {n}")
+        self.n = n
+        self.size = size
+        self.chunk = chunk
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+        layout = np.array(grid_layout(n, *size), dtype=np.float64).reshape(n, 3)
+        self.origin_x, self.origin_y = layout[:, 0], layout[:, 1]
+        self.scale = float(layout[0, 2]) if n else 1.0
+
+    def reset(self):
+        """重新随机所有小人的外形"""
+        n, rng = self.n, self.rng
+
+        def randint(lo, hi):
+            return rng.integers(lo, hi + 1, size=n)
+        self.head_width = randint(50, 80)
+        self.head_height = randint(60, 90)
+        self.eye_spacing = randint(20, 35)
+        self.eye_size = randint(5, 12)
+        self.mouth_width = randint(20, 40)
+        self.body_width = randint(40, 60)
+        self.body_height = randint(60, 100)
+        self.arm_length = randint(30, 50)
+        self.leg_length = randint(40, 60)
+        self.body_color = rng.integers(0, len(BODY_COLORS), size=n)
+        self.off_head = np.zeros(n, dtype=np.int64)
+        self.off_arm = np.zeros(n, dtype=np.int64)
+        self.off_leg = np.zeros(n, dtype=np.int64)
+        self.arm_dy = np.zeros((n, 2), dtype=np.int64)
+
+    def step(self):
+        """一次向量化更新全部小人的运动偏移"""
+        n, rng = self.n, self.rng
+        self.off_head = rng.integers(-3, 4, size=n)
+        self.off_arm = rng.integers(-5, 6, size=n)
+        self.off_leg = rng.integers(-3, 4, size=n)
+        self.arm_dy = rng.integers(-10, 11, size=(n, 2))
+
+    def render(self, background=(255, 255, 255, 255)):
+        """把整群小人画到一张图上"""
+        w, h = self.size
+        buf = np.full((h, w), _pack(background), dtype=np.uint32)
+        for start in range(0, self.n, self.chunk):
+            self._render_chunk(buf, slice(start, start + self.chunk))
+        return Image.fromarray(buf.view(np.uint8).reshape(h, w, 4), "RGBA")
+
+    def _render_chunk(self, buf, sl):
+        s = self.scale
+        ox, oy = self.origin_x[sl], self.origin_y[sl]
+
+        def X(x):   # 原始坐标 -> 画布坐标（包围盒类坐标按像素格子中心对齐）
+            return ox + (x + 0.5)*s
+
+        def Y(y):
+            return oy + (y + 0.5)*s
+
+        line = max(1.0, s)       # 1 像素描边
+        black, white = _pack("black"), _pack("white")
+        h = self.off_head[sl]
+        hx, hy = HEAD_X + h, HEAD_Y + h
+        hw2, hh2 = self.head_width[sl]//2, self.head_height[sl]//2
+
+        # 头部：先画描边色的整椭圆，再画内缩的皮肤色
+        fill_ellipses(buf, X(hx), Y(hy), (hw2 + 0.5)*s, (hh2 + 0.5)*s, black)
+        fill_ellipses(buf, X(hx), Y(hy), (hw2 + 0.5)*s - line, (hh2 + 0.5)*s - line, _pack(SKIN_COLOR))
+
+        # 眼睛、瞳孔：水平方向多移一个头部偏移
+        eye_y = hy - self.head_height[sl]//8
+        es, ps = self.eye_size[sl], self.eye_size[sl]//2
+        for side in (-1, 1):
+            ex = HEAD_X + side*self.eye_spacing[sl] + 2*h
+            fill_ellipses(buf, X(ex), Y(eye_y), (es + 0.5)*s, (es + 0.5)*s, black)
+            fill_ellipses(buf, X(ex), Y(eye_y), (es + 0.5)*s - line, (es + 0.5)*s - line, white)
+        for side in (-1, 1):
+            ex = HEAD_X + side*self.eye_spacing[sl] + 2*h
+            fill_ellipses(buf, X(ex), Y(eye_y), (ps + 0.5)*s, (ps + 0.5)*s, black)
+
+        # 鼻子
+        nose = np.stack([np.stack([X(hx), Y(hy - NOSE_H//2)], axis=1),
+                         np.stack([X(hx - NOSE_W//2), Y(hy + NOSE_H//2)], axis=1),
+                         np.stack([X(hx + NOSE_W//2), Y(hy + NOSE_H//2)], axis=1)], axis=1)
+        fill_triangles(buf, nose, _pack(NOSE_COLOR))
+
+        # 嘴巴
+        mouth_y = Y(hy + self.head_height[sl]//4)
+        mw2 = self.mouth_width[sl]//2
+        draw_segments(buf, X(hx - mw2), mouth_y, X(hx + mw2), mouth_y, max(1.0, 2*s), _pack("red"))
+
+        # 身体
+        top = hy + hh2
+        bw2, bh = self.body_width[sl]//2, self.body_height[sl]
+        colors = np.array([_pack(c) for c in BODY_COLORS], dtype=np.uint32)[self.body_color[sl]]
+        fill_rects(buf, X(hx - bw2) - 0.5*s, Y(top) - 0.5*s, X(hx + bw2) + 0.5*s, Y(top + bh) + 0.5*s, black)
+        fill_rects(buf, X(hx - bw2) - 0.5*s + line, Y(top) - 0.5*s + line,
+                   X(hx + bw2) + 0.5*s - line, Y(top + bh) + 0.5*s - line, colors)
+
+        # 四肢
+        limb_w = max(1.0, 3*s)
+        a, l = self.off_arm[sl], self.off_leg[sl]
+        al = self.arm_length[sl]
+        draw_segments(buf, X(hx - bw2), Y(top + 20), X(hx - bw2 - al + a), Y(top + 20 + self.arm_dy[sl, 0]),
+                      limb_w, black)
+        draw_segments(buf, X(hx + bw2), Y(top + 20), X(hx + bw2 + al + a), Y(top + 20 + self.arm_dy[sl, 1]),
+                      limb_w, black)
+        bw4, ll = self.body_width[sl]//4, self.leg_length[sl]
+        for lx in (hx - bw4, hx + bw4):
+            draw_segments(buf, X(lx), Y(top + bh), X(lx + l), Y(top + bh + ll), limb_w, black)
+
+    def render_frames(self, count, background=(255, 255, 255, 255)):
+        """推进 count 帧并逐帧渲染"""
+        frames = []
+        for _ in range(count):
+            self.step()
+            frames.append(self.render(background))
+        return frames
@@ -0,0 +1,220 @@
+"""
+训练数据集输出：固定尺寸的 RGBA 渲染结果直接写进预分配的 .npy 内存映射（N×H×W×4 uint8），
+旁边是一张同样按行对齐的结构化参数表，训练时 mmap 后切片即可，不必解码 PNG：
+    ds = load_dataset("ds/")
+    batch = ds.images[1000:1256]          # (256, H, W, 4)，零拷贝
+    ds.params['iris_color.h'][1000:1256]
+文件夹内容：
+    meta.json     部件、seed、起始编号、行数、图像尺寸、画质
+    images.npy    N×H×W×4 uint8
+    params.npy    结构化数组，字段为展开后的参数（见 library.flatten_params）
+    written.npy   每行是否已写入；中断后重跑同一命令只补未写的行
+    labels.npy    （可选）N×H×W uint8 类别图，类别名记在 meta.json 的 classes 中
+第 row 行对应采样编号 start+row，与同一 seed 的 batch 输出一一对应。
+"""
+import io
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .batch import PARTS, _map_chunks, make_sampler
+from .labels import LABEL_GENERATORS
+from .library import flatten_params
+
+META_NAME = "meta.json"
+TEXT_DTYPE = "U32"
+
+Dataset = namedtuple("Dataset", "images params written meta labels")
+
+def _path(folder, name):
+    return os.path.join(folder, name)
+
+def param_fields(params):
+    """
+    由一份样例参数确定参数表字段：数值为 float64，文本为定长字符串。
+    样例应含全部可能的键（见 ParamSampler.template），否则之后的行写不进参数表。
+    """
+    return [(key, "f8" if num is not None else TEXT_DTYPE)
+            for key, num, _ in flatten_params(params)]
+
+def _empty_row(fields):
+    """参数表的空行：数值为 NaN，文本为空串"""
+    row = np.zeros((), dtype=[tuple(f) for f in fields])
+    for name, dtype in fields:
+        row[name] = np.nan if dtype == "f8" else ""
+    return row
+
+def create_dataset(folder, part, seed, count, shape, fields, start=1, size=None, classes=None,
+                   quality='normal'):
+    """预分配全部文件；shape 为单张图像的 (高, 宽)；给出 classes（类别名）时另建类别图数组"""
+    os.makedirs(folder, exist_ok=True)
+    h, w = shape
+    open_memmap = np.lib.format.open_memmap
+    open_memmap(_path(folder, "images.npy"), mode="w+", dtype=np.uint8, shape=(count, h, w, 4))
+    params = open_memmap(_path(folder, "params.npy"), mode="w+", dtype=_empty_row(fields).dtype,
+                         shape=(count,))
+    params[:] = _empty_row(fields)
+    params.flush()
+    open_memmap(_path(folder, "written.npy"), mode="w+", dtype=np.bool_, shape=(count,))
+    if classes:
+        open_memmap(_path(folder, "labels.npy"), mode="w+", dtype=np.uint8, shape=(count, h, w))
+    meta = {'part': part, 'seed': seed, 'start': start, 'count': count, 'size': size,
+            'quality': quality, 'height': h, 'width': w, 'fields': fields, 'classes': list(classes or [])}
+    with open(_path(folder, META_NAME), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    return meta
+
+def _grow_npy(path, count, fill=None):
+    """
+    把 .npy 的第一维扩到 count：新头部与旧头部等长时（numpy 写头部时为形状预留了位数，通常如此）
+    只改头部并加长文件，已有数据不动；否则复制一次。新增行填 fill（默认 0）。
+    """
+    fmt = np.lib.format
+    arr = np.load(path, mmap_mode="r")
+    old, offset = arr.shape[0], arr.offset
+    shape = (count,) + arr.shape[1:]
+    header = io.BytesIO()
+    fmt.write_array_header_1_0(header, {'descr': fmt.dtype_to_descr(arr.dtype),
+                                        'fortran_order': False, 'shape': shape})
+    if header.tell() == offset:
+        nbytes = arr.dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+        del arr
+        with open(path, "r+b") as f:
+            f.write(header.getvalue())
+            f.truncate(offset + nbytes)
+    else:
+        grown = fmt.open_memmap(path + ".tmp", mode="w+", dtype=arr.dtype, shape=shape)
+        grown[:old] = arr
+        grown.flush()
+        del arr, grown
+        os.replace(path + ".tmp", path)
+    if fill is not None:
+        arr = np.load(path, mmap_mode="r+")
+        arr[old:] = fill
+        arr.flush()
+
+def extend_dataset(folder, count):
+    """把数据集扩到 count 行，新行标记为未写入，返回更新后的 meta"""
+    meta = load_dataset(folder).meta
+    _grow_npy(_path(folder, "images.npy"), count)
+    _grow_npy(_path(folder, "params.npy"), count, fill=_empty_row(meta['fields']))
+    _grow_npy(_path(folder, "written.npy"), count)
+    if meta.get('classes'):
+        _grow_npy(_path(folder, "labels.npy"), count)
+    meta['count'] = count
+    with open(_path(folder, META_NAME), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    return meta
+
+def load_dataset(folder, mode="r"):
+    """打开数据集，mode='r' 只读映射，'r+' 可写；没有类别图时 labels 为 None"""
+    with open(_path(folder, META_NAME), encoding="utf-8") as f:
+        meta = json.load(f)
+    images, params, written = (np.load(_path(folder, f"{name}.npy"), mmap_mode=mode)
+                               for name in ("images", "params", "written"))
+    labels = np.load(_path(folder, "labels.npy"), mmap_mode=mode) if meta.get('classes') else None
+    return Dataset(images, params, written, meta, labels)
+
+def write_rows(params_table, rows, fields):
+    """把 [(行号, 参数)] 写进结构化参数表；参数表没有的键报错，避免参数静默丢失"""
+    kinds = dict(fields)
+    for row, params in rows:
+        record = params_table[row]
+        for key, num, text in flatten_params(params):
+            if key not in kinds:
+                raise ValueError(f"row {row}: parameter {key!r} has no column in the dataset")
+            record[key] = num if kinds[key] == "f8" else text
+
+def render_chunk_dataset(part, seed, start, stop, out_dir, size=None, quality='normal'):
+    """
+    在工作进程中渲染编号 [start, stop) 并直接写进 images.npy 的对应行（各进程写互不重叠的行），
+    返回 [(行号, 参数)]，参数表与写入标记由主进程统一更新。
+    """
+    ds = load_dataset(out_dir, mode="r+")
+    first = ds.meta['start']
+    shape = ds.images.shape[1:3]
+    generate = LABEL_GENERATORS[part][0] if ds.labels is not None else PARTS[part][0]
+    rows = []
+    for idx, params in make_sampler(part, seed, size).samples(start, stop):
+        img = generate(quality=quality, **params)
+        if ds.labels is not None:
+            img, mask = img
+            ds.labels[idx - first] = np.asarray(mask)
+        img = img.convert("RGBA")
+        if (img.height, img.width) != shape:
+            raise ValueError(f"{part}_{idx} is {img.width}x{img.height}, dataset expects "
+                             f"{shape[1]}x{shape[0]}")
+        ds.images[idx - first] = np.asarray(img)
+        rows.append((idx - first, params))
+    ds.images.flush()
+    if ds.labels is not None:
+        ds.labels.flush()
+    return rows
+
+def _missing_ranges(written, lo, hi, chunk_size):
+    """[lo, hi) 中尚未写入的行，切成最长 chunk_size 的连续区间"""
+    todo = np.flatnonzero(~written[lo:hi]) + lo
+    if not len(todo):
+        return []
+    # 按连续段切开，再把长段切成块
+    breaks = np.flatnonzero(np.diff(todo) != 1) + 1
+    ranges = []
+    for seg in np.split(todo, breaks):
+        for s in range(seg[0], seg[-1] + 1, chunk_size):
+            ranges.append((int(s), int(min(s + chunk_size, seg[-1] + 1))))
+    return ranges
+
+def run_dataset(part, count, out_dir, seed=0, start=1, workers=None, size=None, chunk_size=64,
+                quality='normal', rows=None, labels=False, progress=None):
+    """
+    把编号 [start, start+count) 的部件写成内存映射数据集。
+    out_dir 已有数据集时必须是同一 part/seed/start，只补尚未写入的行，可随时中断后续跑；
+    count 大于已有行数时原地追加新行（已写入的行不动）。
+    rows=(lo, hi) 时只填这一段行，便于多台机器按区间分工。返回本次写入的行数。
+    """
+    if part not in PARTS:
+        raise ValueError(f"part must be one of {', '.join(PARTS)}")
+    if labels and part not in LABEL_GENERATORS:
+        raise ValueError(f"labels support only {', '.join(LABEL_GENERATORS)}")
+    sampler = make_sampler(part, seed, size)
+    if os.path.exists(_path(out_dir, META_NAME)):
+        meta = load_dataset(out_dir).meta
+        expected = {'part': part, 'seed': seed, 'start': start, 'size': size,
+                    'quality': quality, 'labels': bool(labels)}
+        actual = dict(meta, quality=meta.get('quality', 'normal'), labels=bool(meta.get('classes')))
+        diff = {k: actual[k] for k in expected if actual[k] != expected[k]}
+        if diff:
+            raise ValueError(f"existing dataset in {out_dir} differs: {diff}")
+        if count < meta['count']:
+            raise ValueError(f"dataset in {out_dir} already has {meta['count']} rows")
+        if count > meta['count']:
+            meta = extend_dataset(out_dir, count)
+    else:
+        generate, _ = PARTS[part]
+        first = generate(quality=quality, **sampler.sample(start))
+        meta = create_dataset(out_dir, part, seed, count, (first.height, first.width),
+                              param_fields(sampler.template(start)), start, size,
+                              LABEL_GENERATORS[part][1] if labels else None, quality)
+
+    ds = load_dataset(out_dir, mode="r+")
+    lo, hi = rows or (0, count)
+    ranges = _missing_ranges(ds.written, lo, hi, chunk_size)
+    total = sum(b - a for a, b in ranges)
+    done = 0
+    # 块按采样编号提交；写入标记在参数表之后更新，中断时最多重做在途的块
+    chunks = ((start + a, start + b) for a, b in ranges)
+    args = (part, seed, out_dir, size, quality)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for (a, b), written_rows in _map_chunks(pool, render_chunk_dataset, chunks, args,
+                                                workers*2):
+            write_rows(ds.params, written_rows, meta['fields'])
+            ds.params.flush()
+            ds.written[a - start:b - start] = True
+            ds.written.flush()
+            done += b - a
+            if progress: progress(done, total)
+    return done
@@ -0,0 +1,179 @@
+"""
+随机批次去重：各参数独立采样，大批量中有不少看起来完全一样的部件（如无鼻孔时鼻孔参数全部无效、
+嘴巴只有三种形状）。离散参数相同的部件分在一桶，桶内比较数值参数与差值哈希（dHash）：
+    for params, img in iter_distinct('mouth', seed=1, n=500):
+        ...
+只与同一桶内 dHash 某一段相同的已有部件比较。
+"""
+import os
+
+from PIL import Image
+
+from .batch import PARTS
+from .export import PngExporter
+from .stream import iter_random
+from .trim import png_info, trim as trim_margins
+
+# 部件 -> 参数中不影响画面的字段；量化前剔除，避免同一画面落进不同的桶
+HOLE_FIELDS = ('hole_color', 'hole_shape', 'hole_size', 'hole_offset', 'hole_vertical_offset')
+IRRELEVANT = {
+    'nose': lambda p: () if p.get('has_holes') else HOLE_FIELDS,
+    'mouth': lambda p: ('mouth_height_ratio',) if p.get('mouth_shape') in ('line', 'circle') else (),
+}
+
+def dhash(img, hash_size=8):
+    """
+    差值哈希：铺在中灰底上转灰度、缩到 (hash_size+1)×hash_size，
+    比较每行相邻像素的明暗，得到 hash_size² 位整数。透明区域与轮廓都会反映在哈希中。
+    """
+    if img.mode == "RGBA":
+        base = Image.new("RGBA", img.size, (128, 128, 128, 255))
+        img = Image.alpha_composite(base, img)
+    small = img.convert("L").resize((hash_size + 1, hash_size), Image.BOX)
+    px = small.tobytes()
+    bits = 0
+    for y in range(hash_size):
+        row = px[y*(hash_size+1):(y+1)*(hash_size+1)]
+        for x in range(hash_size):
+            bits = (bits << 1) | (row[x] > row[x+1])
+    return bits
+
+class DedupIndex:
+    """
+    内存中的去重索引。判定近似重复须同时满足：
+    文本/布尔等离散参数完全相同（作为分桶键）；dHash 汉明距离不超过 max_distance；
+    各数值参数相差不超过各自容差（颜色分量 color_step，小数 ratio_step，整数 int_step）。
+    颜色只能靠参数比较（dHash 只看明暗）。数值参数用容差比较而不量化分桶，
+    相近的两个值不会因落在量化边界两侧而漏比。
+    桶内按 dHash 分段做多索引：汉明距离不超过 k 的两个哈希切成 k+1 段时至少有一段完全相同，
+    只需比较某一段相同的候选。
+    """
+    def __init__(self, part, max_distance=4, hash_size=8, color_step=32, ratio_step=0.02,
+                 int_step=3):
+        self.part = part
+        self.max_distance = max_distance
+        self.hash_size = hash_size
+        self.color_step = color_step
+        self.ratio_step = ratio_step
+        self.int_step = int_step
+        bits = hash_size * hash_size
+        n = max(1, min(max_distance + 1, bits))
+        # 各段的 (位移, 掩码)
+        edges = [bits * i // n for i in range(n + 1)]
+        self._bands = [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(edges, edges[1:])]
+        self.buckets = {}       # 离散键 -> (条目列表, [各段: {段值: [条目下标]}])
+        self.checked = 0
+        self.duplicates = 0
+
+    def _split(self, value, prefix, discrete, numeric):
+        """把参数拆成离散部分 [(键, 值)] 与数值部分 [(键, 值, 容差)]"""
+        if isinstance(value, dict):
+            for k in sorted(value):
+                self._split(value[k], f"{prefix}.{k}", discrete, numeric)
+        elif isinstance(value, (tuple, list)):
+            step = self.color_step if all(isinstance(v, int) for v in value) else None
+            for i, v in enumerate(value):
+                if step is not None and not isinstance(v, bool):
+                    numeric.append((f"{prefix}[{i}]", v, step))
+                else:
+                    self._split(v, f"{prefix}[{i}]", discrete, numeric)
+        elif isinstance(value, (bool, str)) or value is None:
+            discrete.append((prefix, value))
+        elif isinstance(value, int):
+            numeric.append((prefix, value, self.int_step))
+        else:
+            numeric.append((prefix, value, self.ratio_step))
+
+    def key(self, params):
+        """
+        (分桶键, 数值参数)：分桶键为离散参数，数值参数为 [(键, 值, 容差)]；
+        剔除当前参数下不影响画面的字段
+        """
+        skip = IRRELEVANT.get(self.part, lambda p: ())(params)
+        discrete, numeric = [], []
+        for k in sorted(params):
+            if k not in skip:
+                self._split(params[k], k, discrete, numeric)
+        # 数值参数的键也进分桶键，保证同一桶内数值参数一一对应
+        return tuple(discrete) + tuple(k for k, _, _ in numeric), numeric
+
+    def _close(self, a, b):
+        return all(abs(x - y) <= step for (_, x, step), (_, y, _) in zip(a, b))
+
+    def _find(self, entries, bands, h, numeric):
+        seen = set()
+        for (shift, mask), index in zip(self._bands, bands):
+            for i in index.get((h >> shift) & mask, ()):
+                if i in seen:
+                    continue
+                seen.add(i)
+                other, other_numeric = entries[i]
+                if (h ^ other).bit_count() <= self.max_distance and self._close(numeric, other_numeric):
+                    return True
+        return False
+
+    def add(self, params, img):
+        """新部件记入索引并返回 True；与已有部件近似重复时返回 False"""
+        self.checked += 1
+        key, numeric = self.key(params)
+        entries, bands = self.buckets.setdefault(key, ([], [{} for _ in self._bands]))
+        h = dhash(img, self.hash_size)
+        if self._find(entries, bands, h, numeric):
+            self.duplicates += 1
+            return False
+        for (shift, mask), index in zip(self._bands, bands):
+            index.setdefault((h >> shift) & mask, []).append(len(entries))
+        entries.append((h, numeric))
+        return True
+
+    def __len__(self):
+        return self.checked - self.duplicates
+
+def unique(items, dedup, n=None, patience=1000):
+    """
+    过滤 (参数, 图像) 流，只保留不重复的，最多 n 个。
+    连续 patience 个都重复时认为参数空间已接近取尽，提前停止。
+    """
+    if n is not None and n <= 0:
+        return
+    found = misses = 0
+    for params, img in items:
+        if dedup.add(params, img):
+            yield params, img
+            found += 1
+            misses = 0
+            if n is not None and found >= n:
+                return
+        else:
+            misses += 1
+            if misses >= patience:
+                return
+
+def iter_distinct(part, seed=0, n=None, max_distance=4, patience=1000, **kwargs):
+    """产出 n 个互不重复的 (参数, 图像)；其余关键字参数同 stream.iter_random"""
+    return unique(iter_random(part, seed, None, **kwargs), DedupIndex(part, max_distance),
+                  n, patience)
+
+def run_distinct(part, count, out_dir, seed=0, start=1, workers=None, size=None, chunk_size=64,
+                 progress=None, trim=False, png_preset='default', quality='normal', index=False,
+                 max_distance=4, patience=1000):
+    """
+    同 batch.run_batch，但生成 count 个互不重复的部件（而非 count 次采样）。
+    渲染仍由多进程完成，去重与写盘在主进程按采样顺序进行，结果可由 seed 复现；
+    文件编号从 start 起连续。参数空间取尽时提前结束，返回实际保存数量。
+    """
+    _, prefix = PARTS[part]
+    items = iter_random(part, seed, None, size=size, quality=quality,
+                        workers=workers or os.cpu_count() or 1, chunk_size=chunk_size)
+    done = 0
+    with PngExporter(out_dir, prefix, preset=png_preset, start=start,
+                     library=True if index else None, part=part) as exporter:
+        for params, img in unique(items, DedupIndex(part, max_distance), count, patience):
+            meta = {}
+            if trim:
+                img, meta = trim_margins(img)
+            exporter.submit(img, pnginfo=png_info(meta) if meta else None, params=params)
+            done += 1
+            if progress and (done % chunk_size == 0 or done == count):
+                progress(done, count)
+    return done
@@ -0,0 +1,132 @@
+"""
+PNG 导出流水线：有界队列 + 编码线程池（zlib 压缩时释放 GIL，多线程可并行），
+主线程只负责提交，不再逐张同步 save。
+文件编号在内存中原子分配，只在打开时扫描一次目录，不再逐个 os.path.exists 探测。
+"""
+import itertools
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .library import AssetLibrary
+from .metrics import timed
+
+# 压缩预设：预览/中间结果用 fast，发布用 small
+PNG_PRESETS = {
+    'fast': {'compress_level': 1},
+    'default': {'compress_level': 6},
+    'small': {'compress_level': 9, 'optimize': True},
+}
+
+def next_free_index(folder, prefix):
+    """扫描一次目录，返回 prefix_N.png 中最大 N + 1"""
+    pattern = re.compile(rf"{re.escape(prefix)}_(\d+)\.png$")
+    highest = 0
+    if os.path.isdir(folder):
+        with os.scandir(folder) as it:
+            for entry in it:
+                m = pattern.match(entry.name)
+                if m:
+                    highest = max(highest, int(m.group(1)))
+    return highest + 1
+
+class PngExporter:
+    """
+    用法：
+        with PngExporter(folder, "eye") as exporter:
+            for img in images:
+                exporter.submit(img)
+    在途（排队 + 编码中）的图像数超过 max_pending 时 submit 阻塞，内存有上限。
+    start 为 None 时从目录中已有的最大编号之后继续。
+    library 为 AssetLibrary（或 True 表示在 folder 中打开一份）时，每张写完后记录
+    submit 传入的参数、尺寸和像素哈希，part 为记录的部件名。
+    """
+    def __init__(self, folder, prefix, preset='default', workers=None, max_pending=64, start=None,
+                 library=None, part=None):
+        self.folder = folder
+        self.prefix = prefix
+        self.part = part or prefix
+        self._own_library = library is True
+        self.library = AssetLibrary(folder) if library is True else library
+        self.save_kwargs = dict(PNG_PRESETS[preset])
+        os.makedirs(folder, exist_ok=True)
+        if start is None:
+            start = next_free_index(folder, prefix)
+        self._counter = itertools.count(start)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1),
+                                        thread_name_prefix="png-export")
+        self._futures = []
+        self.saved = 0
+
+    def next_index(self):
+        with self._lock:
+            return next(self._counter)
+
+    def submit(self, img, index=None, pnginfo=None, params=None, on_saved=None):
+        """
+        提交一张图，立即返回目标路径；编码与写盘在线程池中完成，params 写入素材库索引。
+        on_saved(path, error) 在写完（或失败）后于编码线程中调用，error 成功时为 None。
+        """
+        if index is None:
+            index = self.next_index()
+        path = os.path.join(self.folder, f"{self.prefix}_{index}.png")
+        self._slots.acquire()
+        future = self._pool.submit(self._save, img, path, pnginfo, params, on_saved)
+        with self._lock:
+            # 只留下未完成和失败的，长时间打开的导出器（如 GUI 单张保存）不会无限增长
+            self._futures = [f for f in self._futures if not f.done() or f.exception()]
+            self._futures.append(future)
+        return path
+
+    def _save(self, img, path, pnginfo, params, on_saved=None):
+        try:
+            kwargs = dict(self.save_kwargs)
+            if pnginfo is not None:
+                kwargs['pnginfo'] = pnginfo
+            with timed('encode', part=self.part):
+                img.save(path, format="PNG", **kwargs)
+            if self.library is not None:
+                with timed('index', part=self.part):
+                    self.library.add(path, img, params, self.part)
+            with self._lock:
+                self.saved += 1
+        except Exception as e:
+            if on_saved:
+                on_saved(path, e)
+            raise
+        else:
+            if on_saved:
+                on_saved(path, None)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """等待全部写完，返回保存数量；有写入失败时抛出第一个异常"""
+        self._pool.shutdown(wait=True)
+        if self.library is not None:
+            if self._own_library:
+                self.library.close()
+                self.library = None
+            else:
+                self.library.commit()
+        for f in self._futures:
+            f.result()
+        return self.saved
+
+    def close_async(self, callback):
+        """后台等待写完后调用 callback(saved, error)，GUI 用它避免卡住主线程"""
+        def wait():
+            try:
+                callback(self.close(), None)
+            except Exception as e:
+                callback(self.saved, e)
+        threading.Thread(target=wait, daemon=True).start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
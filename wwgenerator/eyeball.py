@@ -0,0 +1,239 @@
+from PIL import Image, ImageDraw
+import math
+import random
+import numpy as np
+
+from .cache import byte_lru_cache
+from .metrics import timed
+from .primitives import centered_box, rgba
+from .supersample import make_draw
+
+# ===================== 几何缓存上限 =====================
+# 按字节数限制（每个进程各一份）。随机批次中 iris_r = int(ratio*size) 约有 0.3*size 种取值，
+# 乘 4 种纹理即标号图的键空间：128 px 约 160 个键共 5 MB，256 px 约 310 个键共 40 MB，
+# 都能整个装下；512 px 约 620 个键共 310 MB，只装下一部分。
+LABEL_CACHE_BYTES = 256 * 2**20
+RING_CACHE_BYTES = 64 * 2**20
+PUPIL_CACHE_BYTES = 64 * 2**20
+
+def _index_dtype(n):
+    """能装下 0..n 的最小整数类型，缓存的几何数组越小能装的键越多"""
+    return np.uint16 if n < 65536 else np.int32
+
+# ===================== 虹膜纹理渲染 =====================
+IRIS_TEXTURES = ('radial', 'spokes', 'wavy', 'rings')
+
+@byte_lru_cache(RING_CACHE_BYTES)
+def iris_ring_map(iris_r, iris_texture):
+    """
+    虹膜纹理的圈号网格（只与半径和纹理有关，与颜色、画布大小无关）。
+    返回 (ring, pad)：ring 以 (iris_r+pad, iris_r) 为圆心，
+    每个像素记录最后覆盖它的圈号 i+1，0 表示未被任何圈覆盖。
+    圈的光栅化仍用 draw.ellipse，保证与逐圈绘制逐像素一致；结果按几何缓存。
+    """
+    pad = 6 if iris_texture == 'wavy' else 0  # wavy 的圈水平偏移最多 5 像素
+    w, h = 2*(iris_r+pad)+1, 2*iris_r+1
+    label = Image.new("I", (w, h), 0)
+    d = ImageDraw.Draw(label)
+    cx, cy = iris_r+pad, iris_r
+    for i in range(iris_r):
+        if iris_texture == 'radial' or (iris_texture == 'rings' and i % 5 == 0):
+            d.ellipse([cx-i, cy-i, cx+i, cy+i], outline=i+1)
+        elif iris_texture == 'wavy':
+            offset = int(5 * math.sin(i/5))
+            d.ellipse([cx-i+offset, cy-i, cx+i+offset, cy+i], outline=i+1)
+    ring = np.asarray(label).astype(_index_dtype(iris_r + _RING0))
+    ring.setflags(write=False)
+    return ring, pad
+
+def _ring_colors(iris_color, iris_r):
+    """
+    每一圈的渐变颜色表，RGBA 打包成 uint32，下标为圈号 i+1（0 号不使用）。
+    与 int(c*(1-i/iris_r)) 逐圈公式一致。
+    """
+    i = np.arange(iris_r, dtype=np.float64)[:, None]
+    c = np.asarray(iris_color[:3], dtype=np.float64)[None, :]
+    lut = np.zeros((iris_r+1, 4), dtype=np.uint8)
+    lut[1:, :3] = np.minimum(255, (c * (1 - i/iris_r)).astype(np.int64))
+    lut[1:, 3] = 255
+    return lut.view(np.uint32).ravel()
+
+def _spoke_points(center, iris_r, w, h):
+    """36 条辐条上所有点的 (ys, xs)，已裁掉画布外的点"""
+    i = np.arange(iris_r, dtype=np.float64)[:, None]
+    rad = np.radians(np.arange(0, 360, 10, dtype=np.float64))[None, :]
+    xs = (center + i*np.cos(rad)).astype(np.int64).ravel()
+    ys = (center + i*np.sin(rad)).astype(np.int64).ravel()
+    keep = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+    return ys[keep], xs[keep]
+
+def render_iris_texture(arr, center, iris_r, iris_color, iris_texture):
+    """
+    在 RGBA 数组 arr 上原地绘制虹膜纹理：圈号网格 -> 颜色表，一次查表写回，
+    代替逐半径调用 draw.ellipse / draw.point。
+    """
+    h, w = arr.shape[:2]
+
+    if iris_texture == 'spokes':
+        # 36 条辐条上的所有点一次算出并写入
+        arr[_spoke_points(center, iris_r, w, h)] = rgba(iris_color)
+        return
+
+    ring, pad = iris_ring_map(iris_r, iris_texture)
+    # 圈号网格在画布上的位置，超出画布的部分裁掉
+    left, top = center-iris_r-pad, center-iris_r
+    x0, y0 = max(0, left), max(0, top)
+    x1, y1 = min(w, left+ring.shape[1]), min(h, top+ring.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return
+    sub = ring[y0-top:y1-top, x0-left:x1-left]
+    region = arr.view(np.uint32)[y0:y1, x0:x1, 0]
+    np.copyto(region, _ring_colors(iris_color, iris_r)[sub], where=sub > 0)
+
+# ===================== 眼白 + 虹膜的几何缓存 =====================
+# 标号：0 透明，1 眼白，2 虹膜底色，3 spokes 辐条，4+i 为第 i 圈纹理
+_SCLERA, _IRIS, _SPOKE, _RING0 = 1, 2, 3, 4
+
+@byte_lru_cache(LABEL_CACHE_BYTES)
+def eye_label_map(size, iris_r, iris_texture):
+    """
+    眼白、虹膜与纹理的标号图（只与 size、虹膜半径、纹理有关，与颜色无关）。
+    按原绘制顺序把各图元画进同一张标号图，每个像素记录最后覆盖它的图元，
+    换色时只需一次查表，不必重新光栅化。
+    """
+    center = size//2
+    label = Image.new("I", (size, size), 0)
+    d = ImageDraw.Draw(label)
+    d.ellipse([(0,0),(size,size)], fill=_SCLERA)
+    d.ellipse(centered_box((center, center), iris_r), fill=_IRIS)
+    arr = np.asarray(label, dtype=np.int32).copy()
+
+    if iris_r > 0 and iris_texture == 'spokes':
+        arr[_spoke_points(center, iris_r, size, size)] = _SPOKE
+    elif iris_r > 0 and iris_texture in IRIS_TEXTURES:
+        ring, pad = iris_ring_map(iris_r, iris_texture)
+        left, top = center-iris_r-pad, center-iris_r
+        x0, y0 = max(0, left), max(0, top)
+        x1, y1 = min(size, left+ring.shape[1]), min(size, top+ring.shape[0])
+        if x0 < x1 and y0 < y1:
+            sub = ring[y0-top:y1-top, x0-left:x1-left]
+            np.copyto(arr[y0:y1, x0:x1], sub + (_RING0-1), where=sub > 0)
+
+    labels = arr.astype(_index_dtype(iris_r + _RING0))
+    labels.setflags(write=False)
+    return labels
+
+def _pack(color):
+    return np.array(rgba(color), dtype=np.uint8).view(np.uint32)[0]
+
+def _eye_colors(sclera_color, iris_color, iris_r):
+    """标号 -> RGBA（打包为 uint32）的颜色表，即整张眼白 + 虹膜的渐变映射"""
+    lut = np.empty(iris_r + _RING0, dtype=np.uint32)
+    lut[0] = 0
+    lut[_SCLERA] = _pack(sclera_color)
+    lut[_IRIS] = _pack(iris_color)
+    lut[_SPOKE] = _pack(iris_color)
+    lut[_RING0:] = _ring_colors(iris_color, iris_r)[1:]
+    return lut
+
+# ===================== 瞳孔与高光 =====================
+HIGHLIGHT_COLOR = (255,255,255,180)
+
+def draw_pupil(draw, center, pupil_r, pupil_shape, fill):
+    if pupil_shape=='circle':
+        draw.ellipse(centered_box(center, pupil_r), fill=fill)
+    elif pupil_shape=='ellipse':
+        draw.ellipse(centered_box(center, pupil_r, pupil_r//2), fill=fill)
+    elif pupil_shape=='slit':
+        draw.ellipse(centered_box(center, pupil_r//4, pupil_r), fill=fill)
+    elif pupil_shape=='cat':
+        draw.rectangle(centered_box(center, pupil_r//6, pupil_r), fill=fill)
+
+def draw_highlight(draw, center, pupil_r, fill=HIGHLIGHT_COLOR):
+    x, y = center[0]-pupil_r//2, center[1]-pupil_r//2
+    hl_r = int(pupil_r*0.4)
+    draw.ellipse([x, y, x+hl_r, y+hl_r], fill=fill)
+
+def _mask_indices(size, paint):
+    mask = Image.new("L", (size, size), 0)
+    paint(ImageDraw.Draw(mask))
+    idx = np.flatnonzero(np.asarray(mask)).astype(np.int32)
+    idx.setflags(write=False)
+    return idx
+
+@byte_lru_cache(PUPIL_CACHE_BYTES)
+def pupil_indices(size, pupil_r, pupil_shape):
+    """瞳孔覆盖的像素（展平下标），与颜色无关；ImageDraw 实色填充直接覆盖像素，换色只需按下标赋值"""
+    c = size//2
+    return _mask_indices(size, lambda d: draw_pupil(d, (c, c), pupil_r, pupil_shape, 1))
+
+@byte_lru_cache(PUPIL_CACHE_BYTES // 4)
+def highlight_indices(size, pupil_r):
+    """高光覆盖的像素（展平下标）"""
+    c = size//2
+    return _mask_indices(size, lambda d: draw_highlight(d, (c, c), pupil_r, 1))
+
+# ===================== 眼珠生成函数 =====================
+@timed('draw', part='eyeball')
+def generate_eyeball(size=128, iris_radius_ratio=0.45, pupil_radius_ratio=0.3,
+                     iris_color=(0,128,255), sclera_color=(255,255,255),
+                     pupil_color=(0,0,0), pupil_shape='circle',
+                     iris_texture='radial', highlight=True, quality='normal'):
+
+    center = size//2
+    iris_r = int(iris_radius_ratio*size)
+
+    if quality == 'normal':
+        # 1-2. 眼白、虹膜与纹理：几何缓存的标号图 + 本次颜色表，一次查表着色
+        labels = eye_label_map(size, iris_r, iris_texture)
+        arr = _eye_colors(sclera_color, iris_color, iris_r)[labels]
+        img = Image.fromarray(arr.view(np.uint8).reshape(size, size, 4), "RGBA")
+        draw = ImageDraw.Draw(img)
+    else:
+        img = Image.new("RGBA", (size, size), (0,0,0,0))
+        draw = make_draw(img, quality)
+
+        # 1. 眼白
+        draw.ellipse([(0,0),(size,size)], fill=sclera_color)
+
+        # 2. 虹膜
+        draw.ellipse(centered_box((center, center), iris_r), fill=iris_color)
+
+        # 虹膜纹理（NumPy 向量化，整张纹理一次写回）
+        if iris_r > 0 and iris_texture in IRIS_TEXTURES:
+            arr = np.array(img)
+            render_iris_texture(arr, center, iris_r, iris_color, iris_texture)
+            img = Image.fromarray(arr, "RGBA")
+            draw = make_draw(img, quality)
+
+    # 3. 瞳孔
+    pupil_r = int(pupil_radius_ratio*iris_r)
+    draw_pupil(draw, (center, center), pupil_r, pupil_shape, pupil_color)
+
+    # 4. 高光
+    if highlight:
+        draw_highlight(draw, (center, center), pupil_r)
+
+    return img
+
+# ===================== 随机参数 =====================
+PUPIL_SHAPES = ('circle', 'ellipse', 'slit', 'cat')
+
+def random_eyeball_params(rng=random, size=128):
+    """随机眼珠参数，返回可直接传给 generate_eyeball 的字典"""
+    iris_color = tuple(rng.randint(0,255) for _ in range(3))
+    sclera_color = tuple(rng.randint(200,255) for _ in range(3))
+    pupil_color = tuple(rng.randint(0,50) for _ in range(3))
+    iris_texture = rng.choice(list(IRIS_TEXTURES))
+    pupil_shape = rng.choice(list(PUPIL_SHAPES))
+    return dict(
+        size=size,
+        iris_radius_ratio=rng.uniform(0.3,0.6),
+        pupil_radius_ratio=rng.uniform(0.2,0.5),
+        iris_color=iris_color,
+        sclera_color=sclera_color,
+        pupil_color=pupil_color,
+        pupil_shape=pupil_shape,
+        iris_texture=iris_texture,
+        highlight=rng.choice([True,False])
+    )
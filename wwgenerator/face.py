@@ -0,0 +1,128 @@
+from PIL import Image
+import random
+
+from .metrics import timed
+from .primitives import centered_box, outlined_polygon
+from .supersample import make_draw
+
+# =================== 脸型绘制函数 ===================
+def draw_oval_face(draw, center, size, skin_color, outline_color, params):
+    outline_w = params.get('outline_width', 4)
+    width_ratio = params.get('width_ratio', 1.3)  # 默认宽比高大
+    # 控制水平半径比高度窄
+    half_width = min(size / width_ratio, size)
+    draw.ellipse(centered_box(center, half_width, size),
+                 fill=skin_color, outline=outline_color, width=outline_w)
+
+def draw_round_face(draw, center, size, skin_color, outline_color, params):
+    draw.ellipse(centered_box(center, size),
+                 fill=skin_color, outline=outline_color, width=params.get('outline_width', 4))
+
+def draw_square_face(draw, center, size, skin_color, outline_color, params):
+    outline_w = params.get('outline_width', 4)
+    radius = params.get('chin_round', size//8)
+    try:
+        draw.rounded_rectangle(centered_box(center, size), radius=radius,
+                               fill=skin_color, outline=outline_color, width=outline_w)
+    except Exception:
+        draw.rectangle(centered_box(center, size), fill=skin_color, outline=outline_color, width=outline_w)
+
+def draw_triangle_face(draw, center, size, skin_color, outline_color, params):
+    x, y = center
+    outline_w = params.get('outline_width', 4)
+    outlined_polygon(draw, [(x, y-size), (x+size, y+size), (x-size, y+size)],
+                     skin_color, outline_color, outline_w)
+
+def draw_inverted_triangle_face(draw, center, size, skin_color, outline_color, params):
+    x, y = center
+    outline_w = params.get('outline_width', 4)
+    outlined_polygon(draw, [(x-size, y-size), (x+size, y-size), (x, y+size)],
+                     skin_color, outline_color, outline_w)
+
+def draw_diamond_face(draw, center, size, skin_color, outline_color, params):
+    x, y = center
+    outline_w = params.get('outline_width', 4)
+    outlined_polygon(draw, [(x, y-size), (x+size, y), (x, y+size), (x-size, y)],
+                     skin_color, outline_color, outline_w)
+
+FACE_SHAPES = {
+    '椭圆脸': draw_oval_face,
+    '圆脸': draw_round_face,
+    '方脸': draw_square_face,
+    '三角脸': draw_triangle_face,
+    '倒三角脸': draw_inverted_triangle_face,
+    '菱形脸': draw_diamond_face
+}
+
+# 只有部分脸型才用到的 params 键及其默认值
+SHAPE_PARAMS = {
+    '椭圆脸': {'width_ratio': 1.3},
+}
+
+# =================== 五官绘制函数 ===================
+def draw_features(draw, center, size, outline_color, params):
+    x, y = center
+    eye_w = params.get('eye_w', size//6)
+    eye_h = params.get('eye_h', size//12)
+    eye_offset_x = params.get('eye_offset_x', size//3)
+    eye_offset_y = params.get('eye_offset_y', -size//6)
+    nose_w = params.get('nose_w', size//12)
+    nose_h = params.get('nose_h', size//8)
+    mouth_w = params.get('mouth_w', size//2)
+    mouth_h = params.get('mouth_h', size//12)
+
+    # 左眼
+    draw.ellipse(centered_box((x-eye_offset_x, y+eye_offset_y), eye_w, eye_h),
+                 fill=(255,255,255), outline=outline_color, width=2)
+    # 右眼
+    draw.ellipse(centered_box((x+eye_offset_x, y+eye_offset_y), eye_w, eye_h),
+                 fill=(255,255,255), outline=outline_color, width=2)
+    # 鼻子
+    draw.polygon([(x, y), (x-nose_w, y+nose_h), (x+nose_w, y+nose_h)], fill=outline_color)
+    # 嘴巴
+    draw.arc((x-mouth_w, y+size//4, x+mouth_w, y+size//4+mouth_h),
+             start=0, end=180, fill=outline_color, width=2)
+
+# =================== 脸型生成函数 ===================
+def draw_face(draw, center, size, shape='椭圆脸', skin_color=(255,224,189), outline_color=(0,0,0),
+              params=None, with_features=False, labels=None):
+    """
+    在已有画布上以 center 为中心画脸型，size 为半高。
+    labels 为 labels.LabelDraw 时，在脸型、五官两个阶段之前切换它的类别（同一遍绘制输出类别图）。
+    """
+    params = {**SHAPE_PARAMS.get(shape, {}), **(params or {})}
+    func = FACE_SHAPES.get(shape, draw_oval_face)
+    if labels is not None:
+        labels.stage('face')
+    func(draw, center, size, skin_color, outline_color, params)
+    if with_features:
+        if labels is not None:
+            labels.stage('features')
+        draw_features(draw, center, size, outline_color, params)
+
+@timed('draw', part='face')
+def generate_face(shape='椭圆脸', skin_color=(255,224,189), outline_color=(0,0,0),
+                  size=150, params=None, with_features=False, quality='normal'):
+    img = Image.new("RGBA", (size*2, size*2), (255,255,255,0))
+    draw = make_draw(img, quality)
+    draw_face(draw, (size, size), size, shape, skin_color, outline_color, params, with_features)
+    return img
+
+# =================== 随机参数 ===================
+def random_face_params(rng=random, size=150):
+    """随机脸型参数，返回可直接传给 generate_face 的字典"""
+    shape = rng.choice(list(FACE_SHAPES.keys()))
+    skin_color = tuple(rng.randint(180,255) for _ in range(3))
+    params = {
+        'eye_w': rng.randint(size//12, size//6),
+        'eye_h': rng.randint(size//24, size//12),
+        'eye_offset_x': rng.randint(size//6, size//3),
+        'nose_w': rng.randint(size//24, size//12),
+        'nose_h': rng.randint(size//16, size//8),
+        'mouth_w': rng.randint(size//4, size//2),
+        'mouth_h': rng.randint(size//24, size//12)
+    }
+    if shape == '椭圆脸':
+        params['width_ratio'] = rng.uniform(1.2, 1.5)
+    return dict(shape=shape, skin_color=skin_color, outline_color=(0,0,0),
+                size=size, params=params, with_features=rng.choice([True, False]))
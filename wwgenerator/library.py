@@ -0,0 +1,224 @@
+"""
+素材库索引：导出时在输出文件夹旁写一份 SQLite 索引（index.sqlite），
+记录每个素材的生成参数、尺寸和像素哈希，之后按参数查询，不必再打开图片：
+    lib = AssetLibrary("out/")
+    lib.find(part='eyeball', pupil_shape='cat', iris_color__h=(180, 260), size=(128, None))
+参数按点分路径展开成 (键, 数值, 文本) 行并建索引；颜色额外展开出 .r/.g/.b 与 .h/.s/.v，
+可以按“偏蓝”（色相区间）这类条件查。
+"""
+import colorsys
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from PIL import Image
+
+from .atlas import _jsonable
+from .labels import LABEL_SUFFIX
+
+INDEX_NAME = "index.sqlite"
+
+# 文件名前缀 -> 部件名，扫描已有文件夹时用；与 batch.PARTS 的前缀一致
+PREFIX_PARTS = {'eye': 'eyeball', 'face': 'face', 'nose': 'nose', 'mouth': 'mouth',
+                'character': 'character'}
+
+# 直接存在 assets 表中的列
+ASSET_COLUMNS = ('part', 'width', 'height', 'sha1')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    path TEXT PRIMARY KEY, part TEXT, width INTEGER, height INTEGER,
+    sha1 TEXT, params TEXT, added REAL);
+CREATE INDEX IF NOT EXISTS assets_part ON assets(part);
+CREATE INDEX IF NOT EXISTS assets_sha1 ON assets(sha1);
+CREATE TABLE IF NOT EXISTS params (path TEXT, key TEXT, num REAL, text TEXT);
+CREATE INDEX IF NOT EXISTS params_num ON params(key, num);
+CREATE INDEX IF NOT EXISTS params_text ON params(key, text);
+CREATE INDEX IF NOT EXISTS params_path ON params(path);
+"""
+
+def pixel_hash(img):
+    """像素内容哈希：与 PNG 压缩预设、文本块无关，同一张图在哪导出都一样"""
+    h = hashlib.sha1(f"{img.mode}{img.size}".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+def _is_color(value):
+    return (isinstance(value, (tuple, list)) and len(value) in (3, 4)
+            and all(isinstance(v, int) and 0 <= v <= 255 for v in value))
+
+def flatten_params(params, prefix=""):
+    """把嵌套参数展开成 [(点分键, 数值, 文本)]；颜色展开 r/g/b/a 与 h（度）/s/v"""
+    rows = []
+    for key, value in params.items():
+        key = f"{prefix}{key}"
+        if isinstance(value, dict):
+            rows.extend(flatten_params(value, key + "."))
+        elif _is_color(value):
+            for ch, v in zip("rgba", value):
+                rows.append((f"{key}.{ch}", v, None))
+            h, s, v = colorsys.rgb_to_hsv(*(c / 255 for c in value[:3]))
+            rows += [(f"{key}.h", h * 360, None), (f"{key}.s", s, None), (f"{key}.v", v, None)]
+        elif isinstance(value, (bool, int, float)):
+            rows.append((key, float(value), None))
+        elif isinstance(value, str):
+            rows.append((key, None, value))
+        elif value is not None:
+            rows.append((key, None, json.dumps(_jsonable(value), ensure_ascii=False)))
+    return rows
+
+def _atlas_sheets(folder):
+    """文件夹中各图集清单（AtlasWriter 写出的 *.json）引用的图集 PNG 文件名"""
+    sheets = set()
+    with os.scandir(folder) as it:
+        for entry in it:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(manifest, dict) and 'sheets' in manifest and 'frames' in manifest:
+                sheets.update(s['file'] for s in manifest['sheets'])
+    return sheets
+
+def _condition(column, value):
+    """
+    单个查询条件 -> (SQL 片段, 参数)：
+    (lo, hi) 为闭区间，任一端为 None 表示不限；list/set 为任取其一；其余为相等。
+    """
+    if isinstance(value, tuple):
+        lo, hi = value
+        parts, args = [], []
+        if lo is not None:
+            parts.append(f"{column} >= ?")
+            args.append(lo)
+        if hi is not None:
+            parts.append(f"{column} <= ?")
+            args.append(hi)
+        return " AND ".join(parts) or "1", args
+    if isinstance(value, (list, set, frozenset)):
+        value = list(value)
+        return f"{column} IN ({','.join('?' * len(value))})", value
+    return f"{column} = ?", [value]
+
+class AssetLibrary:
+    """
+    一个文件夹的素材索引，可在多个线程中 add（PngExporter 的编码线程直接写入）。
+    路径以相对文件夹的形式保存，文件夹整体移动后索引仍然有效。
+    """
+    def __init__(self, folder, name=INDEX_NAME):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+        self.path = os.path.join(folder, name)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.folder)
+
+    def add(self, path, img, params=None, part=None):
+        """记录一个素材；同一路径再次写入时覆盖旧记录"""
+        self.record(path, img.size, params, part, pixel_hash(img))
+
+    def record(self, path, size, params=None, part=None, digest=None):
+        """已知尺寸和哈希时直接记录（批量生成由工作进程算好后交回主进程）"""
+        rel = self._rel(path)
+        rows = flatten_params(params) if params else []
+        with self._lock:
+            self._conn.execute("DELETE FROM params WHERE path = ?", (rel,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (rel, part, size[0], size[1], digest,
+                 json.dumps(_jsonable(params), ensure_ascii=False) if params else None,
+                 time.time()))
+            self._conn.executemany("INSERT INTO params VALUES (?, ?, ?, ?)",
+                                   [(rel,) + row for row in rows])
+
+    def scan(self):
+        """
+        把文件夹中尚未索引的 PNG 补进索引（无生成参数，只有尺寸与哈希），返回新增数量。
+        类别图（*_label.png）与图集 PNG 不是素材，跳过。
+        """
+        with self._lock:
+            known = {row[0] for row in self._conn.execute("SELECT path FROM assets")}
+        known |= _atlas_sheets(self.folder)
+        added = 0
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                name = entry.name.lower()
+                if (not name.endswith(".png") or name.endswith(f"{LABEL_SUFFIX}.png")
+                        or entry.name in known):
+                    continue
+                m = re.match(r"([A-Za-z]+)_", entry.name)
+                part = PREFIX_PARTS.get(m.group(1), m.group(1)) if m else None
+                with Image.open(entry.path) as img:
+                    self.add(entry.path, img, part=part)
+                added += 1
+        self.commit()
+        return added
+
+    # ---------- 查询 ----------
+    def find(self, part=None, where=None, limit=None, **conds):
+        """
+        按条件查询，返回 [{'path', 'part', 'width', 'height', 'sha1', 'params'}]。
+        关键字中的 __ 代表点分键：eyes__iris_color__h=(180, 260) 即 'eyes.iris_color.h'；
+        键含中文或需动态拼接时放进 where 字典。
+        """
+        conds = {k.replace("__", "."): v for k, v in conds.items()}
+        conds.update(where or {})
+        if part is not None:
+            conds['part'] = part
+        sql, args = ["SELECT path, part, width, height, sha1, params FROM assets WHERE 1"], []
+        for key, value in conds.items():
+            if key in ASSET_COLUMNS:
+                clause, a = _condition(key, value)
+            else:
+                is_text = isinstance(value, str) or (
+                    isinstance(value, (list, set, frozenset)) and any(isinstance(v, str) for v in value))
+                clause, a = _condition("text" if is_text else "num", value)
+                clause = f"path IN (SELECT path FROM params WHERE key = ? AND {clause})"
+                a = [key] + a
+            sql.append(f"AND {clause}")
+            args += a
+        return self._select(" ".join(sql), args, limit)
+
+    def get(self, path):
+        """按文件路径取一条记录，不存在时返回 None"""
+        rows = self._select("SELECT path, part, width, height, sha1, params FROM assets "
+                            "WHERE path = ?", [self._rel(path)])
+        return rows[0] if rows else None
+
+    def _select(self, sql, args, limit=None):
+        sql += " ORDER BY path"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [{'path': os.path.join(self.folder, path), 'part': p, 'width': w, 'height': h,
+                 'sha1': sha1, 'params': json.loads(params) if params else None}
+                for path, p, w, h, sha1, params in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+
+    def close(self):
+        self.commit()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
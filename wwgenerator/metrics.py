@@ -0,0 +1,206 @@
+"""
+生成流水线的计时与计数：各阶段（采样、绘制、裁剪、PNG 编码、PhotoImage 转换……）
+用 timed 包起来，结果汇总成计数器和直方图，可导出 JSON 或在本地 HTTP 端口按 Prometheus 文本格式抓取：
+    metrics.enable()
+    metrics.serve(9464)                 # http://127.0.0.1:9464/metrics（/metrics.json 为 JSON）
+    with metrics.timed('encode', part='eyeball'):
+        img.save(...)
+默认关闭：关闭时 timed 只多一次全局开关判断，装饰过的函数几乎没有额外开销。
+多进程批量生成时，各工作进程每块结束后把快照交回主进程合并（见 batch.run_batch）。
+"""
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 直方图桶上界（秒），与 Prometheus 客户端默认桶相近，再向下补到 50 微秒
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = "wwgenerator"
+
+_enabled = False
+_lock = threading.Lock()
+_counters = {}      # (名称, 标签) -> 数值
+_histograms = {}    # (名称, 标签) -> [各桶计数..., +Inf 计数, 总和]
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def enabled():
+    return _enabled
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def inc(name, value=1, **labels):
+    """计数器加 value；关闭时什么也不做"""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name, seconds, **labels):
+    """向直方图记录一次耗时（秒）"""
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    i = bisect_left(BUCKETS, seconds)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        h[i] += 1
+        h[-1] += seconds
+
+# ===================== 计时 =====================
+class timed:
+    """
+    阶段计时，既可作上下文管理器，也可作装饰器：
+        with timed('encode', part='eyeball'): ...
+        @timed('draw', part='eyeball')
+        def generate_eyeball(...): ...
+    计入直方图 stage_seconds{stage=..., 其余标签}。装饰器在调用时才检查开关，可以先装饰后启用。
+    """
+    __slots__ = ('stage', 'labels', 't0')
+
+    def __init__(self, stage, **labels):
+        self.stage = stage
+        self.labels = labels
+        self.t0 = None
+
+    def __enter__(self):
+        if _enabled:
+            self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.t0 is not None:
+            observe("stage_seconds", time.perf_counter() - self.t0, stage=self.stage, **self.labels)
+            self.t0 = None
+
+    def __call__(self, fn):
+        stage, labels = self.stage, self.labels
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe("stage_seconds", time.perf_counter() - t0, stage=stage, **labels)
+        return wrapper
+
+# ===================== 快照与合并 =====================
+def snapshot():
+    """当前全部指标，可直接 json.dump"""
+    with _lock:
+        counters = [{'name': n, 'labels': dict(l), 'value': v} for (n, l), v in _counters.items()]
+        histograms = [{'name': n, 'labels': dict(l), 'buckets': list(BUCKETS),
+                       'counts': h[:-1], 'sum': h[-1]} for (n, l), h in _histograms.items()]
+    return {'counters': counters, 'histograms': histograms}
+
+def merge(snap):
+    """把另一进程的快照累加进来"""
+    with _lock:
+        for c in snap['counters']:
+            key = _key(c['name'], c['labels'])
+            _counters[key] = _counters.get(key, 0) + c['value']
+        for h in snap['histograms']:
+            key = _key(h['name'], h['labels'])
+            mine = _histograms.setdefault(key, [0] * (len(BUCKETS) + 2))
+            for i, n in enumerate(h['counts']):
+                mine[i] += n
+            mine[-1] += h['sum']
+
+def collect(fn, *args, **kwargs):
+    """在工作进程中开启计时执行 fn，返回 (结果, 本次的指标快照)"""
+    enable()
+    reset()
+    result = fn(*args, **kwargs)
+    return result, snapshot()
+
+def dump(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, ensure_ascii=False, indent=1)
+
+def summary():
+    """各直方图的次数、总耗时和平均耗时（毫秒），按总耗时从大到小"""
+    rows = []
+    for h in snapshot()['histograms']:
+        n = sum(h['counts'])
+        rows.append((h['name'], h['labels'], n, h['sum'] * 1000, h['sum'] * 1000 / n if n else 0))
+    return sorted(rows, key=lambda r: -r[3])
+
+# ===================== Prometheus 文本格式 =====================
+def _labels_text(labels, extra=None):
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+def to_prometheus():
+    snap = snapshot()
+    lines = []
+    for name in sorted({c['name'] for c in snap['counters']}):
+        lines.append(f"# TYPE {PREFIX}_{name} counter")
+        for c in snap['counters']:
+            if c['name'] == name:
+                lines.append(f"{PREFIX}_{name}{_labels_text(c['labels'])} {c['value']}")
+    for name in sorted({h['name'] for h in snap['histograms']}):
+        lines.append(f"# TYPE {PREFIX}_{name} histogram")
+        for h in snap['histograms']:
+            if h['name'] != name:
+                continue
+            cumulative = 0
+            for le, n in zip(list(BUCKETS) + ["+Inf"], h['counts']):
+                cumulative += n
+                lines.append(f"{PREFIX}_{name}_bucket{_labels_text(h['labels'], {'le': le})} {cumulative}")
+            lines.append(f"{PREFIX}_{name}_sum{_labels_text(h['labels'])} {h['sum']}")
+            lines.append(f"{PREFIX}_{name}_count{_labels_text(h['labels'])} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, ctype = to_prometheus().encode(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, ctype = json.dumps(snapshot()).encode(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def serve(port=9464, host="127.0.0.1"):
+    """在后台线程启动 HTTP 端点并开启计时，返回 server（server.shutdown() 停止）"""
+    enable()
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def serve_from_env(var="WWGENERATOR_METRICS_PORT"):
+    """环境变量给出端口时启动端点（GUI 脚本用），否则什么也不做"""
+    port = os.environ.get(var)
+    return serve(int(port)) if port else None
@@ -0,0 +1,53 @@
+from PIL import Image
+import random
+
+from .metrics import timed
+from .primitives import centered_box
+from .supersample import make_draw
+
+# ===================== 嘴巴生成函数 =====================
+def draw_mouth(draw, center, mouth_w, mouth_h, mouth_shape='line', color=(0,0,0), width=2):
+    """在已有画布上以 center 为中心画嘴巴，mouth_w/mouth_h 为像素宽高"""
+    center_x, center_y = center
+    if mouth_shape == 'line':
+        draw.line([(center_x - mouth_w//2, center_y),
+                   (center_x + mouth_w//2, center_y)],
+                  fill=color, width=width)
+    elif mouth_shape == 'circle':
+        draw.ellipse(centered_box(center, mouth_w//2),
+                     outline=color, width=width)
+    elif mouth_shape == 'half_ellipse':
+        draw.arc(centered_box(center, mouth_w//2, mouth_h//2),
+                 start=0, end=180, fill=color, width=width)
+    else:
+        raise ValueError("mouth_shape must be 'line', 'circle', or 'half_ellipse'")
+
+@timed('draw', part='mouth')
+def generate_mouth(size=128,
+                   mouth_width_ratio=0.6,
+                   mouth_height_ratio=0.2,
+                   mouth_shape='line',
+                   quality='normal'):
+    """
+    生成简化嘴巴图像，仅保留轮廓分类
+    mouth_shape: 'line', 'circle', 'half_ellipse'
+    quality: 'normal' / 'high' / 'ultra'，后两者为超采样抗锯齿
+    """
+    img = Image.new("RGBA", (size, size), (0,0,0,0))
+    draw = make_draw(img, quality)
+    mouth_w = int(size * mouth_width_ratio)
+    mouth_h = int(size * mouth_height_ratio)
+    draw_mouth(draw, (size // 2, size // 2), mouth_w, mouth_h, mouth_shape)
+    return img
+
+# ===================== 随机参数 =====================
+MOUTH_SHAPES = ('line', 'circle', 'half_ellipse')
+
+def random_mouth_params(rng=random, size=128):
+    """随机嘴巴参数，返回可直接传给 generate_mouth 的字典"""
+    return dict(
+        size=size,
+        mouth_width_ratio=rng.uniform(0.2, 0.8),
+        mouth_height_ratio=rng.uniform(0.05, 0.4),
+        mouth_shape=rng.choice(list(MOUTH_SHAPES))
+    )
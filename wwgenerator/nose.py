@@ -0,0 +1,85 @@
+from PIL import Image
+import random
+
+from .metrics import timed
+from .primitives import centered_box, triangle_points
+from .supersample import make_draw
+
+# =================== 鼻子绘制函数 ===================
+def draw_circle(draw, center, size, fill_color, outline_color):
+    draw.ellipse(centered_box(center, size // 2), fill=fill_color, outline=outline_color)
+
+def draw_triangle(draw, center, size, fill_color, outline_color):
+    draw.polygon(triangle_points(center, size // 2), fill=fill_color, outline=outline_color)
+
+def draw_square(draw, center, size, fill_color, outline_color):
+    draw.rectangle(centered_box(center, size // 2), fill=fill_color, outline=outline_color)
+
+def draw_trapezoid(draw, center, size, fill_color, outline_color):
+    x, y = center
+    half = size // 2
+    h = size // 2
+    draw.polygon([(x-half, y+h), (x+half, y+h), (x+half//2, y-h), (x-half//2, y-h)], fill=fill_color, outline=outline_color)
+
+NOSE_SHAPES = {"圆鼻": draw_circle, "三角鼻": draw_triangle, "方鼻": draw_square, "梯形鼻": draw_trapezoid}
+
+# =================== 鼻孔绘制函数 ===================
+def draw_hole(draw, center, size, shape="圆形", hole_color=(0,0,0)):
+    r = size // 2
+    if shape == "圆形":
+        draw.ellipse(centered_box(center, r), fill=hole_color)
+    elif shape == "方形":
+        draw.rectangle(centered_box(center, r), fill=hole_color)
+    elif shape == "三角形":
+        draw.polygon(triangle_points(center, r), fill=hole_color)
+
+# =================== 核心生成 ===================
+def draw_nose(draw, center, size, shape="圆鼻", fill_color=(255,182,193), outline_color=(0,0,0),
+              has_holes=True, hole_shape="圆形", hole_size=20, hole_offset=40,
+              hole_vertical_offset=0, hole_color=(0,0,0)):
+    """在已有画布上以 center 为中心画鼻子，size 为鼻子本体大小，鼻孔参数为像素值"""
+    x, y = center
+    func = NOSE_SHAPES.get(shape, draw_circle)
+    func(draw, center, size, fill_color, outline_color)
+
+    if has_holes:
+        y = y + hole_vertical_offset
+        draw_hole(draw, (x - hole_offset, y), hole_size, hole_shape, hole_color)
+        draw_hole(draw, (x + hole_offset, y), hole_size, hole_shape, hole_color)
+
+@timed('draw', part='nose')
+def generate_nose(
+    shape="圆鼻",
+    fill_color=(255,182,193),
+    outline_color=(0,0,0),
+    has_holes=True,
+    hole_shape="圆形",
+    hole_size=20,
+    hole_offset=40,
+    hole_vertical_offset=0,
+    hole_color=(0,0,0),
+    quality='normal'
+):
+    size = 300
+    img = Image.new("RGBA", (size, size), (255,255,255,0))
+    draw = make_draw(img, quality)
+    draw_nose(draw, (size//2, size//2), size//2, shape, fill_color, outline_color,
+              has_holes, hole_shape, hole_size, hole_offset, hole_vertical_offset, hole_color)
+    return img
+
+# =================== 随机参数 ===================
+HOLE_SHAPES = ("圆形", "方形", "三角形")
+
+def random_nose_params(rng=random):
+    """随机鼻子参数，返回可直接传给 generate_nose 的字典"""
+    return dict(
+        shape=rng.choice(list(NOSE_SHAPES.keys())),
+        fill_color=tuple(rng.randint(150,255) for _ in range(3)),
+        outline_color=tuple(rng.randint(0,50) for _ in range(3)),
+        hole_color=tuple(rng.randint(0,50) for _ in range(3)),
+        hole_shape=rng.choice(list(HOLE_SHAPES)),
+        has_holes=rng.choice([True,False]),
+        hole_size=rng.randint(5,50),
+        hole_offset=rng.randint(10,50),
+        hole_vertical_offset=rng.randint(-20,20)
+    )
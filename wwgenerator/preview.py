@@ -0,0 +1,123 @@
+"""
+GUI 预览的后台渲染：渲染放到工作线程，只保留最新一次的参数。
+拖动滑块时积压的旧参数直接丢弃，预览延迟最多一次渲染。
+可选草图模式：拖动中先出低分辨率草图，停手 refine_ms 后再出全精度结果。
+本模块不导入 tkinter，只需要传入带 after()/after_cancel() 的 root。
+"""
+import threading
+import traceback
+
+from PIL import Image
+
+def scaled_draft(render, scale=4, resample=Image.BILINEAR):
+    """
+    草图渲染：以 size//scale 渲染后放大回原尺寸。
+    只适用于几何完全按 size 比例计算的生成函数（如 generate_eyeball）。
+    """
+    def draft(size, **params):
+        small = max(8, size // scale)
+        img = render(size=small, **params)
+        factor = size / small
+        return img.resize((round(img.width*factor), round(img.height*factor)), resample)
+    return draft
+
+def run_in_background(root, work, on_done, poll_ms=30):
+    """
+    在工作线程中执行 work()，完成后在主线程调用 on_done(result, error)，error 成功时为 None。
+    结果由主线程经 root.after 轮询取回，工作线程不接触 Tk。
+    """
+    box = {}
+    def target():
+        try:
+            box['result'] = work()
+        except Exception as e:
+            box['error'] = e
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+
+    def poll():
+        if thread.is_alive():
+            root.after(poll_ms, poll)
+        else:
+            on_done(box.get('result'), box.get('error'))
+    root.after(poll_ms, poll)
+    return thread
+
+class PreviewRenderer:
+    """
+    render(**params) 在工作线程中执行，返回 PIL 图像；
+    on_ready(img) 通过 root.after 回到主线程调用（PhotoImage 必须在主线程创建）。
+    给定 draft 时，每次请求先渲染草图，参数停止变化 refine_ms 毫秒后再用 render 精修。
+    """
+    def __init__(self, root, render, on_ready, draft=None, refine_ms=150, poll_ms=15):
+        self.root = root
+        self.render = render
+        self.on_ready = on_ready
+        self.draft = draft
+        self.refine_ms = refine_ms
+        self.poll_ms = poll_ms
+        self._cond = threading.Condition()
+        self._seq = 0           # 请求序号，结果按 (序号, 是否精修) 取最新
+        self._pending = None    # 尚未开始渲染的最新任务
+        self._result = None     # 已完成、尚未显示的最新结果
+        self._shown = (0, 0)
+        self._busy = False
+        self._polling = False
+        self._refine_id = None
+        self.dropped = 0        # 被新参数覆盖而未渲染的请求数
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def request(self, **params):
+        """主线程调用：提交新参数，覆盖尚未开始的旧请求"""
+        self._seq += 1
+        if self.draft is None:
+            self._submit((self._seq, 1), self.render, params)
+            return
+        self._submit((self._seq, 0), self.draft, params)
+        if self._refine_id is not None:
+            self.root.after_cancel(self._refine_id)
+        self._refine_id = self.root.after(self.refine_ms, self._refine, self._seq, params)
+
+    def _refine(self, seq, params):
+        self._refine_id = None
+        if seq == self._seq:
+            self._submit((seq, 1), self.render, params)
+
+    def _submit(self, token, fn, params):
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (token, fn, params)
+            self._cond.notify()
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                (token, fn, params), self._pending = self._pending, None
+                self._busy = True
+            try:
+                img = fn(**params)
+            except Exception:
+                traceback.print_exc()
+                img = None
+            with self._cond:
+                self._busy = False
+                if img is not None and (self._result is None or token > self._result[0]):
+                    self._result = (token, img)
+
+    def _poll(self):
+        with self._cond:
+            result, self._result = self._result, None
+            idle = not self._busy and self._pending is None
+        if result is not None and result[0] > self._shown:
+            self._shown = result[0]
+            self.on_ready(result[1])
+        if idle and result is None:
+            self._polling = False
+        else:
+            self.root.after(self.poll_ms, self._poll)
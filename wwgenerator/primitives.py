@@ -0,0 +1,139 @@
+"""
+共用绘制图元层：各部件的 draw_* 函数只面向 ImageDraw 接口（ellipse / rectangle /
+rounded_rectangle / polygon / line / arc / point）作画，后端可以是
+    ImageDraw.Draw（位图）、SupersampleDraw（抗锯齿位图）、SvgDraw（矢量）、DisplayList（录制）。
+DisplayList 把一次绘制录成图元列表，之后可平移/缩放、按区域裁剪、拼接，
+再回放到任意后端，部件组合时不必重新光栅化再合成。
+"""
+from PIL import ImageColor
+
+def points(xy):
+    """把 ImageDraw 支持的各种坐标写法统一成 [(x, y), ...]"""
+    xy = list(xy)
+    if xy and isinstance(xy[0], (tuple, list)):
+        return [tuple(p) for p in xy]
+    return list(zip(xy[0::2], xy[1::2]))
+
+def rgba(color):
+    """颜色统一成 (r, g, b, a)"""
+    if isinstance(color, str):
+        color = ImageColor.getrgb(color)
+    if isinstance(color, int):
+        color = (color, color, color)
+    color = tuple(color)
+    return color if len(color) == 4 else color[:3] + (255,)
+
+def centered_box(center, rx, ry=None):
+    """以 center 为中心、半宽 rx、半高 ry 的包围盒"""
+    x, y = center
+    ry = rx if ry is None else ry
+    return (x-rx, y-ry, x+rx, y+ry)
+
+def triangle_points(center, r):
+    """顶点朝上、底宽 2r、高 2r 的等腰三角形"""
+    x, y = center
+    return [(x, y-r), (x-r, y+r), (x+r, y+r)]
+
+def outlined_polygon(draw, pts, fill, outline, width):
+    """填充多边形并用 width 宽的闭合折线描边（1 像素内描边 + 折线，与原各处写法一致）"""
+    draw.polygon(pts, fill=fill, outline=outline)
+    draw.line(list(pts) + [pts[0]], fill=outline, width=width)
+
+# =================== 显示列表 ===================
+class DisplayList:
+    """
+    录制 ImageDraw 风格的调用：
+        dl = DisplayList()
+        draw_nose(dl, (150, 150), 150)
+        dl.translated(10, 0).replay(ImageDraw.Draw(img))
+    每条图元为 (方法名, 坐标点列表, 其余关键字参数)。
+    """
+    def __init__(self, ops=None):
+        self.ops = list(ops or [])
+
+    def _record(self, name, xy, **kwargs):
+        self.ops.append((name, points(xy), kwargs))
+
+    # ---------- 与 ImageDraw 相同的接口 ----------
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        self._record('ellipse', xy, fill=fill, outline=outline, width=width)
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        self._record('rectangle', xy, fill=fill, outline=outline, width=width)
+
+    def rounded_rectangle(self, xy, radius=0, fill=None, outline=None, width=1):
+        self._record('rounded_rectangle', xy, radius=radius, fill=fill, outline=outline, width=width)
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        self._record('polygon', xy, fill=fill, outline=outline, width=width)
+
+    def line(self, xy, fill=None, width=0):
+        self._record('line', xy, fill=fill, width=width)
+
+    def arc(self, xy, start, end, fill=None, width=1):
+        self._record('arc', xy, start=start, end=end, fill=fill, width=width)
+
+    def point(self, xy, fill=None):
+        self._record('point', xy, fill=fill)
+
+    # ---------- 组合、变换、裁剪 ----------
+    def __len__(self):
+        return len(self.ops)
+
+    def __add__(self, other):
+        return DisplayList(self.ops + other.ops)
+
+    def extend(self, other):
+        self.ops.extend(other.ops)
+        return self
+
+    def transformed(self, dx=0, dy=0, scale=1):
+        """先以原点为中心缩放再平移；线宽、圆角随之缩放（线宽至少 1 像素）"""
+        ops = []
+        for name, pts, kwargs in self.ops:
+            pts = [(x*scale + dx, y*scale + dy) for x, y in pts]
+            if scale != 1:
+                kwargs = dict(kwargs)
+                if kwargs.get('width'):
+                    kwargs['width'] = max(1, round(kwargs['width'] * scale))
+                if kwargs.get('radius'):
+                    kwargs['radius'] = kwargs['radius'] * scale
+            ops.append((name, pts, kwargs))
+        return DisplayList(ops)
+
+    def translated(self, dx, dy):
+        return self.transformed(dx, dy)
+
+    @staticmethod
+    def op_bbox(op):
+        """单条图元的包围盒（含线宽外扩）"""
+        _, pts, kwargs = op
+        pad = kwargs.get('width') or 1
+        xs = [p[0] for p in pts]
+        ys = [p[1] for p in pts]
+        return (min(xs) - pad, min(ys) - pad, max(xs) + pad + 1, max(ys) + pad + 1)
+
+    def bbox(self):
+        """全部图元的包围盒，空列表返回 None"""
+        if not self.ops:
+            return None
+        boxes = [self.op_bbox(op) for op in self.ops]
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    def culled(self, clip):
+        """只保留包围盒与 clip=(x0, y0, x1, y1) 相交的图元"""
+        cx0, cy0, cx1, cy1 = clip
+        ops = []
+        for op in self.ops:
+            x0, y0, x1, y1 = self.op_bbox(op)
+            if x1 > cx0 and x0 < cx1 and y1 > cy0 and y0 < cy1:
+                ops.append(op)
+        return DisplayList(ops)
+
+    def replay(self, draw, clip=None):
+        """按录制顺序回放到任意 ImageDraw 风格的后端；给出 clip 时跳过区域外的图元"""
+        ops = self.culled(clip).ops if clip is not None else self.ops
+        for name, pts, kwargs in ops:
+            getattr(draw, name)(pts, **kwargs)
+        return draw
@@ -0,0 +1,89 @@
+"""
+可复现的随机参数采样：每个部件一个采样器，由 (seed, index) 唯一决定参数。
+同一批次 seed 下第 i 个部件永远相同，可按编号区间拆分到多台机器，
+也可以单独重新生成某一个丢失的部件。
+"""
+import random
+
+from .compose import random_character_params
+from .eyeball import random_eyeball_params
+from .face import SHAPE_PARAMS, random_face_params
+from .metrics import timed
+from .mouth import random_mouth_params
+from .nose import random_nose_params
+
+def _merge_missing(params, extra):
+    """把 extra 中 params 没有的键（可嵌套）补进 params 的副本"""
+    merged = dict(params)
+    for key, value in extra.items():
+        if isinstance(value, dict):
+            merged[key] = _merge_missing(merged.get(key) or {}, value)
+        else:
+            merged.setdefault(key, value)
+    return merged
+
+# 所有脸型条件参数的并集
+_FACE_SHAPE_PARAMS = {k: v for extra in SHAPE_PARAMS.values() for k, v in extra.items()}
+
+class ParamSampler:
+    """
+    按编号采样参数；kwargs 原样传给随机参数函数（如 size）。
+    conditional 为只在部分取值下出现的参数（嵌套字典，值为示例），template 据此给出全部键。
+    """
+    param_fn = None
+    part = None
+    conditional = {}
+
+    def __init__(self, seed=0, **kwargs):
+        self.seed = seed
+        self.kwargs = kwargs
+
+    def rng(self, index):
+        # 字符串种子经 sha512 展开，与 PYTHONHASHSEED、平台无关
+        return random.Random(f"{self.seed}/{index}")
+
+    def sample(self, index):
+        with timed('sample', part=self.part):
+            return type(self).param_fn(self.rng(index), **self.kwargs)
+
+    def template(self, index=0):
+        """含该部件所有可能参数键的一份参数（数据集据此建表）"""
+        return _merge_missing(self.sample(index), type(self).conditional)
+
+    def samples(self, start, stop):
+        for index in range(start, stop):
+            yield index, self.sample(index)
+
+class EyeballSampler(ParamSampler):
+    param_fn = random_eyeball_params
+    part = 'eyeball'
+
+class FaceSampler(ParamSampler):
+    param_fn = random_face_params
+    part = 'face'
+    conditional = {'params': _FACE_SHAPE_PARAMS}
+
+class NoseSampler(ParamSampler):
+    param_fn = random_nose_params
+    part = 'nose'
+
+class MouthSampler(ParamSampler):
+    param_fn = random_mouth_params
+    part = 'mouth'
+
+class CharacterSampler(ParamSampler):
+    param_fn = random_character_params
+    part = 'character'
+    conditional = {'face': {'params': _FACE_SHAPE_PARAMS}}
+
+SAMPLERS = {
+    'eyeball': EyeballSampler,
+    'face': FaceSampler,
+    'nose': NoseSampler,
+    'mouth': MouthSampler,
+    'character': CharacterSampler,
+}
+
+def new_seed():
+    """未指定 seed 时随机取一个，打印出来即可复现整批"""
+    return random.SystemRandom().randrange(2**32)
@@ -0,0 +1,67 @@
+"""
+流式随机生成：按需逐个产出 (参数, 图像)，内存占用与总数无关，
+可直接接到 PngExporter、AtlasWriter 或网络发送端，数量不设上限。
+    for params, img in iter_random_eyeballs(seed=42, n=1_000_000, size=64):
+        ...
+与批量生成使用同一套 (seed, 编号) 采样，同一 seed 下第 i 个部件与 batch 输出一致。
+"""
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from .batch import PARTS, _map_chunks_ordered, make_sampler, render_chunk_images
+
+def _chunk_ranges(start, n, chunk_size):
+    """编号区间 [start, start+n) 切成 (lo, hi) 块；n 为 None 时无限产出"""
+    if n is None:
+        return ((lo, lo+chunk_size) for lo in itertools.count(start, chunk_size))
+    stop = start + n
+    return ((lo, min(lo+chunk_size, stop)) for lo in range(start, stop, chunk_size))
+
+def iter_random_chunks(part, seed=0, n=None, start=1, size=None, quality='normal',
+                       workers=1, chunk_size=64):
+    """
+    按块产出 [(参数, 图像), ...]，每块 chunk_size 个，编号从 start 开始，n 为 None 时不停止。
+    workers > 1 时由进程池并行渲染，最多 workers*2 块在途：消费者不取，就不会继续提交，
+    产出顺序始终与编号一致。块是交给其他进程/线程消费时的自然单位。
+    """
+    if part not in PARTS:
+        raise ValueError(f"part must be one of {', '.join(PARTS)}")
+    chunks = _chunk_ranges(start, n, chunk_size)
+
+    if workers <= 1:
+        generate, _ = PARTS[part]
+        sampler = make_sampler(part, seed, size)
+        for lo, hi in chunks:
+            yield [(params, generate(quality=quality, **params))
+                   for _, params in sampler.samples(lo, hi)]
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        args = (part, seed, size, None, False, quality)
+        for _, items in _map_chunks_ordered(pool, render_chunk_images, chunks, args, workers*2):
+            yield [(params, img) for _, params, img, _ in items]
+    finally:
+        # 消费者提前停止时丢弃尚未开始的块
+        pool.shutdown(cancel_futures=True)
+
+def iter_random(part, seed=0, n=None, start=1, size=None, quality='normal',
+                workers=1, chunk_size=64):
+    """逐个产出 (参数, 图像)，参数同 iter_random_chunks"""
+    for chunk in iter_random_chunks(part, seed, n, start, size, quality, workers, chunk_size):
+        yield from chunk
+
+def iter_random_eyeballs(seed=0, n=None, **kwargs):
+    return iter_random('eyeball', seed, n, **kwargs)
+
+def iter_random_faces(seed=0, n=None, **kwargs):
+    return iter_random('face', seed, n, **kwargs)
+
+def iter_random_noses(seed=0, n=None, **kwargs):
+    return iter_random('nose', seed, n, **kwargs)
+
+def iter_random_mouths(seed=0, n=None, **kwargs):
+    return iter_random('mouth', seed, n, **kwargs)
+
+def iter_random_characters(seed=0, n=None, **kwargs):
+    return iter_random('character', seed, n, **kwargs)
@@ -0,0 +1,134 @@
+"""
+矢量（SVG）输出：SvgDraw 与 ImageDraw.Draw 接口一致，各 draw_* 函数画在它上面时
+记录为 SVG 图元而不是像素。同一份 SVG 可在任意分辨率下渲染，不必逐尺寸导出 PNG，
+文件大小通常只有几百字节。
+
+坐标约定与 ImageDraw 一致：包围盒 [x0, y0, x1, y1] 包含两端像素（即覆盖连续区间
+[x0, x1+1]），点坐标取像素中心，轮廓线宽向内收。
+眼珠的虹膜纹理是逐像素图案，不提供矢量版本。
+"""
+import math
+
+from .face import draw_face
+from .mouth import draw_mouth
+from .nose import draw_nose
+from .primitives import points, rgba
+
+def _num(v):
+    """坐标写成最短形式：保留两位小数并去掉末尾的 0"""
+    s = f"{v:.2f}".rstrip('0').rstrip('.')
+    return '0' if s == '-0' else s
+
+def _paint_attrs(kind, color):
+    """fill/stroke 颜色属性，半透明时附带 opacity"""
+    if color is None:
+        return f' {kind}="none"'
+    r, g, b, a = rgba(color)
+    attrs = f' {kind}="#{r:02x}{g:02x}{b:02x}"'
+    if a != 255:
+        attrs += f' {kind}-opacity="{_num(a/255)}"'
+    return attrs
+
+class SvgDraw:
+    def __init__(self, width, height):
+        self.size = (width, height)
+        self.elements = []
+
+    def _box(self, xy, inset=0.0):
+        (x0, y0), (x1, y1) = points(xy)
+        return x0 + inset, y0 + inset, x1 + 1 - inset, y1 + 1 - inset
+
+    def _shape(self, tag, geometry, fill, outline, width):
+        attrs = _paint_attrs('fill', fill)
+        if outline is not None and width > 0:
+            attrs += _paint_attrs('stroke', outline) + f' stroke-width="{_num(width)}"'
+        self.elements.append(f'<{tag} {geometry}{attrs}/>')
+
+    # ---------- 与 ImageDraw 相同的接口 ----------
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        w = width if outline is not None else 0
+        x0, y0, x1, y1 = self._box(xy, w/2)
+        geometry = (f'cx="{_num((x0+x1)/2)}" cy="{_num((y0+y1)/2)}" '
+                    f'rx="{_num(max(0, (x1-x0)/2))}" ry="{_num(max(0, (y1-y0)/2))}"')
+        self._shape('ellipse', geometry, fill, outline, w)
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        self.rounded_rectangle(xy, 0, fill, outline, width)
+
+    def rounded_rectangle(self, xy, radius=0, fill=None, outline=None, width=1):
+        w = width if outline is not None else 0
+        x0, y0, x1, y1 = self._box(xy, w/2)
+        geometry = (f'x="{_num(x0)}" y="{_num(y0)}" '
+                    f'width="{_num(max(0, x1-x0))}" height="{_num(max(0, y1-y0))}"')
+        if radius > w/2:
+            geometry += f' rx="{_num(radius - w/2)}"'
+        self._shape('rect', geometry, fill, outline, w)
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        pts = ' '.join(f'{_num(x+0.5)},{_num(y+0.5)}' for x, y in points(xy))
+        self._shape('polygon', f'points="{pts}"', fill, outline, width)
+
+    def line(self, xy, fill=None, width=0):
+        if fill is None:
+            return
+        pts = ' '.join(f'{_num(x+0.5)},{_num(y+0.5)}' for x, y in points(xy))
+        self._shape('polyline', f'points="{pts}"', None, fill, max(width, 1))
+
+    def arc(self, xy, start, end, fill=None, width=1):
+        if fill is None:
+            return
+        x0, y0, x1, y1 = self._box(xy, width/2)
+        cx, cy, rx, ry = (x0+x1)/2, (y0+y1)/2, max(0, (x1-x0)/2), max(0, (y1-y0)/2)
+
+        def at(deg):
+            rad = math.radians(deg)
+            return f'{_num(cx + rx*math.cos(rad))} {_num(cy + ry*math.sin(rad))}'
+
+        # 角度从 3 点钟方向顺时针计，与 ImageDraw.arc 相同；整圈拆成两段半圆
+        sweep = end - start if end - start >= 360 else (end - start) % 360
+        if sweep >= 360:
+            d = f'M{at(start)}A{_num(rx)} {_num(ry)} 0 1 1 {at(start+180)}A{_num(rx)} {_num(ry)} 0 1 1 {at(start)}'
+        else:
+            d = f'M{at(start)}A{_num(rx)} {_num(ry)} 0 {int(sweep > 180)} 1 {at(start+sweep)}'
+        self._shape('path', f'd="{d}"', None, fill, width)
+
+    def point(self, xy, fill=None):
+        for x, y in points(xy):
+            self.rectangle([(x, y), (x, y)], fill=fill)
+
+    def tostring(self):
+        w, h = self.size
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{w}" height="{h}" '
+                f'viewBox="0 0 {w} {h}">' + ''.join(self.elements) + '</svg>')
+
+# =================== 与 generate_* 同参数的矢量版本 ===================
+# quality 对矢量输出没有意义，接受但忽略，便于直接复用同一份参数字典
+
+def generate_face_svg(shape='椭圆脸', skin_color=(255,224,189), outline_color=(0,0,0),
+                      size=150, params=None, with_features=False, quality='normal'):
+    draw = SvgDraw(size*2, size*2)
+    draw_face(draw, (size, size), size, shape, skin_color, outline_color, params, with_features)
+    return draw.tostring()
+
+def generate_nose_svg(shape="圆鼻", fill_color=(255,182,193), outline_color=(0,0,0),
+                      has_holes=True, hole_shape="圆形", hole_size=20, hole_offset=40,
+                      hole_vertical_offset=0, hole_color=(0,0,0), quality='normal'):
+    size = 300
+    draw = SvgDraw(size, size)
+    draw_nose(draw, (size//2, size//2), size//2, shape, fill_color, outline_color,
+              has_holes, hole_shape, hole_size, hole_offset, hole_vertical_offset, hole_color)
+    return draw.tostring()
+
+def generate_mouth_svg(size=128, mouth_width_ratio=0.6, mouth_height_ratio=0.2,
+                       mouth_shape='line', quality='normal'):
+    draw = SvgDraw(size, size)
+    draw_mouth(draw, (size // 2, size // 2), int(size * mouth_width_ratio),
+               int(size * mouth_height_ratio), mouth_shape)
+    return draw.tostring()
+
+# 部件名 -> 矢量生成函数
+SVG_GENERATORS = {
+    'face': generate_face_svg,
+    'nose': generate_nose_svg,
+    'mouth': generate_mouth_svg,
+}
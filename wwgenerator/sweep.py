@@ -0,0 +1,90 @@
+"""
+参数网格扫描：给出若干参数轴，渲染它们的笛卡尔积。
+    axes = {'iris_texture': IRIS_TEXTURES, 'pupil_shape': PUPIL_SHAPES,
+            'iris_radius_ratio': linspace(0.3, 0.6, 10)}
+    for params, img in sweep('eyeball', axes, base={'size': 256}):
+        ...
+眼珠按图层缓存，每层的键只含它依赖的参数：
+    底图（眼白 + 虹膜 + 纹理）   size、虹膜半径、纹理、眼白色、虹膜色
+    瞳孔 / 高光                  size、瞳孔半径、瞳孔形状（只存像素下标，与颜色无关）
+每个组合只做一次底图拷贝 + 按下标赋值，只改 pupil_shape 时不会重画纹理。
+其他部件或高画质时逐个调用生成函数。
+"""
+import inspect
+import itertools
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+from .batch import PARTS
+from .eyeball import (HIGHLIGHT_COLOR, _eye_colors, _pack, eye_label_map, generate_eyeball,
+                      highlight_indices, pupil_indices)
+from .metrics import timed
+
+def linspace(lo, hi, n):
+    """[lo, hi] 上等距的 n 个值"""
+    if n <= 1:
+        return [lo]
+    return [lo + (hi - lo) * i / (n - 1) for i in range(n)]
+
+def grid(axes, base=None):
+    """axes 为 {参数名: 取值列表}，按给出顺序展开，最后一个轴变化最快；base 为固定参数"""
+    names = list(axes)
+    for values in itertools.product(*(axes[k] for k in names)):
+        params = dict(base or {})
+        params.update(zip(names, values))
+        yield params
+
+_EYE_DEFAULTS = {k: p.default for k, p in inspect.signature(generate_eyeball).parameters.items()}
+
+class LayeredEyeball:
+    """
+    与 generate_eyeball(quality='normal') 逐像素一致的分层渲染。
+    ImageDraw 在 RGBA 图上实色填充是直接覆盖像素，所以瞳孔、高光可以按缓存的下标直接赋值。
+    底图最多缓存 max_bases 张（LRU）。
+    """
+    def __init__(self, max_bases=64):
+        self.max_bases = max_bases
+        self._bases = OrderedDict()
+        self.base_renders = 0
+
+    def _base(self, size, iris_r, iris_texture, sclera_color, iris_color):
+        key = (size, iris_r, iris_texture, tuple(sclera_color), tuple(iris_color))
+        arr = self._bases.get(key)
+        if arr is not None:
+            self._bases.move_to_end(key)
+            return arr
+        arr = _eye_colors(sclera_color, iris_color, iris_r)[eye_label_map(size, iris_r, iris_texture)]
+        self.base_renders += 1
+        self._bases[key] = arr
+        if len(self._bases) > self.max_bases:
+            self._bases.popitem(last=False)
+        return arr
+
+    @timed('draw_layered', part='eyeball')
+    def render(self, **params):
+        p = dict(_EYE_DEFAULTS)
+        p.update(params)
+        size = p['size']
+        iris_r = int(p['iris_radius_ratio']*size)
+        pupil_r = int(p['pupil_radius_ratio']*iris_r)
+        arr = self._base(size, iris_r, p['iris_texture'], p['sclera_color'], p['iris_color']).copy()
+        flat = arr.reshape(-1)
+        flat[pupil_indices(size, pupil_r, p['pupil_shape'])] = _pack(p['pupil_color'])
+        if p['highlight']:
+            flat[highlight_indices(size, pupil_r)] = _pack(HIGHLIGHT_COLOR)
+        return Image.fromarray(arr.view(np.uint8).reshape(size, size, 4), "RGBA")
+
+def sweep(part, axes, base=None, quality='normal'):
+    """按 grid(axes, base) 的顺序产出 (参数, 图像)"""
+    if part not in PARTS:
+        raise ValueError(f"part must be one of {', '.join(PARTS)}")
+    generate, _ = PARTS[part]
+    if part == 'eyeball' and quality == 'normal':
+        render = LayeredEyeball().render
+    else:
+        def render(**params):
+            return generate(quality=quality, **params)
+    for params in grid(axes, base):
+        yield params, render(**params)
@@ -0,0 +1,41 @@
+"""
+裁掉透明边：按 alpha 通道的包围盒裁剪，并记录裁剪前画布尺寸与左上角偏移，
+使用方把裁剪后的图贴回 offset 处即可还原原来的摆放位置。
+"""
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+def trim(img, padding=0):
+    """返回 (裁剪后的图像, 元数据)；元数据 {'offset': [x, y], 'canvas': [w, h]}"""
+    canvas = [img.width, img.height]
+    bbox = img.getchannel('A').getbbox() if 'A' in img.getbands() else img.getbbox()
+    if bbox is None:
+        # 全透明：保留 1x1 占位，避免零尺寸图像
+        return Image.new(img.mode, (1, 1)), {'offset': [0, 0], 'canvas': canvas}
+    left, top, right, bottom = bbox
+    left, top = max(0, left-padding), max(0, top-padding)
+    right, bottom = min(img.width, right+padding), min(img.height, bottom+padding)
+    return img.crop((left, top, right, bottom)), {'offset': [left, top], 'canvas': canvas}
+
+def png_info(meta):
+    """把裁剪元数据写进 PNG 文本块，单独保存的 PNG 也能找回锚点"""
+    info = PngInfo()
+    info.add_text("wwgenerator:offset", "{},{}".format(*meta['offset']))
+    info.add_text("wwgenerator:canvas", "{},{}".format(*meta['canvas']))
+    return info
+
+def read_trim_meta(img):
+    """从 PNG 文本块读回裁剪元数据，未裁剪的图返回 None"""
+    text = getattr(img, 'text', {})
+    if "wwgenerator:offset" not in text:
+        return None
+    return {
+        'offset': [int(v) for v in text["wwgenerator:offset"].split(",")],
+        'canvas': [int(v) for v in text["wwgenerator:canvas"].split(",")],
+    }
+
+def untrim(img, meta):
+    """按元数据贴回原画布尺寸"""
+    canvas = Image.new(img.mode, tuple(meta['canvas']), (0,0,0,0))
+    canvas.paste(img, tuple(meta['offset']))
+    return canvas